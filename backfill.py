@@ -0,0 +1,112 @@
+"""Загрузка истории статусов для новых подписчиков.
+
+Эндпойнт принимает только нижнюю границу from_date, поэтому запрос
+с FROM_DATE уже возвращает всю историю, а окна по времени лишь
+повторяли бы её по частям. Параллельно идут запросы разных
+токенов, каждый ответ разбирается потоком; подписчики одного токена
+получают копию истории из одного запроса.
+"""
+import argparse
+import logging
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from checkpoints import CHECKPOINT_PATH, open_store, snapshot
+from homework import FROM_DATE, validate_homework
+from http_client import get_session
+from log_setup import setup_logging
+from streaming import stream_homeworks
+from tenants import load_tenants
+from transitions import StatusTracker
+
+BACKFILL_WORKERS = 16
+
+logger = logging.getLogger(__name__)
+
+
+def backfill_tenant(tenant, from_date=FROM_DATE, session=None):
+    """История подписчика: курсор и статусы работ без уведомлений.
+
+    Повторы одной работы схлопываются по id, побеждает более поздний
+    date_updated. Работы, не прошедшие проверку схемы, пропускаются.
+    Возвращает число принятых и пропущенных работ.
+    """
+    stream = stream_homeworks(from_date, tenant.headers, session)
+    tracker = StatusTracker()
+    accepted = skipped = 0
+    for homework in stream:
+        if validate_homework(homework):
+            skipped += 1
+            continue
+        tracker.transitions((homework,))
+        accepted += 1
+    tenant.tracker = tracker
+    tenant.from_date = stream.current_date or int(time.time())
+    return accepted, skipped
+
+
+def backfill(registry, store, workers=BACKFILL_WORKERS, force=False,
+             session=None):
+    """Параллельная загрузка истории подписчиков без сохранённого состояния.
+
+    Состояние каждого подписчика сохраняется в store как стартовое.
+    Возвращает число обработанных подписчиков.
+    """
+    session = session or get_session()
+    states = store.load_all()
+    groups = {}
+    for tenant in registry:
+        if force or tenant.key not in states:
+            groups.setdefault(tenant.token, []).append(tenant)
+    done = 0
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(backfill_tenant, group[0], FROM_DATE, session):
+            group
+            for group in groups.values()
+        }
+        for future in as_completed(futures):
+            leader, *others = group = futures[future]
+            try:
+                accepted, skipped = future.result()
+            except Exception as error:
+                logger.error('История чатов %s не загружена: %s',
+                             ', '.join(tenant.chat_id for tenant in group),
+                             error)
+                continue
+            for tenant in others:
+                tenant.from_date = leader.from_date
+                tenant.tracker = StatusTracker(leader.tracker.state)
+            for tenant in group:
+                store.save(tenant.key,
+                           snapshot(tenant.from_date, tenant.tracker))
+                done += 1
+                logger.info('Чат %s: загружено работ %s, пропущено %s',
+                            tenant.chat_id, accepted, skipped)
+    store.flush()
+    return done
+
+
+def main():
+    """Загрузка истории для подписчиков из TENANTS_FILE."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--workers', type=int, default=BACKFILL_WORKERS)
+    parser.add_argument('--force', action='store_true',
+                        help='перезагрузить и уже сохранённых подписчиков')
+    args = parser.parse_args()
+    if not CHECKPOINT_PATH:
+        logger.critical('Не задан CHECKPOINT_PATH: историю некуда сохранить')
+        sys.exit(1)
+    registry = load_tenants()
+    store = open_store()
+    started = time.perf_counter()
+    done = backfill(registry, store, args.workers, args.force)
+    store.close()
+    logger.info('История загружена для %s из %s подписчиков за %.1f с',
+                done, len(registry), time.perf_counter() - started)
+
+
+if __name__ == '__main__':
+    setup_logging(path=None)
+    main()
@@ -0,0 +1,108 @@
+"""Задержка уведомлений против числа запросов к API.
+
+Моделирует подписчиков, которые сдают работы, получают статус
+reviewing и затем вердикт, и сравнивает постоянный RETRY_PERIOD
+с AdaptiveInterval. Запуск:
+python -m benchmarks.adaptive_simulation --tenants 1000 --days 7
+"""
+import argparse
+import heapq
+import random
+import statistics
+from types import SimpleNamespace
+
+from homework import RETRY_PERIOD
+from intervals import AdaptiveInterval
+
+DAY = 24 * 60 * 60
+
+
+def make_events(rng, days, submit_gap, review_delay, verdict_delay):
+    """События смены статуса одного подписчика: (время, статус)."""
+    events = []
+    moment = rng.expovariate(1 / submit_gap)
+    while moment < days * DAY:
+        moment += rng.expovariate(1 / review_delay)
+        events.append((moment, 'reviewing'))
+        moment += rng.expovariate(1 / verdict_delay)
+        events.append((moment, rng.choice(['approved', 'rejected'])))
+        moment += rng.expovariate(1 / submit_gap)
+    return events
+
+
+def simulate(timelines, days, next_interval):
+    """Прогон опросов; возвращает число запросов и задержки по статусам."""
+    tenants = [
+        SimpleNamespace(token=str(index), status=None, position=0)
+        for index in range(len(timelines))
+    ]
+    heap = [(index * RETRY_PERIOD / len(tenants), index)
+            for index in range(len(tenants))]
+    heapq.heapify(heap)
+    calls = 0
+    latencies = {'reviewing': [], 'verdict': []}
+    while heap:
+        moment, index = heapq.heappop(heap)
+        if moment > days * DAY:
+            continue
+        calls += 1
+        tenant, events = tenants[index], timelines[index]
+        changed = False
+        while (tenant.position < len(events)
+               and events[tenant.position][0] <= moment):
+            event_time, tenant.status = events[tenant.position]
+            kind = 'reviewing' if tenant.status == 'reviewing' else 'verdict'
+            latencies[kind].append(moment - event_time)
+            tenant.position += 1
+            changed = True
+        heapq.heappush(heap, (moment + next_interval(tenant, changed), index))
+    return calls, latencies
+
+
+def percentiles(latencies):
+    """Медиана и 95-й перцентиль задержки."""
+    p95 = statistics.quantiles(latencies, n=20)[18]
+    return f'p50={statistics.median(latencies):5.0f}s p95={p95:5.0f}s'
+
+
+def report(name, calls, latencies, tenants, days):
+    """Строка отчёта по одной стратегии."""
+    print(f'{name:>18}: calls/tenant/day={calls / tenants / days:6.1f} '
+          f'reviewing {percentiles(latencies["reviewing"])} '
+          f'verdict {percentiles(latencies["verdict"])}')
+
+
+def main():
+    """Сравнение стратегий на одних и тех же событиях."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--tenants', type=int, default=1000)
+    parser.add_argument('--days', type=int, default=7)
+    parser.add_argument('--submit-gap', type=float, default=2 * DAY)
+    parser.add_argument('--review-delay', type=float, default=6 * 3600)
+    parser.add_argument('--verdict-delay', type=float, default=40 * 60)
+    parser.add_argument('--budget', type=float, default=0.5,
+                        help='запросов в секунду на всех подписчиков')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+    timelines = [
+        make_events(rng, args.days, args.submit_gap,
+                    args.review_delay, args.verdict_delay)
+        for _ in range(args.tenants)
+    ]
+    strategies = {
+        'fixed RETRY_PERIOD': lambda tenant, changed: RETRY_PERIOD,
+        'adaptive': AdaptiveInterval(
+            budget=0, rng=random.Random(args.seed).random
+        ).next_interval,
+        'adaptive+budget': AdaptiveInterval(
+            budget=args.budget, rng=random.Random(args.seed).random
+        ).next_interval,
+    }
+    for name, next_interval in strategies.items():
+        calls, latencies = simulate(timelines, args.days, next_interval)
+        report(name, calls, latencies, args.tenants, args.days)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""Скорость сохранения курсоров: пачками и по одному.
+
+Запуск: python -m benchmarks.checkpoint_throughput --tenants 5000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from checkpoints import FileCheckpointStore, SQLiteCheckpointStore
+
+STATE = {
+    'from_date': 1677600000,
+    'homeworks': [[index, 'approved', '2023-03-01T10:00:00Z']
+                  for index in range(10)],
+}
+
+
+def measure(store, tenants, per_save_flush):
+    """Время одного цикла сохранения всех подписчиков."""
+    started = time.perf_counter()
+    for index in range(tenants):
+        store.save(f'tenant-{index}', STATE)
+        if per_save_flush:
+            store.flush()
+    store.flush()
+    return time.perf_counter() - started
+
+
+def main():
+    """Сравнение хранилищ и режимов записи."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--tenants', type=int, default=5000)
+    args = parser.parse_args()
+    backends = {
+        'sqlite': (SQLiteCheckpointStore, 'checkpoints.db'),
+        'file': (FileCheckpointStore, 'checkpoints.log'),
+    }
+    with tempfile.TemporaryDirectory() as directory:
+        for name, (store_class, filename) in backends.items():
+            for per_save_flush in (True, False):
+                path = os.path.join(directory, f'{per_save_flush}-{filename}')
+                store = store_class(path)
+                elapsed = measure(store, args.tenants, per_save_flush)
+                store.close()
+                mode = 'flush each' if per_save_flush else 'batched'
+                print(f'{name:>6} {mode:>10}: '
+                      f'{args.tenants / elapsed:9.0f} checkpoints/sec')
+
+
+if __name__ == '__main__':
+    main()
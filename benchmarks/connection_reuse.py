@@ -0,0 +1,69 @@
+"""Задержка одного опроса с пулом соединений и без него.
+
+Поднимает локальную HTTPS-заглушку эндпойнта с самоподписанным
+сертификатом (нужен openssl). Запуск:
+python -m benchmarks.connection_reuse --polls 500
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import tempfile
+import time
+
+import homework
+from benchmarks.fake_practicum import start_server
+from http_client import build_session
+
+HEADERS = {'Authorization': 'OAuth token'}
+
+
+def make_certificate(directory):
+    """Самоподписанный сертификат для 127.0.0.1."""
+    certfile = os.path.join(directory, 'cert.pem')
+    keyfile = os.path.join(directory, 'key.pem')
+    subprocess.run(
+        ['openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes',
+         '-days', '1', '-subj', '/CN=127.0.0.1',
+         '-addext', 'subjectAltName=IP:127.0.0.1',
+         '-keyout', keyfile, '-out', certfile],
+        check=True, capture_output=True,
+    )
+    return certfile, keyfile
+
+
+def measure(polls, session=None):
+    """Задержки последовательных опросов в миллисекундах."""
+    latencies = []
+    for _ in range(polls):
+        started = time.perf_counter()
+        homework.fetch_homeworks(1, HEADERS, session)
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+def report(name, latencies):
+    """Вывод медианы и 99-го перцентиля."""
+    p99 = statistics.quantiles(latencies, n=100)[98]
+    print(f'{name:>12}: p50={statistics.median(latencies):.2f}ms '
+          f'p99={p99:.2f}ms')
+
+
+def main():
+    """Сравнение requests.get и общей сессии."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--polls', type=int, default=500)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as directory:
+        certfile, keyfile = make_certificate(directory)
+        os.environ['REQUESTS_CA_BUNDLE'] = certfile
+        server, url = start_server(certfile=certfile, keyfile=keyfile)
+        homework.ENDPOINT = url
+        report('no reuse', measure(args.polls))
+        with build_session() as session:
+            report('pooled', measure(args.polls, session))
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,153 @@
+"""Сквозной замер настоящего homework.main на локальных заглушках.
+
+Эндпойнт Практикума и Bot API заменены серверами fake_practicum и
+fake_telegram, всё остальное — опрос, проверка, уведомления,
+курсоры, логи — работает как в проде. Раз в --change-interval секунд
+заглушка публикует новую работу; задержка уведомления — время от
+публикации до приёма сообщения заглушкой Telegram. Сбои обеих сторон
+задаются долями ответов 500 и 429. Запуск:
+python -m benchmarks.end_to_end --duration 10 --period 0
+"""
+import argparse
+import os
+import re
+import resource
+import signal
+import statistics
+import threading
+import time
+from contextlib import ExitStack
+from functools import partial
+from unittest import mock
+
+import telegram
+
+import homework
+from benchmarks import fake_practicum, fake_telegram
+from log_setup import setup_logging
+
+TELEGRAM_TOKEN = '1234:benchmark'
+HOMEWORK_NAME = re.compile(r'"(hw-\d+)"')
+
+
+def publish_until(server, stop, interval):
+    """Публикация новых работ, пока не выставлен stop."""
+    number = 0
+    while not stop.wait(interval):
+        number += 1
+        server.publish(f'hw-{number}')
+
+
+def latencies(practicum, telegram_server):
+    """Задержки уведомлений о работах в миллисекундах."""
+    result = []
+    for moment, _, text in telegram_server.messages:
+        match = HOMEWORK_NAME.search(text or '')
+        if match and match.group(1) in practicum.published:
+            result.append(
+                (moment - practicum.published[match.group(1)]) * 1000
+            )
+    return result
+
+
+def run(duration, period=0, change_interval=0.1, padding=0,
+        practicum_faults=None, telegram_faults=None):
+    """Работа homework.main в течение duration секунд.
+
+    practicum_faults и telegram_faults — атрибуты заглушек: latency,
+    error_rate, throttle_rate, retry_after. Останавливается main
+    сигналом SIGTERM, как в проде. Возвращает словарь с числом
+    опросов, сообщений и задержками уведомлений.
+    """
+    practicum, endpoint = fake_practicum.start_server(padding=padding)
+    telegram_server, base_url = fake_telegram.start_server()
+    for server, faults in ((practicum, practicum_faults),
+                           (telegram_server, telegram_faults)):
+        for name, value in (faults or {}).items():
+            setattr(server, name, value)
+    stop = threading.Event()
+    publisher = threading.Thread(
+        target=publish_until, args=(practicum, stop, change_interval),
+        daemon=True,
+    )
+    timer = threading.Timer(duration, os.kill,
+                            (os.getpid(), signal.SIGTERM))
+    with ExitStack() as stack:
+        for name, value in {
+            'ENDPOINT': endpoint, 'RETRY_PERIOD': period,
+            'PRACTICUM_TOKEN': 'benchmark', 'TELEGRAM_CHAT_ID': '1',
+            'TELEGRAM_TOKEN': TELEGRAM_TOKEN,
+            'HEADERS': {'Authorization': 'OAuth benchmark'},
+        }.items():
+            stack.enter_context(mock.patch.object(homework, name, value))
+        stack.enter_context(mock.patch.object(
+            telegram, 'Bot', partial(telegram.Bot, base_url=base_url)
+        ))
+        publisher.start()
+        timer.start()
+        started = time.perf_counter()
+        try:
+            homework.main()
+        finally:
+            elapsed = time.perf_counter() - started
+            timer.cancel()
+            stop.set()
+            publisher.join()
+            practicum.shutdown()
+            telegram_server.shutdown()
+    return {
+        'elapsed': elapsed,
+        'polls': practicum.requests,
+        'published': len(practicum.published),
+        'messages': len(telegram_server.messages),
+        'latencies': latencies(practicum, telegram_server),
+    }
+
+
+def report(result):
+    """Строка отчёта: опросы в секунду, задержки и пиковая память."""
+    values = result['latencies']
+    if len(values) > 1:
+        cuts = statistics.quantiles(values, n=100)
+        delays = f'p50={statistics.median(values):.1f}ms p99={cuts[98]:.1f}ms'
+    else:
+        delays = 'p50=n/a p99=n/a'
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f'polls/sec={result["polls"] / result["elapsed"]:.0f} '
+          f'notified={len(values)}/{result["published"]} '
+          f'messages={result["messages"]} {delays} '
+          f'max_rss={peak:.1f}MB')
+
+
+def main():
+    """Разбор аргументов, прогон и отчёт."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--period', type=float, default=0,
+                        help='RETRY_PERIOD на время замера')
+    parser.add_argument('--change-interval', type=float, default=0.1)
+    parser.add_argument('--padding', type=int, default=0,
+                        help='старых работ в каждом ответе API; о них '
+                             'бот сообщает после первого опроса')
+    parser.add_argument('--api-latency', type=float, default=0)
+    parser.add_argument('--api-errors', type=float, default=0)
+    parser.add_argument('--api-429', type=float, default=0)
+    parser.add_argument('--telegram-latency', type=float, default=0)
+    parser.add_argument('--telegram-errors', type=float, default=0)
+    parser.add_argument('--telegram-429', type=float, default=0)
+    parser.add_argument('--log-file', default=os.devnull)
+    args = parser.parse_args()
+    setup_logging(args.log_file, stream=None)
+    report(run(
+        args.duration, args.period, args.change_interval, args.padding,
+        practicum_faults={'latency': args.api_latency,
+                          'error_rate': args.api_errors,
+                          'throttle_rate': args.api_429},
+        telegram_faults={'latency': args.telegram_latency,
+                         'error_rate': args.telegram_errors,
+                         'throttle_rate': args.telegram_429},
+    ))
+
+
+if __name__ == '__main__':
+    main()
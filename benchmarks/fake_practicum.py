@@ -0,0 +1,135 @@
+import json
+import random
+import ssl
+import threading
+import time
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+
+class PracticumHandler(BaseHTTPRequestHandler):
+    """Локальная замена эндпойнта статусов домашних работ."""
+
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        """Ответ в формате API Практикума или ошибка server.status."""
+        server = self.server
+        server.requests += 1
+        if server.latency:
+            time.sleep(server.latency)
+        status = server.pick_status()
+        if status != HTTPStatus.OK:
+            self.send_response(status)
+            if status == HTTPStatus.TOO_MANY_REQUESTS:
+                self.send_header('Retry-After', str(server.retry_after))
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        query = parse_qs(urlsplit(self.path).query)
+        from_date = int(query.get('from_date', ['0'])[0])
+        body = server.body or json.dumps({
+            'homeworks': server.homeworks_since(from_date),
+            'current_date': int(time.time()),
+        }).encode()
+        self.send_response(HTTPStatus.OK)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        """Запросы не логируются, чтобы не мешать замерам."""
+
+
+class FakePracticum(ThreadingHTTPServer):
+    """Сервер-заглушка с настраиваемыми сбоями.
+
+    latency — задержка ответа в секундах, error_rate и throttle_rate —
+    доли ответов 500 и 429 (с Retry-After: retry_after), padding —
+    старые работы, которые добавляются в каждый ответ для увеличения
+    его размера. Работы из publish отдаются, если они обновились не
+    раньше from_date, как в настоящем API.
+    """
+
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, address, homeworks=(), padding=0, seed=None):
+        """Сервер без сбоев и задержек."""
+        super().__init__(address, PracticumHandler)
+        self.homeworks = list(homeworks)
+        self.padding = [
+            {'id': -index, 'homework_name': f'old-{index}',
+             'status': 'approved', 'date_updated': '2023-01-01T10:00:00Z'}
+            for index in range(1, padding + 1)
+        ]
+        self.body = None
+        self.status = HTTPStatus.OK
+        self.requests = 0
+        self.latency = 0
+        self.error_rate = 0
+        self.throttle_rate = 0
+        self.retry_after = 1
+        self.published = {}
+        self._events = []
+        self._lock = threading.Lock()
+        self._rng = random.Random(seed)
+
+    def pick_status(self):
+        """Код ответа с учётом status и долей сбоев."""
+        if self.status != HTTPStatus.OK:
+            return self.status
+        with self._lock:
+            roll = self._rng.random()
+        if roll < self.throttle_rate:
+            return HTTPStatus.TOO_MANY_REQUESTS
+        if roll < self.throttle_rate + self.error_rate:
+            return HTTPStatus.INTERNAL_SERVER_ERROR
+        return HTTPStatus.OK
+
+    def publish(self, homework_name, status='approved'):
+        """Новая работа; время публикации запоминается в published."""
+        moment = time.time()
+        with self._lock:
+            homework = {
+                'id': len(self._events) + 1,
+                'homework_name': homework_name,
+                'status': status,
+                'date_updated': time.strftime(
+                    '%Y-%m-%dT%H:%M:%SZ', time.gmtime(moment)
+                ),
+            }
+            self._events.append((moment, homework))
+            self.published[homework_name] = moment
+        return homework
+
+    def homeworks_since(self, from_date):
+        """Работы для ответа: новые впереди, как в API."""
+        with self._lock:
+            events = [homework for moment, homework in reversed(self._events)
+                      if moment >= from_date]
+        return events + self.homeworks + self.padding
+
+
+def start_server(homeworks=(), host='127.0.0.1', port=0,
+                 certfile=None, keyfile=None, padding=0, seed=None):
+    """Запуск сервера в фоновом потоке, возвращает сервер и его URL.
+
+    С certfile и keyfile сервер отвечает по HTTPS. Сбой эндпойнта
+    имитируется заменой server.status, server.requests считает запросы,
+    server.body подменяет тело ответа готовыми байтами.
+    """
+    server = FakePracticum((host, port), homeworks, padding, seed)
+    scheme = 'http'
+    if certfile:
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(certfile, keyfile)
+        server.socket = context.wrap_socket(server.socket, server_side=True)
+        scheme = 'https'
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    host, port = server.server_address[:2]
+    return server, f'{scheme}://{host}:{port}/api/user_api/homework_statuses/'
@@ -0,0 +1,119 @@
+import json
+import random
+import threading
+import time
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl
+
+
+class TelegramHandler(BaseHTTPRequestHandler):
+    """Локальная замена Bot API: getMe и sendMessage."""
+
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        """Ответ в формате Bot API или ошибка с долей server.error_rate."""
+        server = self.server
+        length = int(self.headers.get('Content-Length') or 0)
+        data = self.parse(self.rfile.read(length))
+        if server.latency:
+            time.sleep(server.latency)
+        method = self.path.rsplit('/', 1)[-1]
+        status = server.pick_status()
+        if status == HTTPStatus.TOO_MANY_REQUESTS:
+            self.reply(status, {
+                'ok': False, 'error_code': status,
+                'description': 'Too Many Requests: retry after '
+                               f'{server.retry_after}',
+                'parameters': {'retry_after': server.retry_after},
+            })
+        elif status != HTTPStatus.OK:
+            self.reply(status, {'ok': False, 'error_code': status,
+                                'description': status.phrase})
+        elif method == 'getMe':
+            self.reply(status, {'ok': True, 'result': {
+                'id': 1, 'is_bot': True, 'first_name': 'homework_bot',
+                'username': 'homework_bot',
+            }})
+        elif method == 'sendMessage':
+            message = server.record(data.get('chat_id'), data.get('text'))
+            self.reply(status, {'ok': True, 'result': message})
+        else:
+            self.reply(HTTPStatus.NOT_FOUND, {
+                'ok': False, 'error_code': 404, 'description': 'Not Found',
+            })
+
+    def parse(self, body):
+        """Параметры запроса из JSON или формы."""
+        if self.headers.get('Content-Type', '').startswith('application/json'):
+            return json.loads(body or b'{}')
+        return dict(parse_qsl(body.decode()))
+
+    def reply(self, status, payload):
+        """JSON-ответ."""
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        """Запросы не логируются, чтобы не мешать замерам."""
+
+
+class FakeTelegram(ThreadingHTTPServer):
+    """Сервер-заглушка Bot API с настраиваемыми сбоями.
+
+    latency — задержка ответа в секундах, error_rate и throttle_rate —
+    доли ответов 500 и 429 (с parameters.retry_after). Принятые
+    сообщения копятся в messages как (время, chat_id, текст).
+    """
+
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, address, seed=None):
+        """Сервер без сбоев и задержек."""
+        super().__init__(address, TelegramHandler)
+        self.latency = 0
+        self.error_rate = 0
+        self.throttle_rate = 0
+        self.retry_after = 1
+        self.messages = []
+        self._lock = threading.Lock()
+        self._rng = random.Random(seed)
+
+    def pick_status(self):
+        """Код ответа с учётом долей сбоев."""
+        with self._lock:
+            roll = self._rng.random()
+        if roll < self.throttle_rate:
+            return HTTPStatus.TOO_MANY_REQUESTS
+        if roll < self.throttle_rate + self.error_rate:
+            return HTTPStatus.INTERNAL_SERVER_ERROR
+        return HTTPStatus.OK
+
+    def record(self, chat_id, text):
+        """Запоминание сообщения; возвращает его в формате Bot API."""
+        moment = time.time()
+        with self._lock:
+            self.messages.append((moment, chat_id, text))
+            message_id = len(self.messages)
+        return {
+            'message_id': message_id, 'date': int(moment), 'text': text,
+            'chat': {'id': int(chat_id), 'type': 'private'},
+        }
+
+
+def start_server(host='127.0.0.1', port=0, seed=None):
+    """Запуск сервера в фоновом потоке, возвращает сервер и base_url.
+
+    base_url передаётся в telegram.Bot(token, base_url=base_url).
+    """
+    server = FakeTelegram((host, port), seed)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address[:2]
+    return server, f'http://{host}:{port}/bot'
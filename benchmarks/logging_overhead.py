@@ -0,0 +1,90 @@
+"""Стоимость вызова логгера при опросе многих подписчиков.
+
+Каждый режим запускается в отдельном процессе: прежний basicConfig
+с FileHandler и подробным форматом, очередь с текстовым форматом и
+очередь с JSON-строками. Потоки имитируют подписчиков, время
+считается в вызывающих потоках, до записи на диск.
+
+Запуск: python -m benchmarks.logging_overhead --threads 16 --calls 20000
+"""
+import argparse
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from log_setup import setup_logging
+
+MODES = ('basicConfig', 'queue', 'queue-json')
+HEAVY_FORMAT = (
+    '%(asctime)s, %(levelname)s, Путь - %(pathname)s, '
+    'Файл - %(filename)s, Функция - %(funcName)s, '
+    'Номер строки - %(lineno)d, %(message)s'
+)
+
+
+def configure(mode, path):
+    """Настройка логирования режима; возвращает listener или None."""
+    stream = open(os.devnull, 'w')
+    if mode == 'basicConfig':
+        logging.basicConfig(
+            level=logging.INFO, format=HEAVY_FORMAT,
+            handlers=[logging.FileHandler(path, encoding='UTF-8'),
+                      logging.StreamHandler(stream)])
+        return None
+    return setup_logging(path, json_lines=mode == 'queue-json',
+                         stream=stream)
+
+
+def run(mode, threads, calls):
+    """Время одного вызова логгера в микросекундах."""
+    logger = logging.getLogger('benchmark')
+    with tempfile.TemporaryDirectory() as directory:
+        listener = configure(mode, os.path.join(directory, 'log.txt'))
+        barrier = threading.Barrier(threads + 1)
+
+        def work(number):
+            barrier.wait()
+            for index in range(calls):
+                logger.info('Чат %s: статус работы %s не изменился',
+                            number, index)
+
+        workers = [threading.Thread(target=work, args=(number,))
+                   for number in range(threads)]
+        for worker in workers:
+            worker.start()
+        barrier.wait()
+        started = time.perf_counter()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - started
+        if listener is not None:
+            listener.stop()
+        logging.shutdown()
+    return elapsed / (threads * calls) * 1e6
+
+
+def main():
+    """Запуск всех режимов в отдельных процессах."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--calls', type=int, default=20000)
+    parser.add_argument('--mode', choices=MODES)
+    args = parser.parse_args()
+    if args.mode:
+        print(f'{run(args.mode, args.threads, args.calls):.2f}')
+        return
+    for mode in MODES:
+        output = subprocess.run(
+            [sys.executable, '-m', __spec__.name, '--mode', mode,
+             '--threads', str(args.threads), '--calls', str(args.calls)],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+        print(f'{mode:<12} {output} мкс на вызов')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+"""Стоимость записи одной метрики в наносекундах.
+
+Запуск: python -m benchmarks.metrics_overhead --calls 1000000
+"""
+import argparse
+import timeit
+
+from metrics import Counter, Histogram, NullMetric
+
+
+def measure(statement, namespace, calls):
+    """Лучшее из трёх время одного вызова в наносекундах."""
+    best = min(timeit.repeat(statement, globals=namespace, number=calls,
+                             repeat=3))
+    return best / calls * 1e9
+
+
+def main():
+    """Замер observe, inc и блока with для включённых и null-метрик."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--calls', type=int, default=1_000_000)
+    args = parser.parse_args()
+    namespace = {
+        'histogram': Histogram('bench_seconds', 'Замер.'),
+        'counter': Counter('bench', 'Замер.', labelname='type'),
+        'null': NullMetric(),
+    }
+    cases = [
+        ('Histogram.observe', 'histogram.observe(0.0042)'),
+        ('with Histogram.time()', 'with histogram.time(): pass'),
+        ('Counter.inc(label)', "counter.inc('TransportError')"),
+        ('NullMetric.observe', 'null.observe(0.0042)'),
+        ('with NullMetric.time()', 'with null.time(): pass'),
+        ('пустой цикл', 'pass'),
+    ]
+    for name, statement in cases:
+        cost = measure(statement, namespace, args.calls)
+        print(f'{name:<24} {cost:7.0f} нс')
+
+
+if __name__ == '__main__':
+    main()
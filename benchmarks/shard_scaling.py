@@ -0,0 +1,119 @@
+"""Рост пропускной способности с числом процессов-узлов.
+
+Каждый узел берёт свою долю подписчиков по кольцу и прогоняет для
+них poll_tenant: разбор JSON, проверку, сравнение статусов и сборку
+уведомлений. Сеть заменена готовым телом ответа, поэтому замер
+упирается в процессор, а не в эндпойнт.
+
+Запуск: python -m benchmarks.shard_scaling --tenants 2000 --homeworks 50
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from hashring import HashRing
+from scheduler import poll_tenant
+from supervisor import shard_name, shard_registry
+from tenants import Tenant, TenantRegistry
+
+STATUSES = ('approved', 'reviewing', 'rejected')
+
+
+class NullBot:
+    """Бот, который никуда не отправляет сообщения."""
+
+    def send_message(self, chat_id=None, text=None, **kwargs):
+        """Отправка без сети."""
+
+
+class CannedResponse:
+    """Ответ API с заранее собранным телом."""
+
+    status_code = 200
+
+    def __init__(self, body):
+        """Ответ с телом body."""
+        self.body = body
+
+    def json(self):
+        """Разбор тела, как у requests.Response."""
+        return json.loads(self.body)
+
+
+class CannedSession:
+    """Сессия, отдающая одно и то же тело на любой запрос."""
+
+    def __init__(self, body):
+        """Сессия с телом body."""
+        self.response = CannedResponse(body)
+
+    def get(self, *args, **kwargs):
+        """Готовый ответ."""
+        return self.response
+
+
+def response_body(homeworks):
+    """Тело ответа с homeworks работами."""
+    return json.dumps({
+        'homeworks': [
+            {'id': index, 'homework_name': f'user__hw{index}.zip',
+             'status': STATUSES[index % len(STATUSES)],
+             'date_updated': '2023-03-01T10:00:00Z'}
+            for index in range(homeworks)
+        ],
+        'current_date': 1677600000,
+    }).encode()
+
+
+def run_shard(node, nodes, tenants, homeworks):
+    """Опрос подписчиков одного узла, возвращает их число."""
+    registry = TenantRegistry(
+        Tenant(token=f'token-{index}', chat_id=str(index))
+        for index in range(tenants)
+    )
+    shard = shard_registry(registry, HashRing(nodes), node)
+    session = CannedSession(response_body(homeworks))
+    bot = NullBot()
+    for tenant in shard:
+        poll_tenant(bot, tenant, session)
+    return len(shard)
+
+
+def measure(workers, tenants, homeworks):
+    """Время опроса всех подписчиков на workers процессах."""
+    nodes = [shard_name(index) for index in range(workers)]
+    with ProcessPoolExecutor(workers) as executor:
+        executor.submit(time.sleep, 0).result()
+        started = time.perf_counter()
+        polled = sum(executor.map(
+            run_shard, nodes, [nodes] * workers,
+            [tenants] * workers, [homeworks] * workers,
+        ))
+        elapsed = time.perf_counter() - started
+    assert polled == tenants
+    return elapsed
+
+
+def main():
+    """Замер на 1, 2, 4… процессах до числа ядер."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--tenants', type=int, default=2000)
+    parser.add_argument('--homeworks', type=int, default=50)
+    parser.add_argument('--max-workers', type=int,
+                        default=os.cpu_count() or 1)
+    args = parser.parse_args()
+    workers = 1
+    baseline = None
+    while workers <= args.max_workers:
+        elapsed = measure(workers, args.tenants, args.homeworks)
+        baseline = baseline or elapsed
+        print(f'workers={workers:<3} elapsed={elapsed:.2f}s '
+              f'polls/sec={args.tenants / elapsed:.0f} '
+              f'speedup={baseline / elapsed:.2f}')
+        workers *= 2
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""Пиковая память при разборе большого ответа: целиком и потоком.
+
+Каждый режим запускается в отдельном процессе, чтобы пики не
+смешивались. Запуск: python -m benchmarks.streaming_memory
+"""
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+
+import homework
+from benchmarks.fake_practicum import start_server
+from streaming import stream_homeworks
+
+HEADERS = {'Authorization': 'OAuth token'}
+
+
+def make_body(count):
+    """Синтетический ответ с count работами."""
+    statuses = list(homework.HOMEWORK_VERDICTS)
+    return json.dumps({
+        'homeworks': [
+            {'id': index, 'homework_name': f'student__hw{index}.zip',
+             'status': statuses[index % len(statuses)],
+             'reviewer_comment': 'Отличная работа, ' * 5,
+             'date_updated': '2023-03-01T10:00:00Z',
+             'lesson_name': 'Итоговый проект'}
+            for index in range(count)
+        ],
+        'current_date': int(time.time()),
+    }, ensure_ascii=False).encode()
+
+
+def peak_rss_mb():
+    """Пиковый RSS процесса в мегабайтах."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def child(mode, url):
+    """Разбор ответа в дочернем процессе; печатает прирост пика RSS."""
+    homework.ENDPOINT = url
+    baseline = peak_rss_mb()
+    started = time.perf_counter()
+    if mode == 'json':
+        response = homework.fetch_homeworks(1, HEADERS)
+        homeworks = homework.check_response(response)
+    else:
+        homeworks = stream_homeworks(1, HEADERS)
+    count = sum(1 for item in homeworks if homework.parse_status(item))
+    elapsed = time.perf_counter() - started
+    print(f'{mode:>6}: homeworks={count} '
+          f'peak RSS +{peak_rss_mb() - baseline:.1f} MB, {elapsed:.2f}s')
+
+
+def main():
+    """Запуск сервера и дочерних процессов для каждого размера."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--homeworks', type=int, nargs='+',
+                        default=[10000, 100000, 300000])
+    parser.add_argument('--child', nargs=2, metavar=('MODE', 'URL'))
+    args = parser.parse_args()
+    if args.child:
+        child(*args.child)
+        return
+    server, url = start_server()
+    for count in args.homeworks:
+        server.body = make_body(count)
+        print(f'body={len(server.body) / 2 ** 20:.1f} MB')
+        for mode in ('json', 'stream'):
+            subprocess.run([sys.executable, '-m', __spec__.name,
+                            '--child', mode, url], check=True)
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""Пропускная способность опроса множества подписчиков.
+
+Запуск: python -m benchmarks.tenants_throughput --tenants 10000
+С --workers N опрос идёт в пуле из N потоков (см. WorkerPool),
+--latency задаёт задержку ответа заглушки в секундах.
+"""
+import argparse
+import time
+
+import homework
+from benchmarks.fake_practicum import start_server
+from scheduler import Scheduler
+from tenants import Tenant, TenantRegistry
+from workers import WorkerPool
+
+
+class NullBot:
+    """Бот, который никуда не отправляет сообщения."""
+
+    def send_message(self, chat_id=None, text=None, **kwargs):
+        """Отправка без сети."""
+
+
+def run(tenants, workers=0, latency=0):
+    """Один полный проход планировщика по реестру."""
+    server, url = start_server()
+    server.latency = latency
+    homework.ENDPOINT = url
+    pool = WorkerPool(workers) if workers else None
+    registry = TenantRegistry(
+        Tenant(token=f'token-{index}', chat_id=str(index))
+        for index in range(tenants)
+    )
+    scheduler = Scheduler(registry, NullBot(), period=0, pool=pool,
+                          deadline=3600)
+    started = time.perf_counter()
+    polled = scheduler.run_pending()
+    elapsed = time.perf_counter() - started
+    if pool is not None:
+        pool.shutdown()
+    server.shutdown()
+    return polled, elapsed
+
+
+def main():
+    """Разбор аргументов и вывод результата."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--tenants', type=int, default=10000)
+    parser.add_argument('--workers', type=int, default=0)
+    parser.add_argument('--latency', type=float, default=0)
+    args = parser.parse_args()
+    polled, elapsed = run(args.tenants, args.workers, args.latency)
+    print(f'tenants={polled} elapsed={elapsed:.2f}s '
+          f'polls/sec={polled / elapsed:.0f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""Скорость проверки ответа: прежняя цепочка проверок и схема.
+
+Запуск: python -m benchmarks.validation --homeworks 10000
+"""
+import argparse
+import timeit
+
+from homework import (HOMEWORK_VERDICTS, validate_homeworks,
+                      validate_response)
+
+
+def legacy_check_response(response):
+    """Проверка ответа в прежнем виде."""
+    if not isinstance(response, dict):
+        raise TypeError('Ответ пришел не в виде словаря.')
+    if 'homeworks' not in response:
+        raise KeyError('В ответе нет ключа homeworks')
+    if 'current_date' not in response:
+        raise KeyError('В ответе нет ключа current_date')
+    homeworks = response['homeworks']
+    if not isinstance(homeworks, list):
+        raise TypeError('Домашние работы приходят не в виде списка')
+    return homeworks
+
+
+def legacy_check_homework(homework):
+    """Проверки из прежнего parse_status."""
+    if 'homework_name' not in homework:
+        raise KeyError('Отсутствует "homework_name" в  API')
+    if 'status' not in homework:
+        raise KeyError('Отсутствует "status" в  API')
+    if homework['status'] not in HOMEWORK_VERDICTS:
+        raise KeyError('Не проверенный статус в  API')
+
+
+def legacy(response):
+    """Прежние проверки ответа и каждой работы."""
+    for homework in legacy_check_response(response):
+        legacy_check_homework(homework)
+
+
+def compiled(response):
+    """Проверки скомпилированными валидаторами."""
+    return validate_response(response) or validate_homeworks(
+        response['homeworks']
+    )
+
+
+def main():
+    """Сравнение на синтетическом ответе."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--homeworks', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+    statuses = list(HOMEWORK_VERDICTS)
+    response = {
+        'homeworks': [
+            {'id': index, 'homework_name': f'hw{index}',
+             'status': statuses[index % len(statuses)],
+             'date_updated': '2023-03-01T10:00:00Z'}
+            for index in range(args.homeworks)
+        ],
+        'current_date': 1677600000,
+    }
+    for name, func in (('legacy', legacy), ('compiled', compiled)):
+        best = min(timeit.repeat(lambda: func(response),
+                                 number=1, repeat=args.repeat))
+        print(f'{name:>9}: {best * 1000:.2f} ms '
+              f'({best / args.homeworks * 1e9:.0f} ns/homework)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,219 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from environment import seed
+from transitions import StatusTracker
+
+seed()
+
+CHECKPOINT_PATH = os.getenv('CHECKPOINT_PATH')
+CHECKPOINT_BATCH = int(os.getenv('CHECKPOINT_BATCH', 500))
+CHECKPOINT_INTERVAL = float(os.getenv('CHECKPOINT_INTERVAL', 5))
+SQLITE_SUFFIXES = ('.db', '.sqlite', '.sqlite3')
+
+
+def checkpoint_key(token, chat_id):
+    """Ключ подписчика в хранилище; сам токен на диск не попадает."""
+    return hashlib.blake2b(
+        f'{token}:{chat_id}'.encode(), digest_size=16
+    ).hexdigest()
+
+
+def snapshot(from_date, tracker, due=None):
+    """Состояние для сохранения: курсор, статусы работ, время опроса."""
+    state = {
+        'from_date': from_date,
+        'homeworks': [
+            [key, status, updated]
+            for key, (status, updated) in tracker.state.items()
+        ],
+    }
+    if due is not None:
+        state['due'] = due
+    return state
+
+
+def restore(state):
+    """Курсор и StatusTracker из сохранённого состояния."""
+    if not state:
+        return int(time.time()), StatusTracker()
+    return state['from_date'], StatusTracker({
+        key: (status, updated) for key, status, updated in state['homeworks']
+    })
+
+
+def due_in(state, now=None):
+    """Секунд до сохранённого времени следующего опроса, не меньше 0."""
+    if not state or state.get('due') is None:
+        return 0
+    return max(0, state['due'] - (time.time() if now is None else now))
+
+
+class CheckpointStore:
+    """Хранилище курсоров и отправленных статусов.
+
+    save только запоминает состояние в памяти; на диск оно попадает
+    пачкой при flush, который вызывается явно или из maybe_flush,
+    когда накопилось batch_size записей или прошло interval секунд.
+    """
+
+    def __init__(self, batch_size=CHECKPOINT_BATCH,
+                 interval=CHECKPOINT_INTERVAL):
+        """Параметры пакетной записи."""
+        self.batch_size = batch_size
+        self.interval = interval
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._flushed_at = time.monotonic()
+
+    def load(self, key):
+        """Состояние одного подписчика или None."""
+        return self.load_all().get(key)
+
+    def load_all(self):
+        """Состояния всех подписчиков, включая ещё не записанные."""
+        return {}
+
+    def save(self, key, state):
+        """Запоминание состояния до следующего flush."""
+        with self._lock:
+            self._pending[key] = state
+
+    def maybe_flush(self):
+        """Запись на диск, если пора по размеру пачки или по времени."""
+        if (len(self._pending) >= self.batch_size
+                or time.monotonic() - self._flushed_at >= self.interval):
+            self.flush()
+
+    def flush(self):
+        """Запись всех накопленных состояний одной пачкой."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._flushed_at = time.monotonic()
+            if pending:
+                self._write(pending)
+
+    def _write(self, pending):
+        """Запись пачки в конкретное хранилище."""
+
+    def close(self):
+        """Сброс накопленного и закрытие хранилища."""
+        self.flush()
+
+
+class SQLiteCheckpointStore(CheckpointStore):
+    """Хранилище в SQLite: одна транзакция на пачку, журнал WAL."""
+
+    def __init__(self, path, **kwargs):
+        """Открытие базы и создание таблицы."""
+        super().__init__(**kwargs)
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.execute(
+            'CREATE TABLE IF NOT EXISTS checkpoints '
+            '(key TEXT PRIMARY KEY, state TEXT NOT NULL)'
+        )
+        self.connection.commit()
+
+    def load_all(self):
+        """Состояния всех подписчиков, включая ещё не записанные."""
+        with self._lock:
+            rows = self.connection.execute(
+                'SELECT key, state FROM checkpoints'
+            ).fetchall()
+            pending = dict(self._pending)
+        states = {key: json.loads(state) for key, state in rows}
+        states.update(pending)
+        return states
+
+    def _write(self, pending):
+        """Upsert пачки в одной транзакции."""
+        with self.connection:
+            self.connection.executemany(
+                'INSERT INTO checkpoints (key, state) VALUES (?, ?) '
+                'ON CONFLICT(key) DO UPDATE SET state = excluded.state',
+                [(key, json.dumps(state)) for key, state in pending.items()],
+            )
+
+    def close(self):
+        """Сброс накопленного и закрытие соединения."""
+        super().close()
+        self.connection.close()
+
+
+class FileCheckpointStore(CheckpointStore):
+    """Журнал JSON-строк только на дозапись, один fsync на пачку.
+
+    При открытии журнал перечитывается (побеждает последняя запись)
+    и сжимается, если устаревших строк больше, чем актуальных или
+    если в нём есть повреждённые строки, например оборванная при сбое
+    последняя: иначе следующая запись склеилась бы с ней и пропала.
+    """
+
+    def __init__(self, path, **kwargs):
+        """Чтение журнала и открытие на дозапись."""
+        super().__init__(**kwargs)
+        self.path = path
+        self._states = {}
+        lines = 0
+        damaged = False
+        if os.path.exists(path):
+            with open(path, encoding='UTF-8') as file:
+                for line in file:
+                    try:
+                        key, state = json.loads(line)
+                    except ValueError:
+                        damaged = True
+                        continue
+                    damaged = damaged or not line.endswith('\n')
+                    self._states[key] = state
+                    lines += 1
+        if damaged or lines > 2 * len(self._states):
+            self._compact()
+        self.file = open(path, 'a', encoding='UTF-8')
+
+    def _compact(self):
+        """Перезапись журнала только актуальными состояниями."""
+        temporary = f'{self.path}.tmp'
+        with open(temporary, 'w', encoding='UTF-8') as file:
+            for key, state in self._states.items():
+                file.write(json.dumps([key, state]) + '\n')
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary, self.path)
+
+    def load_all(self):
+        """Состояния всех подписчиков, включая ещё не записанные."""
+        with self._lock:
+            return {**self._states, **self._pending}
+
+    def _write(self, pending):
+        """Дозапись пачки и один fsync."""
+        self.file.write(''.join(
+            json.dumps([key, state]) + '\n' for key, state in pending.items()
+        ))
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self._states.update(pending)
+
+    def close(self):
+        """Сброс накопленного и закрытие файла."""
+        super().close()
+        self.file.close()
+
+
+def open_store(path=CHECKPOINT_PATH, **kwargs):
+    """Хранилище по пути: .db/.sqlite — SQLite, иначе журнал.
+
+    Без пути возвращается хранилище, которое ничего не сохраняет.
+    """
+    if not path:
+        return CheckpointStore(**kwargs)
+    if path.endswith(SQLITE_SUFFIXES):
+        return SQLiteCheckpointStore(path, **kwargs)
+    return FileCheckpointStore(path, **kwargs)
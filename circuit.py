@@ -0,0 +1,130 @@
+import os
+import threading
+import time
+
+from exceptions import CircuitOpenError, is_retryable
+
+FAILURE_THRESHOLD = int(os.getenv('CIRCUIT_FAILURE_THRESHOLD', 3))
+RESET_TIMEOUT = float(os.getenv('CIRCUIT_RESET_TIMEOUT', 1800))
+REPORT_WINDOW = float(os.getenv('ERROR_REPORT_WINDOW', 3600))
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half-open'
+
+
+class CircuitBreaker:
+    """Автомат closed → open → half-open вокруг запросов к эндпойнту.
+
+    После threshold сбоев подряд запросы не выполняются reset_timeout
+    секунд, затем пропускается один пробный: успех закрывает цепь,
+    сбой снова открывает её. Учитываются только временные сбои
+    (см. is_retryable): отказ в авторизации или неверный ответ
+    не означают недоступность эндпойнта.
+    """
+
+    def __init__(self, threshold=FAILURE_THRESHOLD,
+                 reset_timeout=RESET_TIMEOUT, clock=time.monotonic):
+        """Цепь в закрытом состоянии."""
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """Можно ли сейчас выполнить запрос."""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if (self.state == OPEN
+                    and self.clock() - self.opened_at >= self.reset_timeout):
+                self.state = HALF_OPEN
+                return True
+            return False
+
+    def record_success(self):
+        """Успешный запрос закрывает цепь."""
+        with self._lock:
+            self.state = CLOSED
+            self.failures = 0
+
+    def record_failure(self):
+        """Сбой; при достижении порога или в half-open цепь открывается."""
+        with self._lock:
+            self.failures += 1
+            if self.state == HALF_OPEN or self.failures >= self.threshold:
+                self.state = OPEN
+                self.opened_at = self.clock()
+
+    def record_error(self, error):
+        """Учёт исключения: сбоем считается только временная ошибка."""
+        if is_retryable(error):
+            self.record_failure()
+        elif self.state == HALF_OPEN:
+            self.record_success()
+
+    def call(self, func, *args, **kwargs):
+        """Вызов func через цепь; при открытой цепи — CircuitOpenError."""
+        if not self.allow():
+            raise CircuitOpenError(failures=self.failures)
+        try:
+            result = func(*args, **kwargs)
+        except Exception as error:
+            self.record_error(error)
+            raise
+        self.record_success()
+        return result
+
+    async def call_async(self, func, *args, **kwargs):
+        """То же, что call, для корутины func."""
+        if not self.allow():
+            raise CircuitOpenError(failures=self.failures)
+        try:
+            result = await func(*args, **kwargs)
+        except Exception as error:
+            self.record_error(error)
+            raise
+        self.record_success()
+        return result
+
+
+ENDPOINT_BREAKER = CircuitBreaker()
+
+
+def endpoint_breaker():
+    """Общая цепь эндпойнта для всех токенов процесса.
+
+    Недоступность эндпойнта (сеть, 5xx, 429) не зависит от токена,
+    поэтому после threshold сбоев подряд приостанавливаются запросы
+    всех подписчиков, а пробный запрос в half-open один на процесс.
+    Отказ в авторизации цепь не размыкает: его обрабатывает карантин
+    токена.
+    """
+    return ENDPOINT_BREAKER
+
+
+class ErrorReporter:
+    """Сообщения об ошибках не чаще раза в window секунд на класс ошибки."""
+
+    def __init__(self, window=REPORT_WINDOW, clock=time.monotonic):
+        """Пустая история отправленных ошибок."""
+        self.window = window
+        self.clock = clock
+        self._reported = {}
+
+    def should_report(self, error):
+        """Нужно ли сообщать об ошибке в чат."""
+        key = type(error)
+        now = self.clock()
+        reported_at = self._reported.get(key)
+        if reported_at is not None and now - reported_at < self.window:
+            return False
+        self._reported[key] = now
+        return True
+
+    def reset(self):
+        """Забыть отправленные ошибки, например после восстановления."""
+        self._reported.clear()
@@ -0,0 +1,190 @@
+"""Настройки и проверка токенов.
+
+Настройки собираются из трёх источников: JSON-файла CONFIG_FILE,
+.env и окружения; при совпадении ключей побеждает окружение. Набор
+читается один раз и кешируется до reload_config.
+
+Токены Практикума проверяются при запуске одним дешёвым запросом на
+токен, параллельно для всех подписчиков. Результаты хранятся в
+TokenCache, поэтому перезапуск не повторяет проверку. Подписчик с
+отвергнутым токеном попадает на карантин: его опрашивают раз в
+QUARANTINE_INTERVAL, а не каждый цикл.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+import telegram
+from dotenv import dotenv_values
+
+import environment
+from exceptions import BotError, HTTPStatusError
+from homework import request_homeworks
+
+CONFIG_FILE = os.getenv('CONFIG_FILE')
+PROBE_WORKERS = 16
+
+logger = logging.getLogger(__name__)
+
+
+def load_config(path=CONFIG_FILE, dotenv_path=None):
+    """Настройки из файла, .env и окружения.
+
+    Без dotenv_path .env ищется так же, как в load_dotenv.
+    """
+    values = {}
+    if path:
+        with open(path, encoding='UTF-8') as file:
+            values.update(json.load(file))
+    values.update(
+        (key, value) for key, value in dotenv_values(dotenv_path).items()
+        if value is not None
+    )
+    values.update(environment.real_environ())
+    return values
+
+
+@lru_cache(maxsize=1)
+def get_config():
+    """Настройки процесса, читаются при первом обращении."""
+    return load_config()
+
+
+def reload_config():
+    """Сброс кеша настроек, например по SIGHUP.
+
+    Ключи, скопированные из .env в окружение при запуске, обновляются
+    по текущему .env (см. environment.seed).
+    """
+    environment.seed()
+    get_config.cache_clear()
+    return get_config()
+
+
+def setting(name, default=None, kind=str):
+    """Одна настройка, приведённая к типу kind."""
+    value = get_config().get(name)
+    if value is None or value == '':
+        return default
+    return kind(value)
+
+
+QUARANTINE_INTERVAL = setting('TOKEN_QUARANTINE_INTERVAL', 6 * 3600, float)
+TOKEN_CACHE_TTL = setting('TOKEN_CACHE_TTL', 24 * 3600, float)
+TOKEN_CACHE_PATH = setting('TOKEN_CACHE_PATH')
+
+
+def token_digest(token):
+    """Ключ токена в кеше; сам токен на диск не попадает."""
+    return hashlib.blake2b(token.encode(), digest_size=16).hexdigest()
+
+
+class TokenCache:
+    """Результаты проверки токенов со сроком годности ttl.
+
+    С path результаты переживают перезапуск: файл перезаписывается
+    целиком при save.
+    """
+
+    def __init__(self, path=TOKEN_CACHE_PATH, ttl=TOKEN_CACHE_TTL,
+                 clock=time.time):
+        """Загрузка сохранённых результатов."""
+        self.path = path
+        self.ttl = ttl
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._entries = {}
+        if path and os.path.exists(path):
+            with open(path, encoding='UTF-8') as file:
+                self._entries = json.load(file)
+
+    def get(self, token):
+        """True или False для проверенного токена, None — пора проверять."""
+        entry = self._entries.get(token_digest(token))
+        if entry is None or self.clock() - entry['checked'] > self.ttl:
+            return None
+        return entry['valid']
+
+    def put(self, token, valid):
+        """Запоминание результата проверки."""
+        with self._lock:
+            self._entries[token_digest(token)] = {
+                'valid': valid, 'checked': self.clock(),
+            }
+
+    def save(self):
+        """Запись на диск, если задан path."""
+        if not self.path:
+            return
+        with self._lock:
+            data = json.dumps(self._entries)
+        temporary = f'{self.path}.tmp'
+        with open(temporary, 'w', encoding='UTF-8') as file:
+            file.write(data)
+        os.replace(temporary, self.path)
+
+
+def probe_token(tenant, session=None):
+    """Проверка токена одним запросом с from_date = сейчас.
+
+    True — токен принят, False — отвергнут (401 или 403), None —
+    проверить не удалось: сеть, 5xx или лимит запросов.
+    """
+    try:
+        request_homeworks(int(time.time()), tenant.headers, session)
+    except HTTPStatusError as error:
+        if error.auth_failed:
+            return False
+        return None
+    except BotError:
+        return None
+    return True
+
+
+def validate_tenants(registry, session=None, cache=None,
+                     workers=PROBE_WORKERS, probe=probe_token):
+    """Проверка токенов подписчиков и карантин для отвергнутых.
+
+    Токены из cache не проверяются повторно, остальные проверяются
+    параллельно в workers потоках. Возвращает список подписчиков на
+    карантине.
+    """
+    cache = cache if cache is not None else TokenCache()
+    unknown = []
+    for tenant in registry:
+        valid = cache.get(tenant.token)
+        if valid is None:
+            unknown.append(tenant)
+        else:
+            tenant.quarantined = not valid
+    if unknown:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(lambda item: probe(item, session), unknown)
+            for tenant, valid in zip(unknown, results):
+                if valid is not None:
+                    cache.put(tenant.token, valid)
+                tenant.quarantined = valid is False
+        cache.save()
+    quarantined = [tenant for tenant in registry if tenant.quarantined]
+    for tenant in quarantined:
+        logger.warning('Токен чата %s отвергнут, подписчик на карантине',
+                       tenant.chat_id)
+    logger.info('Проверено токенов %s, на карантине %s',
+                len(unknown), len(quarantined))
+    return quarantined
+
+
+def check_bot(bot):
+    """Проверка токена бота через getMe; False, если токен отвергнут."""
+    try:
+        bot.get_me()
+    except (telegram.error.InvalidToken, telegram.error.Unauthorized):
+        return False
+    except telegram.TelegramError as error:
+        logger.warning('Токен бота не проверен: %s', error)
+    return True
@@ -0,0 +1,100 @@
+"""Сроки опроса и таймауты запросов.
+
+Цикл опроса получает бюджет времени (Deadline), таймауты запроса к
+Практикуму и отправки в Telegram берутся из его остатка. Текущий срок
+хранится в контекстной переменной, поэтому доходит до запроса через
+любые обёртки (CircuitBreaker, ResponseCache, пул потоков) без
+лишних параметров. Вне deadline_scope действуют обычные таймауты.
+"""
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from exceptions import DeadlineExceededError
+from metrics import REGISTRY
+
+CONNECT_TIMEOUT = float(os.getenv('CONNECT_TIMEOUT', 3.05))
+READ_TIMEOUT = float(os.getenv('READ_TIMEOUT', 20))
+SEND_TIMEOUT = float(os.getenv('SEND_TIMEOUT', 10))
+MIN_TIMEOUT = float(os.getenv('MIN_TIMEOUT', 1))
+POLL_DEADLINE = float(os.getenv('POLL_DEADLINE', 60))
+
+OVERRUNS = REGISTRY.counter(
+    'homework_deadline_overruns', 'Шаги опроса, не уложившиеся в срок.',
+    labelname='stage',
+)
+
+_current = ContextVar('deadline', default=None)
+
+
+class Deadline:
+    """Момент, к которому шаг опроса должен завершиться."""
+
+    __slots__ = ('expires', 'clock')
+
+    def __init__(self, expires, clock=time.monotonic):
+        """Срок expires по часам clock."""
+        self.expires = expires
+        self.clock = clock
+
+    @classmethod
+    def after(cls, budget, clock=time.monotonic):
+        """Срок через budget секунд от текущего момента."""
+        return cls(clock() + budget, clock)
+
+    def remaining(self):
+        """Оставшиеся секунды, отрицательные после срока."""
+        return self.expires - self.clock()
+
+
+@contextmanager
+def deadline_scope(deadline):
+    """Срок deadline для всех запросов внутри блока with."""
+    token = _current.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current.reset(token)
+
+
+def current_deadline():
+    """Срок текущего цикла или None вне deadline_scope."""
+    return _current.get()
+
+
+def time_left():
+    """Секунды до срока текущего цикла или None вне deadline_scope."""
+    deadline = _current.get()
+    return None if deadline is None else deadline.remaining()
+
+
+def request_timeout(stage='api'):
+    """Таймауты (connect, read) запроса из остатка срока.
+
+    Если срок уже прошёл, запрос не отправляется: превышение
+    учитывается в метрике и поднимается DeadlineExceededError.
+    """
+    deadline = _current.get()
+    if deadline is None:
+        return CONNECT_TIMEOUT, READ_TIMEOUT
+    remaining = deadline.remaining()
+    if remaining <= 0:
+        OVERRUNS.inc(stage)
+        raise DeadlineExceededError(stage=stage, overrun=-remaining)
+    return min(CONNECT_TIMEOUT, remaining), min(READ_TIMEOUT, remaining)
+
+
+def send_timeout(stage='send'):
+    """Таймаут отправки в Telegram из остатка срока.
+
+    Уведомление отправляется и после срока, но не дольше
+    MIN_TIMEOUT: пропущенный статус хуже опоздавшего.
+    """
+    deadline = _current.get()
+    if deadline is None:
+        return SEND_TIMEOUT
+    remaining = deadline.remaining()
+    if remaining <= 0:
+        OVERRUNS.inc(stage)
+    return max(MIN_TIMEOUT, min(SEND_TIMEOUT, remaining))
@@ -0,0 +1,235 @@
+import heapq
+import logging
+import os
+import statistics
+import threading
+import time
+from collections import deque
+
+import telegram
+
+from deadlines import SEND_TIMEOUT
+from metrics import ERRORS, MESSAGES_SENT, REGISTRY, SEND_LATENCY
+
+PER_CHAT_INTERVAL = float(os.getenv('TELEGRAM_PER_CHAT_INTERVAL', 1))
+GLOBAL_RATE = float(os.getenv('TELEGRAM_GLOBAL_RATE', 30))
+RETRY_BASE = float(os.getenv('TELEGRAM_RETRY_BASE', 1))
+RETRY_MAX = float(os.getenv('TELEGRAM_RETRY_MAX', 60))
+MESSAGE_LIMIT = 4096
+SEPARATOR = '\n\n'
+
+QUEUE_DEPTH = REGISTRY.gauge(
+    'homework_delivery_queue_depth', 'Сообщения в очереди отправки.'
+)
+QUEUE_LATENCY = REGISTRY.histogram(
+    'homework_delivery_queue_seconds',
+    'Время от постановки сообщения в очередь до отправки.',
+)
+
+logger = logging.getLogger(__name__)
+
+
+def is_transient(error):
+    """Сбой сети или таймаут: пачку стоит отправить ещё раз.
+
+    BadRequest в python-telegram-bot наследует NetworkError, но
+    повтор ему не поможет.
+    """
+    return (isinstance(error, telegram.error.NetworkError)
+            and not isinstance(error, telegram.error.BadRequest))
+
+
+class DeliveryQueue:
+    """Очередь исходящих сообщений с учётом лимитов Telegram.
+
+    Сообщения в один чат уходят не чаще раза в per_chat_interval
+    секунд, все вместе — не чаще global_rate в секунду. Накопившиеся
+    за это время сообщения одного чата склеиваются в одно. На
+    RetryAfter сообщения возвращаются в начало очереди чата, на сбой
+    сети или таймаут — тоже, с паузой от RETRY_BASE, удваивающейся до
+    RETRY_MAX. Остальные ошибки Telegram пачку отбрасывают.
+    Подставляется вместо бота: send_message только ставит в очередь.
+    """
+
+    queued = True
+
+    def __init__(self, bot, per_chat_interval=PER_CHAT_INTERVAL,
+                 global_rate=GLOBAL_RATE, clock=time.monotonic):
+        """Очередь поверх настоящего бота."""
+        self.bot = bot
+        self.per_chat_interval = per_chat_interval
+        self.global_interval = 1 / global_rate
+        self.clock = clock
+        self._pending = {}
+        self._ready = []
+        self._scheduled = set()
+        self._next_allowed = {}
+        self._next_global = 0.0
+        self._condition = threading.Condition()
+        self._thread = None
+        self._running = False
+        self._latencies = deque(maxlen=1000)
+        self._attempts = {}
+        self.sent = 0
+        self.merged = 0
+        self.retries = 0
+        self.failures = 0
+
+    def send_message(self, chat_id=None, text=None, **kwargs):
+        """Постановка сообщения в очередь чата."""
+        with self._condition:
+            self._pending.setdefault(chat_id, deque()).append(
+                (self.clock(), text)
+            )
+            QUEUE_DEPTH.inc(amount=1)
+            if chat_id not in self._scheduled:
+                self._scheduled.add(chat_id)
+                ready_at = max(self.clock(),
+                               self._next_allowed.get(chat_id, 0.0))
+                heapq.heappush(self._ready, (ready_at, chat_id))
+            self._condition.notify()
+
+    def depth(self):
+        """Сколько сообщений ждут отправки."""
+        with self._condition:
+            return sum(len(messages) for messages in self._pending.values())
+
+    def stats(self):
+        """Глубина очереди, счётчики и задержка отправки в секундах."""
+        latencies = list(self._latencies)
+        return {
+            'depth': self.depth(),
+            'sent': self.sent,
+            'merged': self.merged,
+            'retries': self.retries,
+            'failures': self.failures,
+            'latency_p50': statistics.median(latencies) if latencies else 0,
+            'latency_max': max(latencies) if latencies else 0,
+        }
+
+    def _take_batch(self, chat_id):
+        """Склейка ожидающих сообщений чата в пределах MESSAGE_LIMIT."""
+        messages = self._pending[chat_id]
+        batch = [messages.popleft()]
+        length = len(batch[0][1])
+        while messages and (length + len(SEPARATOR) + len(messages[0][1])
+                            <= MESSAGE_LIMIT):
+            batch.append(messages.popleft())
+            length += len(SEPARATOR) + len(batch[-1][1])
+        return batch
+
+    def _next_batch(self):
+        """Следующая пачка, которую уже можно отправить, и время ожидания."""
+        now = self.clock()
+        if not self._ready:
+            return None, None
+        ready_at = max(self._ready[0][0], self._next_global)
+        if ready_at > now:
+            return None, ready_at - now
+        _, chat_id = heapq.heappop(self._ready)
+        self._next_global = now + self.global_interval
+        self._next_allowed[chat_id] = now + self.per_chat_interval
+        return (chat_id, self._take_batch(chat_id)), None
+
+    def _requeue(self, chat_id, batch, delay):
+        """Возврат пачки в начало очереди чата для повтора."""
+        self._pending[chat_id].extendleft(reversed(batch))
+        self._next_allowed[chat_id] = self.clock() + delay
+
+    def _reschedule(self, chat_id):
+        """Повторная постановка чата, если у него остались сообщения."""
+        if self._pending[chat_id]:
+            heapq.heappush(self._ready, (self._next_allowed[chat_id], chat_id))
+        else:
+            del self._pending[chat_id]
+            self._scheduled.discard(chat_id)
+
+    def _backoff(self, chat_id):
+        """Пауза перед повтором после сбоя сети, растёт с каждым сбоем."""
+        attempts = self._attempts.get(chat_id, 0)
+        self._attempts[chat_id] = attempts + 1
+        return min(RETRY_MAX, RETRY_BASE * 2 ** attempts)
+
+    def _deliver(self, chat_id, batch):
+        """Отправка пачки одним сообщением."""
+        text = SEPARATOR.join(text for _, text in batch)
+        try:
+            with SEND_LATENCY.time():
+                self.bot.send_message(chat_id=chat_id, text=text,
+                                      timeout=SEND_TIMEOUT)
+        except telegram.error.RetryAfter as error:
+            ERRORS.inc(type(error).__name__)
+            self.retries += 1
+            logger.warning(f'Лимит Telegram, повтор через '
+                           f'{error.retry_after} с')
+            with self._condition:
+                self._requeue(chat_id, batch, error.retry_after)
+        except telegram.TelegramError as error:
+            ERRORS.inc(type(error).__name__)
+            if is_transient(error):
+                self.retries += 1
+                delay = self._backoff(chat_id)
+                logger.warning(f'Сбой сети при отправке, повтор через '
+                               f'{delay:.0f} с: {error}')
+                with self._condition:
+                    self._requeue(chat_id, batch, delay)
+            else:
+                self.failures += 1
+                QUEUE_DEPTH.inc(amount=-len(batch))
+                logger.error(
+                    f'При отправке сообщения возникла ошибка: {error}'
+                )
+        else:
+            self._sent(chat_id, batch)
+        with self._condition:
+            self._reschedule(chat_id)
+
+    def _sent(self, chat_id, batch):
+        """Учёт отправленной пачки: счётчики и задержка в очереди."""
+        self._attempts.pop(chat_id, None)
+        MESSAGES_SENT.inc(amount=len(batch))
+        QUEUE_DEPTH.inc(amount=-len(batch))
+        self.sent += 1
+        self.merged += len(batch) - 1
+        now = self.clock()
+        for queued, _ in batch:
+            self._latencies.append(now - queued)
+            QUEUE_LATENCY.observe(now - queued)
+        logger.debug('Сообщение отправлено успешно')
+
+    def dispatch_ready(self):
+        """Отправка всего, что уже можно отправить; время до следующего."""
+        while True:
+            with self._condition:
+                item, wait = self._next_batch()
+            if item is None:
+                return wait
+            self._deliver(*item)
+
+    def _run(self):
+        """Цикл фонового диспетчера."""
+        while True:
+            wait = self.dispatch_ready()
+            with self._condition:
+                if not self._running and not self._scheduled:
+                    break
+                if wait is None and self._ready:
+                    continue
+                self._condition.wait(wait)
+
+    def start(self):
+        """Запуск диспетчера в фоновом потоке."""
+        self._running = True
+        self._thread = threading.Thread(
+            target=self._run, name='delivery', daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        """Остановка с отправкой всего, что осталось в очереди."""
+        with self._condition:
+            self._running = False
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
@@ -0,0 +1,41 @@
+"""Переменные окружения и файл .env.
+
+load_dotenv копирует .env в os.environ, после чего значение из .env
+не отличить от настоящей переменной окружения, и перечитывание
+настроек видит старое значение. seed копирует .env так же, но
+запоминает скопированные ключи: повторный seed обновляет их по новому
+.env, а real_environ возвращает только настоящее окружение.
+"""
+import os
+
+from dotenv import dotenv_values
+
+SEEDED = {}
+
+
+def seed(dotenv_path=None):
+    """Копирование .env в os.environ; настоящие переменные не меняются.
+
+    Ключи из прошлого seed берутся из нового .env, удалённые из .env
+    убираются из окружения. Возвращает значения из .env.
+    """
+    values = {
+        key: value for key, value in dotenv_values(dotenv_path).items()
+        if value is not None
+    }
+    for key in [key for key in SEEDED if key not in values]:
+        if os.environ.get(key) == SEEDED.pop(key):
+            del os.environ[key]
+    for key, value in values.items():
+        if key in os.environ and os.environ[key] != SEEDED.get(key):
+            continue
+        os.environ[key] = SEEDED[key] = value
+    return values
+
+
+def real_environ():
+    """Переменные окружения без скопированных из .env."""
+    return {
+        key: value for key, value in os.environ.items()
+        if key not in SEEDED or SEEDED[key] != value
+    }
@@ -1,5 +1,127 @@
+from http import HTTPStatus
 
-class NoCurrentDateKeyInResponseError(Exception):
+
+class BotError(Exception):
+    """Базовая ошибка бота.
+
+    Поля хранятся как атрибуты, текст собирается из template только
+    при выводе ошибки в лог или в чат.
+    """
+
+    template = 'Сбой в работе бота'
+    retryable = False
+
+    def __init__(self, **fields):
+        """Сохранение полей ошибки без форматирования текста."""
+        super().__init__()
+        self.__dict__.update(fields)
+
+    def __str__(self):
+        """Текст ошибки."""
+        return self.template.format(**self.__dict__)
+
+
+class EndpointError(BotError):
+    """Сбой при запросе к эндпойнту."""
+
+    template = 'Сбой при запросе к эндпойнту'
+
+
+class TransportError(EndpointError):
+    """Сетевая ошибка: соединение, TLS, таймаут."""
+
+    template = 'Сбой при запросе к эндпойнту: {cause}'
+    retryable = True
+
+
+class RequestTimeoutError(TransportError):
+    """Эндпойнт не ответил за отведённый таймаут."""
+
+    template = 'Эндпойнт не ответил за {timeout} с: {cause}'
+
+
+class HTTPStatusError(EndpointError):
+    """Эндпойнт ответил кодом, отличным от 200."""
+
+    template = 'Недоступность эндпойнта {status_code}'
+    retry_after = None
+
+    @property
+    def auth_failed(self):
+        """Токен отвергнут: 401 или 403."""
+        return self.status_code in (HTTPStatus.UNAUTHORIZED,
+                                    HTTPStatus.FORBIDDEN)
+
+    @property
+    def retryable(self):
+        """Повторять имеет смысл только 429 и 5xx."""
+        return (self.status_code == HTTPStatus.TOO_MANY_REQUESTS
+                or self.status_code >= HTTPStatus.INTERNAL_SERVER_ERROR)
+
+
+class SchemaError(BotError):
+    """Ответ API не соответствует ожидаемой структуре."""
+
+    template = 'Неверная структура ответа API'
+
+
+class DecodeError(SchemaError, ValueError):
+    """Тело ответа не разбирается как JSON."""
+
+    template = 'Ответ API не в формате JSON: {cause}'
+
+
+class MissingKeyError(SchemaError, KeyError):
+    """В ответе нет обязательного ключа."""
+
+    template = 'В ответе API нет ключа {key}'
+
+
+class WrongTypeError(SchemaError, TypeError):
+    """Значение в ответе не того типа."""
+
+    template = '{key}: ожидался {expected}, получен {actual}'
+
+
+class UnknownStatusError(SchemaError, KeyError):
+    """Недокументированный статус домашней работы."""
+
+    template = 'Не проверенный статус в API: {status}'
+
+
+class NoCurrentDateKeyInResponseError(MissingKeyError):
     """Дата."""
 
     pass
+
+
+class DeadlineExceededError(BotError):
+    """Шаг опроса не уложился в отведённый срок."""
+
+    template = 'Срок опроса превышен на шаге {stage} на {overrun:.1f} с'
+    local_stages = ('ratelimit', 'queue')
+
+    @property
+    def retryable(self):
+        """Сбой эндпойнта, только если срок истёк не в очереди процесса.
+
+        На шагах ratelimit и queue запрос ещё не отправлен: длинная
+        очередь лимитера или пула — не признак недоступности API.
+        """
+        return self.stage not in self.local_stages
+
+
+class CircuitOpenError(BotError):
+    """Запросы к эндпойнту приостановлены после серии сбоев."""
+
+    template = 'Запросы приостановлены после {failures} сбоев'
+
+
+def is_retryable(error):
+    """Имеет ли смысл повторить запрос после ошибки.
+
+    Ошибки вне иерархии бота считаются временными.
+    """
+    if isinstance(error, BotError):
+        return error.retryable
+    return True
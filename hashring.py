@@ -0,0 +1,65 @@
+import hashlib
+from bisect import bisect, insort
+
+REPLICAS = 128
+
+
+def ring_hash(value):
+    """Позиция строки на кольце: 64 бита blake2b."""
+    return int.from_bytes(
+        hashlib.blake2b(value.encode(), digest_size=8).digest(), 'big'
+    )
+
+
+class HashRing:
+    """Консистентное хеширование ключей по узлам.
+
+    Каждый узел занимает replicas точек на кольце, ключ достаётся
+    ближайшему узлу по часовой стрелке. При добавлении узла к нему
+    переходит примерно 1/N ключей, при удалении — только его ключи.
+    """
+
+    def __init__(self, nodes=(), replicas=REPLICAS):
+        """Кольцо с начальными узлами."""
+        self.replicas = replicas
+        self._points = []
+        self._owners = {}
+        self.nodes = []
+        for node in nodes:
+            self.add(node)
+
+    def add(self, node):
+        """Добавление узла."""
+        if node in self.nodes:
+            return
+        self.nodes.append(node)
+        for replica in range(self.replicas):
+            point = ring_hash(f'{node}#{replica}')
+            if point not in self._owners:
+                self._owners[point] = node
+                insort(self._points, point)
+
+    def remove(self, node):
+        """Удаление узла."""
+        if node not in self.nodes:
+            return
+        self.nodes.remove(node)
+        for replica in range(self.replicas):
+            point = ring_hash(f'{node}#{replica}')
+            if self._owners.get(point) == node:
+                del self._owners[point]
+        self._points = sorted(self._owners)
+
+    def node_for(self, key):
+        """Узел, которому принадлежит ключ."""
+        if not self._points:
+            raise LookupError('На кольце нет узлов')
+        index = bisect(self._points, ring_hash(key)) % len(self._points)
+        return self._owners[self._points[index]]
+
+    def assign(self, keys):
+        """Разбиение ключей по узлам: узел → список ключей."""
+        shards = {node: [] for node in self.nodes}
+        for key in keys:
+            shards[self.node_for(key)].append(key)
+        return shards
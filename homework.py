@@ -7,10 +7,24 @@ from http import HTTPStatus
 
 import requests
 import telegram
-from dotenv import load_dotenv
-from exceptions import NoCurrentDateKeyInResponseError
+from checkpoints import (checkpoint_key, due_in, open_store, restore,
+                         snapshot)
+from circuit import CircuitBreaker, ErrorReporter
+from deadlines import (OVERRUNS, POLL_DEADLINE, Deadline, deadline_scope,
+                       request_timeout, send_timeout, time_left)
+from environment import seed
+from exceptions import (CircuitOpenError, DecodeError, HTTPStatusError,
+                        RequestTimeoutError, TransportError)
+from lifecycle import Interrupted, Lifecycle
+from log_setup import setup_logging
+from messages import get_renderer
+from metrics import (API_LATENCY, CHECK_TIME, ERRORS, MESSAGES_SENT,
+                     SEND_LATENCY, start_metrics_server)
+from ratelimit import LIMITER, limit_key
+from schema import (compile_list_validator, compile_validator,
+                    homework_schema, raise_first, response_schema)
 
-load_dotenv()
+seed()
 
 
 PRACTICUM_TOKEN = os.getenv('PRACTICUM_TOKEN')
@@ -27,6 +41,14 @@ HOMEWORK_VERDICTS = {
     'reviewing': 'Работа взята на проверку ревьюером.',
     'rejected': 'Работа проверена: у ревьюера есть замечания.'
 }
+validate_response = compile_validator(response_schema(), 'validate_response')
+validate_homework = compile_validator(
+    homework_schema(HOMEWORK_VERDICTS), 'validate_homework', 'homework'
+)
+validate_homeworks = compile_list_validator(
+    homework_schema(HOMEWORK_VERDICTS), 'validate_homeworks'
+)
+RENDERER = get_renderer(HOMEWORK_VERDICTS)
 logger = logging.getLogger(__name__)
 CURRENT_TIME = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
 
@@ -36,109 +58,210 @@ def check_tokens():
     return all([TELEGRAM_TOKEN, PRACTICUM_TOKEN, TELEGRAM_CHAT_ID])
 
 
-def send_message(bot, message):
-    """Отправляет сообщение в Telegram чат."""
+def send_chat_message(bot, chat_id, message):
+    """Отправляет сообщение в указанный Telegram чат.
+
+    Таймаут отправки берётся из остатка срока текущего цикла.
+    """
     try:
-        bot.send_message(
-            chat_id=TELEGRAM_CHAT_ID,
-            text=message,
-        )
+        if getattr(bot, 'queued', False):
+            bot.send_message(chat_id=chat_id, text=message)
+        else:
+            with SEND_LATENCY.time():
+                bot.send_message(
+                    chat_id=chat_id,
+                    text=message,
+                    timeout=send_timeout(),
+                )
+            MESSAGES_SENT.inc()
         logger.info(f'Бот отправил сообщение "{message}"')
+    except telegram.error.TimedOut as error:
+        OVERRUNS.inc('send')
+        ERRORS.inc(type(error).__name__)
+        logging.error(f'Telegram не ответил за отведённое время: {error}')
     except telegram.TelegramError as error:
+        ERRORS.inc(type(error).__name__)
         logging.error(f'Gри отправке сообщения возникла ошибка: {error}')
     else:
         logging.debug('Сообщение отправлено успешно')
 
 
-def get_api_answer(current_timestamp):
-    """Проверка статуса домашней работы."""
-    timestamp = current_timestamp or int(time.time())
+def send_message(bot, message):
+    """Отправляет сообщение в Telegram чат."""
+    send_chat_message(bot, TELEGRAM_CHAT_ID, message)
+
+
+def request_homeworks(from_date, headers, session=None, stream=False):
+    """HTTP-запрос статусов домашних работ.
+
+    Возвращает ответ с кодом 200 или 304 без разбора тела.
+    session — сессия с пулом соединений; без неё каждый запрос
+    открывает новое соединение через requests.get. stream=True
+    оставляет тело непрочитанным для потокового разбора. Запрос ждёт
+    своей очереди в LIMITER, таймауты соединения и чтения берутся из
+    остатка срока текущего цикла (см. deadlines).
+    """
+    http = session or requests
     params = {
-        'from_date': timestamp
+        'from_date': from_date
     }
+    LIMITER.acquire(limit_key(headers), time_left())
+    timeout = request_timeout()
+    try:
+        with API_LATENCY.time():
+            homework_statuses = http.get(
+                ENDPOINT,
+                headers=headers,
+                params=params,
+                stream=stream,
+                timeout=timeout,
+            )
+    except requests.Timeout as error:
+        OVERRUNS.inc('api')
+        raise RequestTimeoutError(timeout=max(timeout),
+                                  cause=error) from error
+    except requests.RequestException as error:
+        raise TransportError(cause=error) from error
+    status_code = homework_statuses.status_code
+    if status_code not in (HTTPStatus.OK, HTTPStatus.NOT_MODIFIED):
+        error = HTTPStatusError(status_code=status_code)
+        if status_code == HTTPStatus.TOO_MANY_REQUESTS:
+            error.retry_after = homework_statuses.headers.get('Retry-After')
+            LIMITER.throttled(error.retry_after)
+        raise error
+    return homework_statuses
+
+
+def fetch_homeworks(from_date, headers, session=None):
+    """Запрос статусов домашних работ с заданными заголовками."""
+    homework_statuses = request_homeworks(from_date, headers, session)
     try:
-        homework_statuses = requests.get(
-            ENDPOINT,
-            headers=HEADERS,
-            params=params,
-        )
-        if homework_statuses.status_code != HTTPStatus.OK:
-            raise Exception(f'Недоступность эндпойнта '
-                            f'{homework_statuses.status_code}')
         return homework_statuses.json()
-    except Exception as error:
-        raise Exception(f'Сбой при запросе к эндпойнту: {error}')
+    except ValueError as error:
+        raise DecodeError(cause=error) from error
+
+
+def get_api_answer(current_timestamp):
+    """Проверка статуса домашней работы."""
+    timestamp = current_timestamp or int(time.time())
+    return fetch_homeworks(timestamp, HEADERS)
 
 
 def check_response(response):
     """Проверка валидности ответа."""
-    if not isinstance(response, dict):
-        raise TypeError('Ответ пришел не в виде словаря.')
-    if 'homeworks' not in response:
-        raise KeyError(
-            'В ответе нет ключа homeworks'
-        )
-    if 'current_date' not in response:
-        raise NoCurrentDateKeyInResponseError(
-            'В ответе нет ключа current_date'
-        )
-    homeworks = response['homeworks']
-    if not isinstance(homeworks, list):
-        raise TypeError(
-            'Домашние работы приходят не в виде списка в ответ от API'
-        )
-    return homeworks
+    with CHECK_TIME.time():
+        raise_first(validate_response(response))
+    return response['homeworks']
 
 
 def parse_status(homework):
     """Парсинг ответов."""
-    if 'homework_name' not in homework:
-        raise KeyError('Отсутствует "homework_name" в  API')
-    if 'status' not in homework:
-        raise KeyError('Отсутствует "status" в  API')
-    if homework['status'] not in HOMEWORK_VERDICTS:
-        raise KeyError('Не проверенный статус в  API')
-    homework_name = homework['homework_name']
-    homework_status = homework['status']
-    verdict = HOMEWORK_VERDICTS[homework_status]
-    return f'Изменился статус проверки работы "{homework_name}" {verdict}'
+    return RENDERER.render(homework)
+
+
+def reload_settings():
+    """Перечитывание токенов из окружения и .env по SIGHUP.
+
+    Новые значения применяются, только если заданы все три.
+    """
+    global PRACTICUM_TOKEN, TELEGRAM_TOKEN, TELEGRAM_CHAT_ID, HEADERS
+    seed()
+    tokens = (os.getenv('PRACTICUM_TOKEN'), os.getenv('TELEGRAM_TOKEN'),
+              os.getenv('TELEGRAM_CHAT_ID'))
+    if not all(tokens):
+        logger.error('После перечитывания не хватает переменных окружения, '
+                     'оставлены прежние')
+        return False
+    PRACTICUM_TOKEN, TELEGRAM_TOKEN, TELEGRAM_CHAT_ID = tokens
+    HEADERS = {'Authorization': f'OAuth {PRACTICUM_TOKEN}'}
+    return True
+
+
+def report_failure(bot, reporter, error):
+    """Учёт сбоя и сообщение в чат, если о нём ещё не сообщалось."""
+    ERRORS.inc(type(error).__name__)
+    logger.error('Сбой в работе программы: %s', error)
+    if reporter.should_report(error):
+        send_message(bot, f'Сбой в работе программы: {error}')
+
+
+def poll_once(bot, breaker, reporter, tracker, current_timestamp):
+    """Один цикл опроса: новый курсор или None при сбое.
+
+    Работа с ошибкой в данных пропускается, уведомления по остальным
+    уходят, курсор сдвигается.
+    """
+    try:
+        response = breaker.call(get_api_answer, current_timestamp)
+        homeworks = check_response(response)
+        updates, errors = tracker.render_transitions(homeworks, parse_status)
+        for _, message in updates:
+            send_message(bot, message)
+        reporter.reset()
+        for error in errors:
+            report_failure(bot, reporter, error)
+        return response.get('current_date')
+    except CircuitOpenError as error:
+        logger.warning('%s', error)
+    except Exception as error:
+        report_failure(bot, reporter, error)
+    return None
 
 
 def main() -> None:
-    """Основная логика работы бота."""
+    """Основная логика работы бота.
+
+    SIGTERM и SIGINT останавливают бота после текущего шага с
+    сохранением курсора, SIGHUP перечитывает токены. Время следующего
+    опроса сохраняется, поэтому ни перезапуск, ни SIGHUP не вызывают
+    лишнего запроса: бот дожидается конца периода.
+    Каждый цикл ограничен сроком POLL_DEADLINE секунд.
+    """
     if not check_tokens():
         logger.critical('Отсутствует одна из обязательных '
                         'переменных окружения')
-        exit()
+        sys.exit(1)
     bot = telegram.Bot(token=TELEGRAM_TOKEN)
-    current_timestamp = int(time.time())
-    last_message = ''
-    while True:
-        try:
-            response = get_api_answer(current_timestamp)
-            homework = check_response(response)
-            if homework:
-                message = parse_status(homework[0])
-                if message != last_message:
-                    last_message = message
-                    send_message(bot, message)
-            current_timestamp = response.get('current_date')
-        except Exception as error:
-            message = f'Сбой в работе программы: {error}'
-            logger.error(message)
-            send_message(bot, message)
-        finally:
-            time.sleep(RETRY_PERIOD)
+    start_metrics_server()
+    store = open_store()
+    key = checkpoint_key(PRACTICUM_TOKEN, TELEGRAM_CHAT_ID)
+    state = store.load(key)
+    current_timestamp, tracker = restore(state)
+    breaker = CircuitBreaker()
+    reporter = ErrorReporter()
+    lifecycle = Lifecycle().install()
+    due = time.time() + due_in(state)
+    try:
+        while not lifecycle.stopping:
+            if lifecycle.take_reload() and reload_settings():
+                store.save(key, snapshot(current_timestamp, tracker, due))
+                bot = telegram.Bot(token=TELEGRAM_TOKEN)
+                key = checkpoint_key(PRACTICUM_TOKEN, TELEGRAM_CHAT_ID)
+                state = store.load(key)
+                current_timestamp, tracker = restore(state)
+                due = time.time() + due_in(state)
+            if time.time() < due:
+                lifecycle.wait(due - time.time())
+                continue
+            with deadline_scope(Deadline.after(POLL_DEADLINE)):
+                polled = poll_once(bot, breaker, reporter, tracker,
+                                   current_timestamp)
+            due = time.time() + RETRY_PERIOD
+            if polled is not None:
+                current_timestamp = polled
+                store.save(key, snapshot(current_timestamp, tracker, due))
+                store.flush()
+            try:
+                with lifecycle.interruptible():
+                    time.sleep(RETRY_PERIOD)
+            except Interrupted:
+                pass
+    finally:
+        lifecycle.restore()
+        store.close()
+    logger.info('Бот остановлен')
 
 
 if __name__ == '__main__':
-    logging.basicConfig(
-        level=logging.INFO,
-        format=(
-            '%(asctime)s, %(levelname)s, Путь - %(pathname)s, '
-            'Файл - %(filename)s, Функция - %(funcName)s, '
-            'Номер строки - %(lineno)d, %(message)s'
-        ),
-        handlers=[logging.FileHandler('log.txt', encoding='UTF-8'),
-                  logging.StreamHandler(sys.stdout)])
+    setup_logging()
     main()
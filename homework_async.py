@@ -0,0 +1,229 @@
+import asyncio
+import logging
+import os
+import sys
+import time
+from http import HTTPStatus
+
+import aiohttp
+import telegram
+
+import homework
+from deadlines import (OVERRUNS, POLL_DEADLINE, Deadline, deadline_scope,
+                       request_timeout, send_timeout, time_left)
+from exceptions import (CircuitOpenError, DecodeError, HTTPStatusError,
+                        RequestTimeoutError, TransportError)
+from http_client import POOL_MAXSIZE
+from lifecycle import STOP_SIGNALS
+from log_setup import setup_logging
+from metrics import (API_LATENCY, ERRORS, MESSAGES_SENT, SEND_LATENCY,
+                     start_metrics_server)
+from ratelimit import LIMITER, limit_key
+from tenants import load_tenants
+
+TELEGRAM_API_URL = os.getenv(
+    'TELEGRAM_API_URL', 'https://api.telegram.org/bot'
+)
+CONCURRENCY = int(os.getenv('ASYNC_CONCURRENCY', 100))
+
+logger = logging.getLogger(__name__)
+
+
+async def get_api_answer(session, current_timestamp,
+                         headers=homework.HEADERS):
+    """Асинхронный запрос статусов домашних работ.
+
+    Лимит запросов и таймауты — те же, что в синхронном режиме.
+    """
+    timestamp = current_timestamp or int(time.time())
+    params = {
+        'from_date': timestamp
+    }
+    wait = LIMITER.reserve(limit_key(headers), time_left())
+    if wait > 0:
+        await asyncio.sleep(wait)
+    connect, read = request_timeout()
+    try:
+        with API_LATENCY.time():
+            async with session.get(
+                homework.ENDPOINT,
+                headers=headers,
+                params=params,
+                timeout=aiohttp.ClientTimeout(sock_connect=connect,
+                                              sock_read=read),
+            ) as homework_statuses:
+                status = homework_statuses.status
+                if status != HTTPStatus.OK:
+                    error = HTTPStatusError(status_code=status)
+                    error.retry_after = homework_statuses.headers.get(
+                        'Retry-After'
+                    )
+                    if status == HTTPStatus.TOO_MANY_REQUESTS:
+                        LIMITER.throttled(error.retry_after)
+                    raise error
+                return await homework_statuses.json(content_type=None)
+    except asyncio.TimeoutError as error:
+        OVERRUNS.inc('api')
+        raise RequestTimeoutError(timeout=max(connect, read),
+                                  cause=error) from error
+    except aiohttp.ClientError as error:
+        raise TransportError(cause=error) from error
+    except ValueError as error:
+        raise DecodeError(cause=error) from error
+
+
+async def check_response(response):
+    """Проверка валидности ответа, общая с синхронным режимом."""
+    return homework.check_response(response)
+
+
+async def parse_status(homework_data):
+    """Парсинг ответа, общий с синхронным режимом."""
+    return homework.parse_status(homework_data)
+
+
+async def send_message(session, chat_id, message, token=None):
+    """Асинхронная отправка сообщения через Bot API."""
+    token = token or homework.TELEGRAM_TOKEN
+    try:
+        with SEND_LATENCY.time():
+            async with session.post(
+                f'{TELEGRAM_API_URL}{token}/sendMessage',
+                json={'chat_id': chat_id, 'text': message},
+                timeout=aiohttp.ClientTimeout(total=send_timeout()),
+            ) as response:
+                payload = await response.json(content_type=None)
+        if not payload.get('ok'):
+            raise telegram.TelegramError(payload.get('description'))
+        MESSAGES_SENT.inc()
+        logger.info('Бот отправил сообщение "%s"', message)
+    except (aiohttp.ClientError, asyncio.TimeoutError, ValueError,
+            telegram.TelegramError) as error:
+        ERRORS.inc(type(error).__name__)
+        logging.error('При отправке сообщения возникла ошибка: %s', error)
+    else:
+        logging.debug('Сообщение отправлено успешно')
+
+
+async def fetch_checked(session, from_date, headers):
+    """Запрос и проверка ответа: (ответ, список работ)."""
+    response = await get_api_answer(session, from_date, headers)
+    return response, await check_response(response)
+
+
+async def report_failure(session, tenants, error):
+    """Учёт сбоя и сообщение в чаты, где оно ещё не отправлялось."""
+    ERRORS.inc(type(error).__name__)
+    logger.error('Сбой в работе программы: %s', error)
+    for tenant in tenants:
+        if tenant.reporter.should_report(error):
+            await send_message(session, tenant.chat_id,
+                               f'Сбой в работе программы: {error}')
+
+
+async def poll_tenant(session, tenant):
+    """Один цикл опроса подписчика без блокировки цикла событий."""
+    await poll_subscribers(session, [tenant])
+
+
+async def poll_subscribers(session, tenants):
+    """Один запрос на токен и уведомления всем его подписчикам.
+
+    Запрос идёт с самым ранним курсором из tenants, как в
+    scheduler.poll_subscribers. Опрос ограничен сроком POLL_DEADLINE
+    секунд.
+    """
+    leader = min(tenants, key=lambda tenant: tenant.from_date)
+    with deadline_scope(Deadline.after(POLL_DEADLINE)):
+        try:
+            response, homeworks = await leader.breaker.call_async(
+                fetch_checked, session, leader.from_date, leader.headers
+            )
+            current_date = response.get('current_date', leader.from_date)
+            for tenant in tenants:
+                await fan_out(session, tenant, homeworks, current_date)
+        except CircuitOpenError as error:
+            logger.debug('%s', error)
+        except Exception as error:
+            await report_failure(session, tenants, error)
+
+
+async def fan_out(session, tenant, homeworks, current_date):
+    """Общий ответ API одному подписчику токена."""
+    tenant.reporter.reset()
+    tenant.from_date = current_date
+    updates, errors = tenant.tracker.render_transitions(
+        homeworks, tenant.renderer.render
+    )
+    for _, message in updates:
+        await send_message(session, tenant.chat_id, message)
+    for error in errors:
+        await report_failure(session, [tenant], error)
+
+
+async def pause(stop, seconds):
+    """Пауза до seconds секунд; True, если пришла остановка."""
+    try:
+        await asyncio.wait_for(stop.wait(), seconds)
+    except asyncio.TimeoutError:
+        return False
+    return True
+
+
+async def poll_forever(session, tenants, delay, period, stop):
+    """Опрос одного токена со сдвигом первого запроса до остановки.
+
+    Остановка прерывает только паузу: начатый опрос и отправка
+    уведомлений доводятся до конца.
+    """
+    if await pause(stop, delay):
+        return
+    while True:
+        await poll_subscribers(session, tenants)
+        if await pause(stop, period):
+            return
+
+
+async def poll_all(registry, period=homework.RETRY_PERIOD,
+                   concurrency=CONCURRENCY, stop=None):
+    """Опрос всех подписчиков на одном цикле событий.
+
+    stop — asyncio.Event; без него SIGTERM и SIGINT выставляют
+    собственное событие остановки. На каждый токен — один цикл
+    опроса, ответ которого получают все подписчики токена.
+    """
+    if stop is None:
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for signum in STOP_SIGNALS:
+            loop.add_signal_handler(signum, stop.set)
+    connector = aiohttp.TCPConnector(
+        limit=concurrency, limit_per_host=POOL_MAXSIZE
+    )
+    async with aiohttp.ClientSession(connector=connector) as session:
+        tokens = registry.tokens()
+        step = period / len(tokens) if tokens else 0
+        now = int(time.time())
+        for tenant in registry:
+            tenant.from_date = tenant.from_date or now
+        await asyncio.gather(*(
+            poll_forever(session, registry.subscribers(token),
+                         index * step, period, stop)
+            for index, token in enumerate(tokens)
+        ))
+
+
+def main():
+    """Асинхронный режим опроса всех подписчиков."""
+    registry = load_tenants()
+    if not homework.TELEGRAM_TOKEN or not len(registry):
+        logger.critical('Нет токена бота или ни одного подписчика')
+        sys.exit(1)
+    start_metrics_server()
+    asyncio.run(poll_all(registry))
+    logger.info('Опрос остановлен')
+
+
+if __name__ == '__main__':
+    setup_logging()
+    main()
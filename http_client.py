@@ -0,0 +1,55 @@
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+POOL_CONNECTIONS = int(os.getenv('HTTP_POOL_CONNECTIONS', 4))
+POOL_MAXSIZE = int(os.getenv('HTTP_POOL_MAXSIZE', 32))
+POOL_BLOCK = os.getenv('HTTP_POOL_BLOCK', 'false').lower() == 'true'
+KEEP_ALIVE = os.getenv('HTTP_KEEP_ALIVE', 'true').lower() == 'true'
+
+_session = None
+_lock = threading.Lock()
+
+
+def build_session(pool_connections=POOL_CONNECTIONS,
+                  pool_maxsize=POOL_MAXSIZE,
+                  pool_block=POOL_BLOCK,
+                  keep_alive=KEEP_ALIVE):
+    """Сессия с пулом соединений.
+
+    pool_connections — сколько хостов держать в пуле, pool_maxsize —
+    сколько соединений на один хост, pool_block — ждать ли свободного
+    соединения вместо открытия лишнего.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        pool_block=pool_block,
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    if not keep_alive:
+        session.headers['Connection'] = 'close'
+    return session
+
+
+def get_session():
+    """Общая для всех опросов сессия, создаётся при первом обращении."""
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                _session = build_session()
+    return _session
+
+
+def close_session():
+    """Закрытие общей сессии и всех её соединений."""
+    global _session
+    with _lock:
+        if _session is not None:
+            _session.close()
+            _session = None
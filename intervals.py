@@ -0,0 +1,74 @@
+import os
+import random
+
+from homework import RETRY_PERIOD
+
+MIN_INTERVAL = float(os.getenv('POLL_MIN_INTERVAL', 60))
+MAX_INTERVAL = float(os.getenv('POLL_MAX_INTERVAL', RETRY_PERIOD))
+REVIEWING_INTERVAL = float(os.getenv('POLL_REVIEWING_INTERVAL', 120))
+BACKOFF_FACTOR = float(os.getenv('POLL_BACKOFF_FACTOR', 2))
+JITTER = float(os.getenv('POLL_JITTER', 0.1))
+REQUEST_BUDGET = float(os.getenv('POLL_REQUEST_BUDGET', 0))
+
+
+class AdaptiveInterval:
+    """Интервал опроса, подстраиваемый под каждого подписчика.
+
+    После изменения статуса опрос учащается до minimum, пока работа на
+    ревью — держится на reviewing, в простое растёт экспоненциально
+    до maximum. По умолчанию maximum равен RETRY_PERIOD, так что
+    уведомления приходят не позже, чем при постоянном интервале;
+    больший maximum сокращает число запросов ценой задержки.
+    budget — общий лимит запросов в секунду на все токены: если сумма
+    частот опроса его превышает, интервал растягивается.
+    """
+
+    def __init__(self, base=RETRY_PERIOD, minimum=MIN_INTERVAL,
+                 maximum=MAX_INTERVAL, reviewing=REVIEWING_INTERVAL,
+                 factor=BACKOFF_FACTOR, jitter=JITTER,
+                 budget=REQUEST_BUDGET, rng=random.random):
+        """Параметры политики, по умолчанию из переменных окружения."""
+        self.base = base
+        self.minimum = minimum
+        self.maximum = maximum
+        self.reviewing = reviewing
+        self.factor = factor
+        self.jitter = jitter
+        self.budget = budget
+        self.rng = rng
+        self._intervals = {}
+        self._rates = {}
+        self._total_rate = 0.0
+
+    def next_interval(self, tenant, changed):
+        """Интервал до следующего опроса подписчика в секундах."""
+        if changed:
+            interval = self.minimum
+        elif tenant.status == 'reviewing':
+            interval = self.reviewing
+        else:
+            previous = self._intervals.get(tenant.token, self.base)
+            interval = min(previous * self.factor, self.maximum)
+        self._intervals[tenant.token] = interval
+        interval = self._fit_budget(tenant.token, interval)
+        jittered = interval * (1 + self.jitter * (2 * self.rng() - 1))
+        return min(jittered, max(interval, self.maximum))
+
+    def _fit_budget(self, token, interval):
+        """Растягивание интервала, если не хватает общего бюджета."""
+        others = self._total_rate - self._rates.get(token, 0.0)
+        if self.budget:
+            spare = self.budget - others
+            if spare <= 0:
+                interval = max(interval, self.maximum)
+            else:
+                interval = max(interval, 1 / spare)
+        rate = 1 / interval
+        self._rates[token] = rate
+        self._total_rate = others + rate
+        return interval
+
+    def forget(self, token):
+        """Удаление подписчика из учёта бюджета."""
+        self._intervals.pop(token, None)
+        self._total_rate -= self._rates.pop(token, 0.0)
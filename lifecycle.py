@@ -0,0 +1,125 @@
+import logging
+import signal
+import threading
+from contextlib import contextmanager
+
+STOP_SIGNALS = (signal.SIGTERM, signal.SIGINT)
+RELOAD_SIGNAL = getattr(signal, 'SIGHUP', None)
+RESIZE_SIGNALS = {
+    getattr(signal, name): step
+    for name, step in (('SIGTTIN', 1), ('SIGTTOU', -1))
+    if hasattr(signal, name)
+}
+DRAIN_TIMEOUT = 30
+
+logger = logging.getLogger(__name__)
+
+
+class Interrupted(BaseException):
+    """Ожидание прервано сигналом остановки или перечитывания.
+
+    Наследуется от BaseException, как KeyboardInterrupt, чтобы не
+    попадать в обработчики ошибок опроса.
+    """
+
+
+class Lifecycle:
+    """Реакция процесса на сигналы.
+
+    SIGTERM и SIGINT выставляют stopping, SIGHUP — запрос на
+    перечитывание настроек, SIGTTIN и SIGTTOU (если install вызван с
+    resize=True) — запрос на процесс больше или меньше. Сигнал будит
+    wait, а внутри блока interruptible прерывает даже time.sleep. Во
+    время запроса к API или отправки сообщения сигнал только
+    запоминается, так что начатый шаг доводится до конца.
+    """
+
+    def __init__(self):
+        """Процесс ещё работает, обработчики не установлены."""
+        self.stopping = False
+        self._reload = False
+        self._resize = 0
+        self._wakeup = threading.Event()
+        self._interruptible = False
+        self._previous = {}
+
+    def install(self, resize=False):
+        """Установка обработчиков, прежние запоминаются для restore."""
+        for signum in STOP_SIGNALS:
+            self._previous[signum] = signal.signal(signum, self._on_stop)
+        if RELOAD_SIGNAL is not None:
+            self._previous[RELOAD_SIGNAL] = signal.signal(
+                RELOAD_SIGNAL, self._on_reload
+            )
+        if resize:
+            for signum in RESIZE_SIGNALS:
+                self._previous[signum] = signal.signal(
+                    signum, self._on_resize
+                )
+        return self
+
+    def restore(self):
+        """Возврат прежних обработчиков."""
+        for signum, handler in self._previous.items():
+            signal.signal(signum, handler)
+        self._previous.clear()
+
+    def stop(self):
+        """Остановка без сигнала, например из другого потока."""
+        self.stopping = True
+        self._wakeup.set()
+
+    def _on_stop(self, signum, frame):
+        """Обработчик SIGTERM и SIGINT."""
+        logger.info('Получен %s, остановка', signal.Signals(signum).name)
+        self.stop()
+        self._interrupt()
+
+    def _on_reload(self, signum, frame):
+        """Обработчик SIGHUP."""
+        logger.info('Получен %s, перечитывание настроек',
+                    signal.Signals(signum).name)
+        self._reload = True
+        self._wakeup.set()
+        self._interrupt()
+
+    def _on_resize(self, signum, frame):
+        """Обработчик SIGTTIN и SIGTTOU."""
+        logger.info('Получен %s, изменение числа процессов',
+                    signal.Signals(signum).name)
+        self._resize += RESIZE_SIGNALS[signum]
+        self._wakeup.set()
+
+    def _interrupt(self):
+        """Прерывание блока interruptible, если он сейчас выполняется."""
+        if self._interruptible:
+            self._interruptible = False
+            raise Interrupted
+
+    def take_reload(self):
+        """Был ли запрос на перечитывание; запрос сбрасывается."""
+        requested, self._reload = self._reload, False
+        return requested
+
+    def take_resize(self):
+        """Запрошенное изменение числа процессов; запрос сбрасывается."""
+        step, self._resize = self._resize, 0
+        return step
+
+    def wait(self, timeout):
+        """Ожидание до timeout секунд или до сигнала."""
+        if not self.stopping and not self._reload and not self._resize:
+            self._wakeup.wait(timeout)
+        if not self.stopping:
+            self._wakeup.clear()
+
+    @contextmanager
+    def interruptible(self):
+        """Блок, который сигнал прерывает исключением Interrupted."""
+        if self.stopping or self._reload:
+            raise Interrupted
+        self._interruptible = True
+        try:
+            yield
+        finally:
+            self._interruptible = False
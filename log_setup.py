@@ -0,0 +1,107 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import sys
+from logging.handlers import (QueueHandler, QueueListener,
+                              RotatingFileHandler, TimedRotatingFileHandler)
+
+LOG_FILE = os.getenv('LOG_FILE', 'log.txt')
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+LOG_FORMAT = os.getenv('LOG_FORMAT', 'text')
+LOG_MAX_BYTES = int(os.getenv('LOG_MAX_BYTES', 10 * 1024 * 1024))
+LOG_BACKUP_COUNT = int(os.getenv('LOG_BACKUP_COUNT', 5))
+LOG_ROTATE_WHEN = os.getenv('LOG_ROTATE_WHEN')
+TEXT_FORMAT = '%(asctime)s, %(levelname)s, %(name)s, %(message)s'
+
+
+class JSONFormatter(logging.Formatter):
+    """Одна запись — одна JSON-строка с минимумом полей."""
+
+    def format(self, record):
+        """Запись в виде JSON."""
+        payload = {
+            'time': round(record.created, 3),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        if record.exc_info:
+            payload['exc'] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False)
+
+
+class LocalQueueHandler(QueueHandler):
+    """QueueHandler для очереди внутри процесса.
+
+    Запись не копируется и не форматируется целиком: в вызывающем
+    потоке подставляются только аргументы сообщения, всё остальное
+    делает поток QueueListener.
+    """
+
+    def prepare(self, record):
+        """Сообщение с подставленными аргументами."""
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+class Listener(QueueListener):
+    """QueueListener, который можно останавливать повторно."""
+
+    def stop(self):
+        """Запись оставшегося в очереди и остановка потока."""
+        if self._thread is not None:
+            super().stop()
+
+
+def file_handler(path=LOG_FILE, max_bytes=LOG_MAX_BYTES,
+                 backup_count=LOG_BACKUP_COUNT, when=LOG_ROTATE_WHEN):
+    """Файловый обработчик с ротацией по времени when или по размеру."""
+    if when:
+        return TimedRotatingFileHandler(
+            path, when=when, backupCount=backup_count, encoding='UTF-8'
+        )
+    return RotatingFileHandler(
+        path, maxBytes=max_bytes, backupCount=backup_count, encoding='UTF-8'
+    )
+
+
+def setup_logging(path=LOG_FILE, level=LOG_LEVEL, json_lines=None,
+                  stream=sys.stdout, caller_info=False):
+    """Логирование через очередь и фоновый поток записи.
+
+    Вызов логгера только кладёт запись в очередь, форматирование и
+    запись на диск идут в потоке QueueListener. Без caller_info
+    logging не ищет вызывающий кадр и не собирает данные о потоках и
+    процессах. Возвращает запущенный listener, он же останавливается
+    при выходе с записью всего, что осталось в очереди.
+    """
+    if json_lines is None:
+        json_lines = LOG_FORMAT == 'json'
+    formatter = JSONFormatter() if json_lines else logging.Formatter(
+        TEXT_FORMAT
+    )
+    handlers = []
+    if path:
+        handlers.append(file_handler(path))
+    if stream is not None:
+        handlers.append(logging.StreamHandler(stream))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    if not caller_info:
+        logging._srcfile = None
+        logging.logThreads = False
+        logging.logProcesses = False
+        logging.logMultiprocessing = False
+    records = queue.SimpleQueue()
+    listener = Listener(records, *handlers, respect_handler_level=True)
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(LocalQueueHandler(records))
+    root.setLevel(level)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
@@ -0,0 +1,83 @@
+import os
+from functools import lru_cache
+
+from exceptions import UnknownStatusError
+from metrics import PARSE_TIME
+from schema import compile_validator, homework_schema, raise_first
+
+DEFAULT_LOCALE = 'ru'
+RENDER_CACHE_SIZE = int(os.getenv('RENDER_CACHE_SIZE', 1024))
+
+TEMPLATES = {
+    'ru': 'Изменился статус проверки работы "{name}" {verdict}',
+    'en': 'Homework "{name}" status changed. {verdict}',
+}
+LOCALE_VERDICTS = {
+    'en': {
+        'approved': 'The reviewer approved the work. Hooray!',
+        'reviewing': 'The work is being reviewed.',
+        'rejected': 'The reviewer left some comments.',
+    },
+}
+NAME = '\0'
+
+
+class MessageRenderer:
+    """Тексты уведомлений одной локали.
+
+    Шаблон каждого статуса собирается заранее: вердикт подставлен,
+    на месте названия работы — разрыв, так что сообщение — это одна
+    склейка строк. Готовые сообщения по (название, статус) хранятся
+    в LRU-кеше на cache_size записей.
+    """
+
+    def __init__(self, verdicts, locale=DEFAULT_LOCALE,
+                 cache_size=RENDER_CACHE_SIZE):
+        """Шаблоны статусов, проверка работ и кеш сообщений."""
+        self.locale = locale
+        self.verdicts = dict(verdicts)
+        template = TEMPLATES[locale]
+        self._parts = {
+            status: template.format(name=NAME, verdict=verdict).split(NAME)
+            for status, verdict in self.verdicts.items()
+        }
+        self.validate = compile_validator(
+            homework_schema(self.verdicts), 'validate_homework', 'homework'
+        )
+        self.render_status = lru_cache(maxsize=cache_size)(self._render)
+
+    def _render(self, homework_name, status):
+        """Сообщение по названию работы и статусу."""
+        try:
+            parts = self._parts[status]
+        except KeyError:
+            raise UnknownStatusError(status=status) from None
+        return homework_name.join(parts)
+
+    def render(self, homework):
+        """Проверка работы и текст уведомления о её статусе."""
+        with PARSE_TIME.time():
+            raise_first(self.validate(homework))
+            return self.render_status(homework['homework_name'],
+                                      homework['status'])
+
+
+_renderers = {}
+
+
+def get_renderer(verdicts, locale=DEFAULT_LOCALE, overrides=None):
+    """Общий MessageRenderer для локали и набора вердиктов.
+
+    verdicts — вердикты по умолчанию, их заменяют вердикты локали
+    из LOCALE_VERDICTS, а затем overrides подписчика. Подписчики
+    с одинаковыми настройками получают один объект и один кеш.
+    """
+    if locale not in TEMPLATES:
+        raise ValueError(f'Неизвестная локаль: {locale}')
+    merged = {**verdicts, **LOCALE_VERDICTS.get(locale, {}),
+              **(overrides or {})}
+    key = (locale, frozenset(merged.items()))
+    renderer = _renderers.get(key)
+    if renderer is None:
+        renderer = _renderers[key] = MessageRenderer(merged, locale)
+    return renderer
@@ -0,0 +1,304 @@
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+METRICS_PORT = os.getenv('METRICS_PORT')
+METRICS_HOST = os.getenv('METRICS_HOST', '127.0.0.1')
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+           1, 2.5, 5, 10, 30)
+FOLD_SIZE = 4096
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class Timer:
+    """Замер длительности блока with в гистограмму."""
+
+    __slots__ = ('histogram', 'started')
+
+    def __init__(self, histogram):
+        """Таймер для гистограммы."""
+        self.histogram = histogram
+
+    def __enter__(self):
+        """Начало замера."""
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        """Запись длительности, в том числе при исключении."""
+        self.histogram.observe(time.perf_counter() - self.started)
+
+
+class Histogram:
+    """Гистограмма с фиксированными границами корзин.
+
+    observe только дописывает значение в очередь: append у deque
+    атомарен, блокировка не нужна. Раскладка по корзинам идёт при
+    выгрузке или когда в очереди накопилось FOLD_SIZE значений.
+    """
+
+    def __init__(self, name, documentation, buckets=BUCKETS):
+        """Пустая гистограмма."""
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._pending = deque()
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        """Запись одного значения в секундах."""
+        pending = self._pending
+        pending.append(value)
+        if len(pending) >= FOLD_SIZE:
+            self._fold()
+
+    def _fold(self):
+        """Раскладка накопленных значений по корзинам."""
+        with self._lock:
+            pending = self._pending
+            buckets = self.buckets
+            counts = self._counts
+            total = 0.0
+            for _ in range(len(pending)):
+                value = pending.popleft()
+                counts[bisect_left(buckets, value)] += 1
+                total += value
+            self._sum += total
+
+    def time(self):
+        """Контекстный менеджер, замеряющий длительность блока."""
+        return Timer(self)
+
+    @property
+    def count(self):
+        """Число записанных значений."""
+        self._fold()
+        return sum(self._counts)
+
+    def collect(self):
+        """Строки в текстовом формате Prometheus."""
+        self._fold()
+        with self._lock:
+            counts = list(self._counts)
+            total = self._sum
+        lines = [f'# HELP {self.name} {self.documentation}',
+                 f'# TYPE {self.name} histogram']
+        cumulative = 0
+        for bound, count in zip(self.buckets, counts):
+            cumulative += count
+            lines.append(f'{self.name}_bucket{{le="{bound}"}} {cumulative}')
+        cumulative += counts[-1]
+        lines += [f'{self.name}_bucket{{le="+Inf"}} {cumulative}',
+                  f'{self.name}_sum {total}',
+                  f'{self.name}_count {cumulative}']
+        return lines
+
+
+class Counter:
+    """Счётчик, при заданном labelname — отдельный на каждое значение.
+
+    Как и у Histogram, inc только дописывает метку в очередь.
+    """
+
+    def __init__(self, name, documentation, labelname=None):
+        """Пустой счётчик."""
+        self.name = name
+        self.documentation = documentation
+        self.labelname = labelname
+        self._values = {}
+        self._pending = deque()
+        self._lock = threading.Lock()
+
+    def inc(self, label=None, amount=1):
+        """Увеличение счётчика значения label."""
+        pending = self._pending
+        pending.append((label, amount))
+        if len(pending) >= FOLD_SIZE:
+            self._fold()
+
+    def _fold(self):
+        """Сложение накопленных приращений."""
+        with self._lock:
+            pending = self._pending
+            values = self._values
+            for _ in range(len(pending)):
+                label, amount = pending.popleft()
+                values[label] = values.get(label, 0) + amount
+
+    def value(self, label=None):
+        """Текущее значение счётчика."""
+        self._fold()
+        return self._values.get(label, 0)
+
+    def collect(self):
+        """Строки в текстовом формате Prometheus."""
+        self._fold()
+        with self._lock:
+            values = sorted(self._values.items(),
+                            key=lambda item: str(item[0]))
+        lines = [f'# HELP {self.name}_total {self.documentation}',
+                 f'# TYPE {self.name}_total counter']
+        for label, value in values:
+            if self.labelname is None:
+                lines.append(f'{self.name}_total {value}')
+            else:
+                label = str(label).replace('\\', r'\\').replace('"', r'\"')
+                lines.append(
+                    f'{self.name}_total{{{self.labelname}="{label}"}} {value}'
+                )
+        return lines
+
+
+class Gauge:
+    """Текущее значение, например глубина очереди отправки.
+
+    В отличие от Counter, значение может уменьшаться.
+    """
+
+    def __init__(self, name, documentation):
+        """Gauge со значением 0."""
+        self.name = name
+        self.documentation = documentation
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        """Изменение значения на amount, в том числе отрицательное."""
+        with self._lock:
+            self._value += amount
+
+    def set(self, value):
+        """Новое значение."""
+        with self._lock:
+            self._value = value
+
+    def value(self):
+        """Текущее значение."""
+        return self._value
+
+    def collect(self):
+        """Строки в текстовом формате Prometheus."""
+        return [f'# HELP {self.name} {self.documentation}',
+                f'# TYPE {self.name} gauge',
+                f'{self.name} {self._value}']
+
+
+class NullMetric:
+    """Метрика выключенного реестра: запись ничего не стоит."""
+
+    def observe(self, value):
+        """Ничего не делает."""
+
+    def inc(self, label=None, amount=1):
+        """Ничего не делает."""
+
+    def set(self, value):
+        """Ничего не делает."""
+
+    def time(self):
+        """Блок with без замера."""
+        return self
+
+    def __enter__(self):
+        """Ничего не делает."""
+        return self
+
+    def __exit__(self, *exc_info):
+        """Ничего не делает."""
+
+
+class Registry:
+    """Набор метрик процесса; выключенный реестр выдаёт NullMetric."""
+
+    def __init__(self, enabled=True):
+        """Пустой реестр."""
+        self.enabled = enabled
+        self._metrics = []
+
+    def histogram(self, name, documentation, buckets=BUCKETS):
+        """Новая гистограмма реестра."""
+        return self._register(Histogram(name, documentation, buckets))
+
+    def counter(self, name, documentation, labelname=None):
+        """Новый счётчик реестра."""
+        return self._register(Counter(name, documentation, labelname))
+
+    def gauge(self, name, documentation):
+        """Новый gauge реестра."""
+        return self._register(Gauge(name, documentation))
+
+    def _register(self, metric):
+        """Добавление метрики, если реестр включён."""
+        if not self.enabled:
+            return NullMetric()
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        """Все метрики в текстовом формате Prometheus."""
+        lines = []
+        for metric in self._metrics:
+            lines += metric.collect()
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry(enabled=bool(METRICS_PORT))
+API_LATENCY = REGISTRY.histogram(
+    'homework_api_request_seconds', 'Длительность запроса к API Практикума.'
+)
+CHECK_TIME = REGISTRY.histogram(
+    'homework_check_response_seconds', 'Длительность проверки ответа API.'
+)
+PARSE_TIME = REGISTRY.histogram(
+    'homework_parse_status_seconds', 'Длительность сборки уведомления.'
+)
+SEND_LATENCY = REGISTRY.histogram(
+    'homework_telegram_send_seconds', 'Длительность отправки в Telegram.'
+)
+MESSAGES_SENT = REGISTRY.counter(
+    'homework_messages_sent', 'Отправленные сообщения.'
+)
+ERRORS = REGISTRY.counter(
+    'homework_errors', 'Ошибки по типам.', labelname='type'
+)
+
+
+def serve(registry=REGISTRY, port=0, host=METRICS_HOST):
+    """HTTP-сервер метрик в фоновом потоке, отдаёт /metrics."""
+
+    class Handler(BaseHTTPRequestHandler):
+        """Выгрузка метрик реестра."""
+
+        def do_GET(self):
+            """Ответ на GET /metrics."""
+            if self.path.split('?')[0] != '/metrics':
+                self.send_error(404)
+                return
+            body = registry.render().encode()
+            self.send_response(200)
+            self.send_header('Content-Type', CONTENT_TYPE)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            """Запросы к метрикам не пишутся в лог."""
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(
+        target=server.serve_forever, name='metrics', daemon=True
+    ).start()
+    return server
+
+
+def start_metrics_server():
+    """Запуск сервера метрик, если задан METRICS_PORT."""
+    if not METRICS_PORT:
+        return None
+    return serve(REGISTRY, int(METRICS_PORT))
@@ -0,0 +1,222 @@
+"""Ограничение частоты запросов к API Практикума.
+
+Общий на процесс RateLimiter держит корзину токенов на все запросы
+и по корзине на каждый токен Практикума. Корзина пропускает burst
+запросов подряд, дальше — rate запросов в секунду; rate=0 снимает
+ограничение. Ответ 429 останавливает все запросы на Retry-After
+секунд. delay сообщает время ожидания, не занимая места, поэтому
+планировщик откладывает опрос, а не держит поток в ожидании.
+"""
+import email.utils
+import math
+import os
+import threading
+import time
+
+from deadlines import OVERRUNS
+from exceptions import DeadlineExceededError
+from metrics import REGISTRY
+
+PRACTICUM_RATE = float(os.getenv('PRACTICUM_RATE', 0))
+PRACTICUM_BURST = float(os.getenv('PRACTICUM_BURST', 10))
+TOKEN_RATE = float(os.getenv('PRACTICUM_TOKEN_RATE', 0))
+TOKEN_BURST = float(os.getenv('PRACTICUM_TOKEN_BURST', 2))
+DEFAULT_RETRY_AFTER = float(os.getenv('PRACTICUM_RETRY_AFTER', 5))
+
+RATE_WAIT = REGISTRY.histogram(
+    'homework_ratelimit_wait_seconds', 'Ожидание лимита запросов к API.'
+)
+THROTTLED = REGISTRY.counter(
+    'homework_api_throttled', 'Ответы 429 от API Практикума.'
+)
+
+
+def limit_key(headers):
+    """Ключ корзины токена: заголовок авторизации запроса."""
+    return headers.get('Authorization') if headers else None
+
+
+def parse_retry_after(value, now=None):
+    """Секунды из Retry-After: число или HTTP-дата.
+
+    Без заголовка или при неразборчивом значении —
+    DEFAULT_RETRY_AFTER.
+    """
+    if value is None:
+        return DEFAULT_RETRY_AFTER
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            moment = email.utils.parsedate_to_datetime(value).timestamp()
+        except (TypeError, ValueError):
+            return DEFAULT_RETRY_AFTER
+        seconds = moment - (time.time() if now is None else now)
+    if not math.isfinite(seconds):
+        return DEFAULT_RETRY_AFTER
+    return max(0.0, seconds)
+
+
+class TokenBucket:
+    """Корзина на burst запросов, пополняется rate местами в секунду.
+
+    Занятое место может уйти в минус — это бронь на будущее время,
+    так что одновременные вызывающие выстраиваются друг за другом.
+    Блокировку держит RateLimiter.
+    """
+
+    __slots__ = ('rate', 'burst', 'tokens', 'updated', 'paused_until')
+
+    def __init__(self, rate, burst, now):
+        """Полная корзина."""
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self.tokens = self.burst
+        self.updated = now
+        self.paused_until = now
+
+    def _refill(self, now):
+        """Пополнение за время с прошлого обращения."""
+        if now > self.updated:
+            self.tokens = min(
+                self.burst, self.tokens + (now - self.updated) * self.rate
+            )
+            self.updated = now
+
+    def delay(self, now, count=1):
+        """Секунды до того, как освободятся count мест."""
+        wait = self.paused_until - now
+        if self.rate:
+            self._refill(now)
+            wait = max(wait, (count - self.tokens) / self.rate)
+        return max(0.0, wait)
+
+    def take(self, now, amount=1):
+        """Занятие amount мест."""
+        if self.rate:
+            self._refill(now)
+            self.tokens = min(self.burst, self.tokens - amount)
+
+    def pause(self, now, seconds):
+        """Запрет запросов на seconds секунд."""
+        self.paused_until = max(self.paused_until, now + seconds)
+
+
+class RateLimiter:
+    """Общий лимит запросов и лимиты отдельных токенов.
+
+    rate и burst ограничивают все запросы процесса, token_rate и
+    token_burst — запросы одного токена; для отдельного токена их
+    переопределяет set_limit.
+    """
+
+    def __init__(self, rate=PRACTICUM_RATE, burst=PRACTICUM_BURST,
+                 token_rate=TOKEN_RATE, token_burst=TOKEN_BURST,
+                 clock=time.monotonic, sleep=time.sleep):
+        """Лимитер с полными корзинами."""
+        self.clock = clock
+        self.sleep = sleep
+        self.token_rate = token_rate
+        self.token_burst = token_burst
+        self.bucket = TokenBucket(rate, burst, clock())
+        self._limits = {}
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def reset(self):
+        """Полные корзины без пауз и без своих лимитов токенов."""
+        with self._lock:
+            self.bucket = TokenBucket(self.bucket.rate, self.bucket.burst,
+                                      self.clock())
+            self._limits.clear()
+            self._buckets.clear()
+
+    def set_limit(self, key, rate, burst=None):
+        """Свой лимит токена вместо token_rate и token_burst."""
+        burst = self.token_burst if burst is None else burst
+        with self._lock:
+            self._limits[key] = (rate, burst)
+            self._buckets.pop(key, None)
+
+    def set_limits(self, limits):
+        """Замена всех своих лимитов токенов: {key: (rate, burst)}.
+
+        Лимиты, которых нет в limits, снимаются. Корзина токена с
+        прежним лимитом сохраняется, с изменённым — создаётся заново.
+        """
+        limits = {
+            key: (rate, self.token_burst if burst is None else burst)
+            for key, (rate, burst) in limits.items()
+        }
+        with self._lock:
+            for key in set(self._limits) | set(limits):
+                if self._limits.get(key) != limits.get(key):
+                    self._buckets.pop(key, None)
+            self._limits = limits
+
+    def _buckets_for(self, key):
+        """Общая корзина и, если токен ограничен, его корзина."""
+        if key is None:
+            return (self.bucket,)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            rate, burst = self._limits.get(
+                key, (self.token_rate, self.token_burst)
+            )
+            if not rate:
+                return (self.bucket,)
+            bucket = self._buckets[key] = TokenBucket(
+                rate, burst, self.clock()
+            )
+        return self.bucket, bucket
+
+    def delay(self, key=None, ahead=0):
+        """Секунды до запроса токена key, если перед ним ahead запросов.
+
+        Место не занимается: по delay вызывающий решает, когда
+        запланировать запрос, чтобы запросы шли равномерно.
+        """
+        with self._lock:
+            now = self.clock()
+            buckets = self._buckets_for(key)
+            wait = buckets[0].delay(now, ahead + 1)
+            for bucket in buckets[1:]:
+                wait = max(wait, bucket.delay(now))
+        return wait
+
+    def reserve(self, key=None, timeout=None):
+        """Бронь места для запроса; возвращает, сколько ждать.
+
+        Если ждать дольше timeout, место не занимается и поднимается
+        DeadlineExceededError.
+        """
+        with self._lock:
+            now = self.clock()
+            buckets = self._buckets_for(key)
+            wait = max(bucket.delay(now) for bucket in buckets)
+            if timeout is not None and wait > timeout:
+                OVERRUNS.inc('ratelimit')
+                raise DeadlineExceededError(stage='ratelimit',
+                                            overrun=wait - timeout)
+            for bucket in buckets:
+                bucket.take(now)
+        RATE_WAIT.observe(wait)
+        return wait
+
+    def acquire(self, key=None, timeout=None):
+        """Ожидание своей очереди перед запросом, см. reserve."""
+        wait = self.reserve(key, timeout)
+        if wait > 0:
+            self.sleep(wait)
+        return wait
+
+    def throttled(self, retry_after=None):
+        """Ответ 429: пауза всех запросов; возвращает её длину."""
+        seconds = parse_retry_after(retry_after)
+        THROTTLED.inc()
+        with self._lock:
+            self.bucket.pause(self.clock(), seconds)
+        return seconds
+
+
+LIMITER = RateLimiter()
@@ -0,0 +1,94 @@
+import hashlib
+import re
+from dataclasses import dataclass
+from http import HTTPStatus
+
+from exceptions import DecodeError, HTTPStatusError
+from homework import request_homeworks
+
+CURRENT_DATE_PATTERN = re.compile(rb'"current_date"\s*:\s*(\d+)')
+
+
+@dataclass
+class CacheEntry:
+    """Последний проверенный ответ для одного токена."""
+
+    etag: str = None
+    last_modified: str = None
+    body_hash: bytes = None
+    homeworks: list = None
+
+
+def body_digest(body):
+    """Хеш тела ответа без current_date и дата из тела.
+
+    Поле current_date меняется при каждом запросе, поэтому в хеш
+    попадает всё тело, кроме него. Тело не копируется.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    match = CURRENT_DATE_PATTERN.search(body)
+    if match is None:
+        digest.update(body)
+        return digest.digest(), None
+    view = memoryview(body)
+    digest.update(view[:match.start()])
+    digest.update(view[match.end():])
+    return digest.digest(), int(match.group(1))
+
+
+class ResponseCache:
+    """Кеш ответов API по токенам для условных запросов.
+
+    Если сервер ответил 304 или тело совпало с последним проверенным,
+    JSON не разбирается и повторная проверка не выполняется.
+    """
+
+    def __init__(self):
+        """Пустой кеш."""
+        self._entries = {}
+
+    def conditional_headers(self, token, headers):
+        """Заголовки запроса с If-None-Match и If-Modified-Since."""
+        entry = self._entries.get(token)
+        if entry is None or not (entry.etag or entry.last_modified):
+            return headers
+        headers = dict(headers)
+        if entry.etag:
+            headers['If-None-Match'] = entry.etag
+        if entry.last_modified:
+            headers['If-Modified-Since'] = entry.last_modified
+        return headers
+
+    def fetch(self, token, from_date, headers, validate, session=None):
+        """Запрос с учётом кеша.
+
+        validate получает разобранный ответ и возвращает список работ.
+        Возвращает (список работ, current_date, изменился ли ответ).
+        """
+        entry = self._entries.get(token)
+        homework_statuses = request_homeworks(
+            from_date, self.conditional_headers(token, headers), session
+        )
+        if homework_statuses.status_code == HTTPStatus.NOT_MODIFIED:
+            if entry is None:
+                raise HTTPStatusError(status_code=HTTPStatus.NOT_MODIFIED)
+            return entry.homeworks, from_date, False
+        body_hash, current_date = body_digest(homework_statuses.content)
+        if entry is not None and entry.body_hash == body_hash:
+            return entry.homeworks, current_date or from_date, False
+        try:
+            response = homework_statuses.json()
+        except ValueError as error:
+            raise DecodeError(cause=error) from error
+        homeworks = validate(response)
+        self._entries[token] = CacheEntry(
+            etag=homework_statuses.headers.get('ETag'),
+            last_modified=homework_statuses.headers.get('Last-Modified'),
+            body_hash=body_hash,
+            homeworks=homeworks,
+        )
+        return homeworks, response.get('current_date', from_date), True
+
+    def invalidate(self, token):
+        """Сброс кеша токена."""
+        self._entries.pop(token, None)
@@ -0,0 +1,459 @@
+import heapq
+import itertools
+import logging
+import sys
+import time
+from concurrent.futures import wait
+
+import telegram
+
+from checkpoints import (CheckpointStore, due_in, open_store, restore,
+                         snapshot)
+from config import (QUARANTINE_INTERVAL, TokenCache, check_bot,
+                    reload_config, validate_tenants)
+from deadlines import OVERRUNS, POLL_DEADLINE, Deadline, deadline_scope
+from delivery import DeliveryQueue
+from exceptions import (CircuitOpenError, DeadlineExceededError,
+                        HTTPStatusError)
+from homework import (RETRY_PERIOD, TELEGRAM_TOKEN, check_response,
+                      fetch_homeworks, send_chat_message)
+from http_client import get_session
+from intervals import AdaptiveInterval
+from lifecycle import DRAIN_TIMEOUT, Lifecycle
+from log_setup import setup_logging
+from metrics import ERRORS, start_metrics_server
+from ratelimit import LIMITER, limit_key
+from response_cache import ResponseCache
+from tenants import load_tenants
+from workers import POLL_WORKERS, WorkerPool
+
+logger = logging.getLogger(__name__)
+
+
+def fetch_checked(tenant, session=None, cache=None):
+    """Проверенный список работ, новый курсор и признак изменений."""
+    if cache is not None:
+        return cache.fetch(
+            tenant.token, tenant.from_date, tenant.headers,
+            check_response, session,
+        )
+    response = fetch_homeworks(tenant.from_date, tenant.headers, session)
+    homeworks = check_response(response)
+    return homeworks, response.get('current_date', tenant.from_date), True
+
+
+def apply_updates(bot, tenant, homeworks):
+    """Уведомления по работам со сменившимся статусом.
+
+    Общий шаг для опроса и для событий от webhook.py; вызывается
+    под tenant.lock. Работа с ошибкой в данных пропускается, о ней
+    сообщается в чат, остальные уведомляются. Возвращает работы,
+    о которых ушли уведомления.
+    """
+    updates, errors = tenant.tracker.render_transitions(
+        homeworks, tenant.renderer.render
+    )
+    tenant.status = 'reviewing' if tenant.tracker.in_review() else None
+    for _, message in updates:
+        send_chat_message(bot, tenant.chat_id, message)
+    for error in errors:
+        report_error(bot, [tenant], error)
+    return [homework for homework, _ in updates]
+
+
+def poll_tenant(bot, tenant, session=None, cache=None):
+    """Один цикл опроса подписчика: запрос, проверка, уведомления.
+
+    Уведомление уходит по каждой работе со сменившимся статусом.
+    Возвращает True, если изменился статус хотя бы одной работы.
+    """
+    return poll_subscribers(bot, [tenant], session, cache)
+
+
+def poll_subscribers(bot, tenants, session=None, cache=None):
+    """Один запрос на токен и уведомления всем его подписчикам.
+
+    Запрос идёт с самым ранним курсором из tenants, так что ответ
+    покрывает каждого, а лишние работы отсеивает StatusTracker
+    подписчика. Возвращает True, если хотя бы у одного подписчика
+    изменился статус.
+    """
+    leader = min(tenants, key=lambda tenant: tenant.from_date)
+    try:
+        homeworks, current_date, changed = leader.breaker.call(
+            fetch_checked, leader, session, cache
+        )
+        return fan_out(bot, tenants, homeworks, current_date, changed)
+    except CircuitOpenError as error:
+        logger.debug('%s', error)
+    except Exception as error:
+        report_error(bot, tenants, error)
+    return False
+
+
+def fan_out(bot, tenants, homeworks, current_date, changed):
+    """Общий ответ API каждому подписчику токена."""
+    updated = False
+    for tenant in tenants:
+        tenant.reporter.reset()
+        with tenant.lock:
+            tenant.from_date = current_date
+            if changed and apply_updates(bot, tenant, homeworks):
+                updated = True
+        if tenant.quarantined:
+            tenant.quarantined = False
+            logger.info('Токен чата %s снова принят, карантин снят',
+                        tenant.chat_id)
+    return updated
+
+
+def report_error(bot, tenants, error):
+    """Учёт сбоя опроса и сообщение в чаты, где оно ещё не отправлялось.
+
+    При 401 и 403 подписчики токена попадают на карантин.
+    """
+    ERRORS.inc(type(error).__name__)
+    logger.error('Сбой в работе программы: %s', error)
+    auth_failed = isinstance(error, HTTPStatusError) and error.auth_failed
+    for tenant in tenants:
+        if auth_failed and not tenant.quarantined:
+            tenant.quarantined = True
+            logger.warning('Токен чата %s отвергнут, подписчик на '
+                           'карантине', tenant.chat_id)
+        if tenant.reporter.should_report(error):
+            send_chat_message(
+                bot, tenant.chat_id, f'Сбой в работе программы: {error}'
+            )
+
+
+class Scheduler:
+    """Опрос всех подписчиков реестра из одного процесса.
+
+    Очередь построена на куче по времени следующего опроса, поэтому
+    выбор готовых к опросу подписчиков не зависит от размера реестра.
+    С пулом потоков (см. WorkerPool) токены опрашиваются параллельно,
+    а состояние, очередь и хранилище меняются только в потоке,
+    вызывающем run_pending.
+    """
+
+    def __init__(self, registry, bot, period=RETRY_PERIOD, clock=time.time,
+                 session=None, cache=None, policy=None, store=None,
+                 tokens=None, pool=None, deadline=POLL_DEADLINE):
+        """Восстановление состояния и расстановка первых опросов.
+
+        Без явной session все опросы идут через общий пул соединений,
+        cache включает условные запросы (см. ResponseCache), policy
+        заменяет постоянный period адаптивным (см. AdaptiveInterval),
+        store хранит курсоры и статусы между перезапусками, tokens —
+        TokenCache, куда записывается смена карантина подписчика,
+        pool — WorkerPool для параллельного опроса, deadline — срок
+        одного опроса в секундах, из которого берутся таймауты запроса
+        и отправки (см. deadlines).
+        """
+        self.registry = registry
+        self.bot = bot
+        self.session = session or get_session()
+        self.cache = cache
+        self.policy = policy
+        self.store = store or CheckpointStore()
+        self.tokens = tokens
+        self.period = period
+        self.clock = clock
+        self.pool = pool
+        self.deadline = deadline
+        self._heap = []
+        self._due = {}
+        self._inflight = {}
+        self._counter = itertools.count()
+        self.place(registry)
+
+    def place(self, tenants):
+        """Восстановление подписчиков из store и постановка в очередь.
+
+        Подписчик с сохранённым временем опроса в будущем ждёт его,
+        остальные равномерно распределяются по периоду, так что
+        перезапуск не вызывает волны повторных запросов. Очередь
+        хранит токены: уже стоящий в ней токен не ставится повторно.
+        """
+        states = self.store.load_all()
+        now = self.clock()
+        overdue = []
+        placed = set(self._due)
+        for tenant in tenants:
+            state = states.get(tenant.key)
+            if state is not None:
+                tenant.from_date, tenant.tracker = restore(state)
+            if tenant.token in placed:
+                continue
+            placed.add(tenant.token)
+            wait = due_in(state, now)
+            if wait:
+                self.schedule(tenant, now + wait)
+            else:
+                overdue.append(tenant)
+        step = self.period / len(overdue) if overdue else 0
+        for index, tenant in enumerate(overdue):
+            self.schedule(tenant, now + index * step)
+
+    def schedule(self, tenant, due):
+        """Постановка подписчика в очередь на момент due."""
+        if not tenant.from_date:
+            tenant.from_date = int(self.clock())
+        self._due[tenant.token] = due
+        heapq.heappush(self._heap, (due, next(self._counter), tenant.token))
+
+    def next_due(self):
+        """Время ближайшего опроса или None при пустой очереди."""
+        return self._heap[0][0] if self._heap else None
+
+    def run_pending(self):
+        """Опрос всех токенов, чьё время подошло.
+
+        Подписчики одного токена делят один запрос, так что число
+        запросов растёт с числом токенов, а не чатов. Возвращает число
+        выполненных запросов.
+        """
+        polled = self.harvest()
+        now = self.clock()
+        tokens = []
+        while self._heap and self._heap[0][0] <= now:
+            due, _, token = heapq.heappop(self._heap)
+            if self._due.get(token) == due:
+                tokens.append(token)
+        batch = []
+        for token in tokens:
+            tenants = self.registry.subscribers(token)
+            if tenants:
+                batch.append((token, tenants, tenants[0].quarantined))
+                continue
+            self._due.pop(token, None)
+            if self.policy is not None:
+                self.policy.forget(token)
+        batch = self.throttle(batch)
+        if self.pool is None:
+            for job in batch:
+                with deadline_scope(Deadline.after(self.deadline)):
+                    changed = poll_subscribers(
+                        self.bot, job[1], self.session, self.cache
+                    )
+                self.finish(job, changed)
+            polled += len(batch)
+        else:
+            polled += self.run_parallel(batch)
+        self.store.maybe_flush()
+        return polled
+
+    def throttle(self, batch):
+        """Токены, которые лимит запросов пропускает сейчас.
+
+        Остальные откладываются на время ожидания из LIMITER.delay с
+        учётом стоящих перед ними в batch, так что при исчерпанном
+        лимите или после 429 запросы идут равномерно, а не волной.
+        """
+        now = self.clock()
+        ready = []
+        for position, job in enumerate(batch):
+            leader = job[1][0]
+            wait = LIMITER.delay(limit_key(leader.headers), position)
+            if wait > 0:
+                self.schedule(leader, now + wait)
+            else:
+                ready.append(job)
+        if len(ready) < len(batch):
+            logger.debug('Лимит запросов: отложено токенов %s',
+                         len(batch) - len(ready))
+        return ready
+
+    def run_parallel(self, batch):
+        """Опрос токенов в пуле потоков с ожиданием до срока.
+
+        Если пул занят до срока, оставшиеся токены откладываются на
+        следующий проход, а не копятся в очереди. Опросы, не
+        завершившиеся к сроку, учитываются как превышение и
+        дозавершаются в harvest.
+        """
+        deadline = self.pool.clock() + self.deadline
+        submitted = []
+        for index, job in enumerate(batch):
+            future = self.pool.submit(
+                poll_subscribers, self.bot, job[1], self.session,
+                self.cache, deadline=deadline,
+                timeout=max(0, deadline - self.pool.clock()),
+            )
+            if future is None:
+                logger.warning('Пул опроса занят, отложено токенов %s',
+                               len(batch) - index)
+                for token, tenants, _ in batch[index:]:
+                    self.schedule(tenants[0], self.clock())
+                break
+            self._inflight[future] = job
+            submitted.append(future)
+        wait(submitted, timeout=max(0, deadline - self.pool.clock()))
+        late = sum(not future.done() for future in submitted)
+        if late:
+            OVERRUNS.inc('poll', late)
+            ERRORS.inc(DeadlineExceededError.__name__, late)
+            logger.warning('Не уложились в срок %s с опросов: %s',
+                           self.deadline, late)
+        return self.harvest()
+
+    def harvest(self):
+        """Завершение готовых опросов из пула; возвращает их число."""
+        done = [future for future in self._inflight if future.done()]
+        for future in done:
+            job = self._inflight.pop(future)
+            try:
+                changed = future.result()
+            except Exception as error:
+                ERRORS.inc(type(error).__name__)
+                logger.warning('Опрос токена пропущен: %s', error)
+                changed = False
+            self.finish(job, changed)
+        return len(done)
+
+    def drain(self):
+        """Ожидание и завершение опросов, оставшихся в пуле."""
+        if self._inflight:
+            wait(list(self._inflight))
+            self.harvest()
+            self.store.flush()
+
+    def finish(self, job, changed):
+        """Карантин, следующий опрос и сохранение после опроса токена."""
+        token, tenants, quarantined = job
+        if (self.tokens is not None
+                and tenants[0].quarantined != quarantined):
+            self.tokens.put(token, not tenants[0].quarantined)
+            self.tokens.save()
+        due = self.clock() + self.interval(tenants[0], changed)
+        self.schedule(tenants[0], due)
+        for tenant in tenants:
+            with tenant.lock:
+                state = snapshot(tenant.from_date, tenant.tracker, due)
+            self.store.save(tenant.key, state)
+
+    def interval(self, tenant, changed):
+        """Интервал до следующего опроса подписчика."""
+        if tenant.quarantined:
+            return QUARANTINE_INTERVAL
+        if self.policy is None:
+            return self.period
+        return self.policy.next_interval(tenant, changed)
+
+    def reload(self, registry):
+        """Обновление реестра на месте без потери состояния подписчиков.
+
+        Подписчик с прежними настройками остаётся тем же объектом, при
+        смене текстов курсор и статусы переносятся в новый. Новый чат
+        токена получает копию курсора и статусов его прежнего или
+        соседнего подписчика, так что история работ не приходит
+        повторно. Удалённые выпадают из очереди при следующем
+        извлечении. Реестр меняется на месте, поэтому его видят и
+        другие владельцы ссылки (см. webhook.py).
+        """
+        fresh = []
+        for tenant in registry:
+            current = self.registry.get_by_key(tenant.key)
+            if current is None:
+                fresh.append(tenant)
+            elif ((current.locale, current.verdicts)
+                    != (tenant.locale, tenant.verdicts)):
+                with current.lock:
+                    tenant.from_date = current.from_date
+                    tenant.tracker = current.tracker
+                self.registry.add(tenant)
+        removed = [tenant for tenant in self.registry
+                   if registry.get_by_key(tenant.key) is None]
+        for tenant in removed:
+            self.registry.discard(tenant.key)
+        previous = {tenant.token: tenant for tenant in removed}
+        for tenant in fresh:
+            source = previous.get(tenant.token) or self.registry.get(
+                tenant.token
+            )
+            if source is not None:
+                with source.lock:
+                    tenant.from_date, tenant.tracker = restore(
+                        snapshot(source.from_date, source.tracker)
+                    )
+            self.registry.add(tenant)
+        self.place(fresh)
+        logger.info('Реестр перечитан: подписчиков %s, новых %s, '
+                    'удалено %s', len(self.registry), len(fresh), len(removed))
+
+    def run_forever(self, lifecycle=None, reload=None):
+        """Цикл опроса до сигнала остановки.
+
+        reload — функция, возвращающая свежий реестр по SIGHUP.
+        """
+        lifecycle = lifecycle or Lifecycle()
+        while not lifecycle.stopping:
+            if lifecycle.take_reload() and reload is not None:
+                try:
+                    self.reload(reload())
+                except Exception as error:
+                    logger.error('Реестр не перечитан: %s', error)
+            self.run_pending()
+            due = self.next_due()
+            if due is None:
+                lifecycle.wait(self.period)
+            else:
+                lifecycle.wait(max(0, due - self.clock()))
+        self.drain()
+
+
+def refresh_tenants(tokens, select=None):
+    """Реестр по перечитанным настройкам с проверенными токенами.
+
+    select отбирает подписчиков до проверки, чтобы узел проверял
+    только свои токены.
+    """
+    reload_config()
+    registry = load_tenants()
+    if select is not None:
+        registry = select(registry)
+    validate_tenants(registry, get_session(), tokens)
+    return registry
+
+
+def start_bot(registry, tokens, **options):
+    """Проверка токенов бота и подписчиков, запуск очереди отправки.
+
+    Процесс завершается, если Telegram отверг токен бота.
+    """
+    bot = telegram.Bot(token=TELEGRAM_TOKEN)
+    if not check_bot(bot):
+        logger.critical('Telegram отверг токен бота')
+        sys.exit(1)
+    validate_tenants(registry, get_session(), tokens)
+    return DeliveryQueue(bot, **options).start()
+
+
+def main():
+    """Опрос всех подписчиков из реестра TENANTS_FILE."""
+    registry = load_tenants()
+    if not TELEGRAM_TOKEN or not len(registry):
+        logger.critical('Нет токена бота или ни одного подписчика')
+        sys.exit(1)
+    tokens = TokenCache()
+    bot = start_bot(registry, tokens)
+    start_metrics_server()
+    store = open_store()
+    pool = WorkerPool() if POLL_WORKERS else None
+    lifecycle = Lifecycle().install()
+    try:
+        Scheduler(
+            registry, bot, cache=ResponseCache(), policy=AdaptiveInterval(),
+            store=store, tokens=tokens, pool=pool,
+        ).run_forever(lifecycle, lambda: refresh_tenants(tokens))
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        bot.stop(DRAIN_TIMEOUT)
+        store.close()
+    logger.info('Планировщик остановлен')
+
+
+if __name__ == '__main__':
+    setup_logging()
+    main()
@@ -0,0 +1,153 @@
+from typing import NamedTuple
+
+from exceptions import (MissingKeyError, NoCurrentDateKeyInResponseError,
+                        UnknownStatusError, WrongTypeError)
+
+
+class Field(NamedTuple):
+    """Описание поля: допустимые типы, значения и ошибка при отсутствии."""
+
+    types: tuple = None
+    choices: frozenset = None
+    missing: type = MissingKeyError
+
+
+def response_schema():
+    """Схема ответа API."""
+    return {
+        'homeworks': Field(types=(list,)),
+        'current_date': Field(missing=NoCurrentDateKeyInResponseError),
+    }
+
+
+def homework_schema(verdicts):
+    """Схема одной домашней работы."""
+    return {
+        'homework_name': Field(types=(str,)),
+        'status': Field(choices=frozenset(verdicts)),
+    }
+
+
+def _field_checks(schema, target, namespace, indent):
+    """Строки кода проверки полей словаря target."""
+    lines = []
+    pad = ' ' * indent
+    for number, (key, field) in enumerate(schema.items()):
+        namespace[f'missing_{number}'] = field.missing
+        lines += [
+            f'{pad}value = {target}.get({key!r}, MISSING)',
+            f'{pad}if value is MISSING:',
+            f'{pad}    errors.append(missing_{number}(key={key!r}))',
+        ]
+        if field.types:
+            namespace[f'types_{number}'] = field.types
+            expected = ' или '.join(kind.__name__ for kind in field.types)
+            lines += [
+                f'{pad}elif not isinstance(value, types_{number}):',
+                f'{pad}    errors.append(WrongTypeError(key={key!r}, '
+                f'expected={expected!r}, actual=type(value).__name__))',
+            ]
+        if field.choices:
+            namespace[f'choices_{number}'] = field.choices
+            lines += [
+                f'{pad}elif value not in choices_{number}:',
+                f'{pad}    errors.append(UnknownStatusError(status=value))',
+            ]
+    return lines
+
+
+def _fast_condition(schema, target, namespace):
+    """Одно выражение, истинное для корректных данных.
+
+    Проверяет точные типы, поэтому подклассы уходят в полную
+    проверку, которая и решает, есть ли нарушения.
+    """
+    parts = [f'type({target}) is dict']
+    for number, (key, field) in enumerate(schema.items()):
+        if field.types and len(field.types) == 1:
+            namespace[f'exact_{number}'] = field.types[0]
+            parts.append(f'type({target}.get({key!r})) is exact_{number}')
+        elif field.types:
+            namespace[f'exact_{number}'] = frozenset(field.types)
+            parts.append(f'type({target}.get({key!r})) in exact_{number}')
+        elif field.choices:
+            parts.append(f'{target}.get({key!r}, MISSING) in choices_{number}')
+        else:
+            parts.append(f'{key!r} in {target}')
+    return ' and '.join(parts)
+
+
+def _namespace():
+    """Имена, доступные сгенерированному коду."""
+    return {
+        'MISSING': object(),
+        'dict': dict,
+        'WrongTypeError': WrongTypeError,
+        'UnknownStatusError': UnknownStatusError,
+    }
+
+
+def compile_validator(schema, name='validate', label='response'):
+    """Функция проверки одного словаря по схеме.
+
+    Код проверки генерируется один раз: обход схемы и разбор её
+    описаний не повторяются на каждом вызове. Функция возвращает
+    список всех нарушений, пустой для корректных данных; label —
+    имя проверяемого объекта в тексте ошибки.
+    """
+    namespace = _namespace()
+    checks = _field_checks(schema, 'data', namespace, 4)
+    lines = [
+        f'def {name}(data):',
+        f'    if {_fast_condition(schema, "data", namespace)}:',
+        '        return []',
+        '    errors = []',
+        '    if not isinstance(data, dict):',
+        f"        return [WrongTypeError(key={label!r}, expected='dict', "
+        'actual=type(data).__name__)]',
+        *checks,
+        '    return errors',
+    ]
+    exec('\n'.join(lines), namespace)
+    return namespace[name]
+
+
+def compile_list_validator(schema, name='validate_all'):
+    """Функция проверки списка словарей.
+
+    Корректный список проверяется за один проход; на первом
+    подозрительном элементе проверка начинается заново и собирает
+    все нарушения. У каждого нарушения есть атрибут index.
+    """
+    namespace = _namespace()
+    checks = _field_checks(schema, 'item', namespace, 12)
+    lines = [
+        f'def {name}(items):',
+        '    for item in items:',
+        f'        if not ({_fast_condition(schema, "item", namespace)}):',
+        '            break',
+        '    else:',
+        '        return []',
+        '    errors = []',
+        '    for index, item in enumerate(items):',
+        '        count = len(errors)',
+        '        if not isinstance(item, dict):',
+        "            errors.append(WrongTypeError(key='homework', "
+        "expected='dict', actual=type(item).__name__))",
+        '        else:',
+        *checks,
+        '        if len(errors) != count:',
+        '            for error in errors[count:]:',
+        '                error.index = index',
+        '    return errors',
+    ]
+    exec('\n'.join(lines), namespace)
+    return namespace[name]
+
+
+def raise_first(errors):
+    """Исключение по первому нарушению, все нарушения — в violations."""
+    if errors:
+        error = errors[0]
+        error.violations = errors
+        raise error
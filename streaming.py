@@ -0,0 +1,135 @@
+import codecs
+import json
+
+from exceptions import DecodeError
+from homework import raise_first, request_homeworks, validate_response
+
+CHUNK_SIZE = 64 * 1024
+WHITESPACE = ' \t\n\r'
+
+
+class HomeworkStream:
+    """Работы из тела ответа по одной, без загрузки всего тела.
+
+    Тело читается кусками, в памяти держится только ещё не
+    разобранный хвост. Ключи ответа, кроме homeworks, попадают в meta.
+    После последней работы проверяется конверт ответа, как в
+    check_response.
+    """
+
+    def __init__(self, chunks):
+        """Поток поверх итератора кусков тела в байтах."""
+        self.meta = {}
+        self._chunks = iter(chunks)
+        self._text = codecs.getincrementaldecoder('utf-8')()
+        self._decoder = json.JSONDecoder()
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+        self._streamed = False
+
+    @property
+    def current_date(self):
+        """current_date ответа; известна после чтения потока."""
+        return self.meta.get('current_date')
+
+    def __iter__(self):
+        """Обход работ с проверкой конверта в конце."""
+        try:
+            yield from self._parse()
+        except ValueError as error:
+            raise DecodeError(cause=error) from error
+        envelope = dict(self.meta)
+        if self._streamed:
+            envelope['homeworks'] = []
+        raise_first(validate_response(envelope))
+
+    def _more(self):
+        """Чтение следующего куска; False, если тело закончилось."""
+        if self._eof:
+            return False
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            self._eof = True
+            text = self._text.decode(b'', final=True)
+        else:
+            text = self._text.decode(chunk)
+        self._buffer = self._buffer[self._pos:] + text
+        self._pos = 0
+        return True
+
+    def _peek(self):
+        """Следующий значимый символ или '' в конце тела."""
+        while True:
+            while (self._pos < len(self._buffer)
+                   and self._buffer[self._pos] in WHITESPACE):
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._more():
+                return ''
+
+    def _expect(self, char):
+        """Пропуск обязательного символа."""
+        found = self._peek()
+        if found != char:
+            raise ValueError(f'Ожидался {char!r}, получен {found!r}')
+        self._pos += 1
+
+    def _value(self):
+        """Разбор одного JSON-значения, дочитывая тело при нехватке."""
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if not self._more():
+                    raise
+                continue
+            if end == len(self._buffer) and self._more():
+                continue
+            self._pos = end
+            return value
+
+    def _parse(self):
+        """Разбор объекта верхнего уровня."""
+        self._expect('{')
+        if self._peek() == '}':
+            self._pos += 1
+            return
+        while True:
+            key = self._value()
+            self._expect(':')
+            if key == 'homeworks' and self._peek() == '[':
+                self._pos += 1
+                self._streamed = True
+                yield from self._items()
+            else:
+                self.meta[key] = self._value()
+            if self._peek() == ',':
+                self._pos += 1
+                continue
+            self._expect('}')
+            return
+
+    def _items(self):
+        """Элементы массива homeworks."""
+        if self._peek() == ']':
+            self._pos += 1
+            return
+        while True:
+            yield self._value()
+            if self._peek() == ',':
+                self._pos += 1
+                continue
+            self._expect(']')
+            return
+
+
+def stream_homeworks(from_date, headers, session=None,
+                     chunk_size=CHUNK_SIZE):
+    """Запрос статусов с потоковым разбором тела ответа."""
+    homework_statuses = request_homeworks(
+        from_date, headers, session, stream=True
+    )
+    return HomeworkStream(homework_statuses.iter_content(chunk_size))
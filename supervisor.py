@@ -0,0 +1,323 @@
+"""Планировщик подписчиков в нескольких процессах.
+
+Подписчики делятся между процессами консистентным хешированием по
+токену, а чаты одного токена попадают в один процесс и делят запрос
+к API. SIGTTIN и SIGTTOU добавляют и убирают процесс: переезжает лишь
+часть подписчиков и перезапускаются только затронутые процессы,
+остальные по SIGHUP перестраивают кольцо по новому числу узлов. Курсоры
+общие для всех процессов, поэтому CHECKPOINT_PATH должен указывать на
+базу SQLite. Лимиты Telegram и бюджет запросов делятся между
+процессами поровну.
+"""
+import argparse
+import logging
+import multiprocessing
+import os
+import signal
+import sys
+import time
+
+import telegram
+
+import metrics
+from checkpoints import CHECKPOINT_PATH, SQLITE_SUFFIXES, open_store
+from config import TokenCache, check_bot, reload_config
+from delivery import GLOBAL_RATE
+from hashring import HashRing
+from homework import TELEGRAM_TOKEN
+from intervals import REQUEST_BUDGET, AdaptiveInterval
+from lifecycle import DRAIN_TIMEOUT, Lifecycle
+from log_setup import LOG_FILE, setup_logging
+from response_cache import ResponseCache
+from scheduler import Scheduler, refresh_tenants, start_bot
+from tenants import TenantRegistry, load_tenants
+from workers import POLL_WORKERS, WorkerPool
+
+WORKERS = int(os.getenv('WORKERS', os.cpu_count() or 1))
+CHECK_INTERVAL = 1
+MIN_UPTIME = float(os.getenv('SHARD_MIN_UPTIME', 30))
+RESTART_BASE = float(os.getenv('SHARD_RESTART_BASE', 1))
+RESTART_MAX = float(os.getenv('SHARD_RESTART_MAX', 60))
+MAX_FAILURES = int(os.getenv('SHARD_MAX_FAILURES', 5))
+
+logger = logging.getLogger(__name__)
+
+
+def shard_name(index):
+    """Имя процесса и узла на кольце."""
+    return f'shard-{index}'
+
+
+def shard_index(node):
+    """Номер процесса по имени узла."""
+    return int(node.rsplit('-', 1)[1])
+
+
+def shard_registry(registry, ring, node):
+    """Подписчики, которые достаются узлу node."""
+    return TenantRegistry(
+        tenant for tenant in registry if ring.node_for(tenant.token) == node
+    )
+
+
+def shard_ring(size):
+    """Кольцо из текущего числа узлов size.value."""
+    return HashRing(shard_name(index) for index in range(size.value))
+
+
+def run_shard(node, size):
+    """Процесс одного узла: свой реестр, очередь отправки и планировщик.
+
+    size — общее с Supervisor число узлов (multiprocessing.Value). При
+    перечитывании реестра кольцо и доля лимитов узла строятся по его
+    текущему значению, так что после resize узлы не делят токены.
+    """
+    if LOG_FILE:
+        root, extension = os.path.splitext(LOG_FILE)
+        setup_logging(f'{root}.{node}{extension}')
+    else:
+        setup_logging(None)
+    workers = size.value
+    registry = shard_registry(load_tenants(), shard_ring(size), node)
+    logger.info('%s: подписчиков %s', node, len(registry))
+    tokens = TokenCache()
+    bot = start_bot(registry, tokens, global_rate=GLOBAL_RATE / workers)
+    if metrics.METRICS_PORT:
+        metrics.serve(port=int(metrics.METRICS_PORT) + shard_index(node))
+    store = open_store()
+    pool = WorkerPool() if POLL_WORKERS else None
+    policy = AdaptiveInterval(budget=REQUEST_BUDGET / workers)
+
+    def select(registry):
+        """Свои подписчики и доля лимитов по текущему числу узлов."""
+        workers = size.value
+        policy.budget = REQUEST_BUDGET / workers
+        bot.global_interval = workers / GLOBAL_RATE
+        return shard_registry(registry, shard_ring(size), node)
+
+    lifecycle = Lifecycle().install()
+    try:
+        Scheduler(
+            registry, bot, cache=ResponseCache(), policy=policy,
+            store=store, tokens=tokens, pool=pool,
+        ).run_forever(lifecycle, lambda: refresh_tenants(tokens, select))
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        bot.stop(DRAIN_TIMEOUT)
+        store.close()
+
+
+def tenant_tokens():
+    """Токены подписчиков по перечитанным настройкам."""
+    reload_config()
+    return load_tenants().tokens()
+
+
+def kill_stuck(process, timeout):
+    """SIGKILL процессу, не завершившемуся после SIGTERM за timeout."""
+    if process.is_alive():
+        logger.warning('%s не завершился за %s с, SIGKILL',
+                       process.name, timeout)
+        process.kill()
+        process.join()
+
+
+class Supervisor:
+    """Запуск, перезапуск и изменение числа процессов-узлов.
+
+    keys — токены подписчиков: по ним resize определяет, у каких
+    узлов изменился набор подписчиков. Число узлов хранится в size,
+    общем с процессами узлов. failed выставляется, когда узел
+    MAX_FAILURES раз подряд падает сразу после запуска.
+    """
+
+    def __init__(self, workers=WORKERS, keys=(), target=run_shard,
+                 context=None, clock=time.monotonic):
+        """Кольцо из workers узлов, процессы ещё не запущены."""
+        self.keys = list(keys)
+        self.target = target
+        self.context = context or multiprocessing.get_context('spawn')
+        self.clock = clock
+        self.size = self.context.Value('i', workers)
+        self.ring = shard_ring(self.size)
+        self.processes = {}
+        self.failed = False
+        self._started = {}
+        self._failures = {}
+        self._respawn_at = {}
+
+    def spawn(self, node):
+        """Запуск процесса узла."""
+        process = self.context.Process(
+            target=self.target,
+            args=(node, self.size),
+            name=node,
+        )
+        process.start()
+        self.processes[node] = process
+        self._started[node] = self.clock()
+        self._respawn_at.pop(node, None)
+
+    def halt(self, node, timeout=DRAIN_TIMEOUT):
+        """Остановка процесса узла.
+
+        terminate посылает SIGTERM: узел дописывает очередь отправки
+        и курсоры и только после этого завершается. Если он не успел
+        за timeout секунд, процесс убивается: иначе новый владелец его
+        токенов опрашивал бы их вместе с ним.
+        """
+        process = self.processes.pop(node, None)
+        self._respawn_at.pop(node, None)
+        if process is not None:
+            process.terminate()
+            process.join(timeout)
+            kill_stuck(process, timeout)
+
+    def start(self):
+        """Запуск всех узлов."""
+        for node in self.ring.nodes:
+            self.spawn(node)
+        return self
+
+    def restart_dead(self):
+        """Перезапуск упавших процессов; возвращает число запущенных.
+
+        Узел, проработавший меньше MIN_UPTIME секунд, перезапускается
+        с паузой от RESTART_BASE секунд, удваивающейся до RESTART_MAX.
+        После MAX_FAILURES таких падений подряд выставляется failed.
+        """
+        now = self.clock()
+        for node, process in self.processes.items():
+            if not process.is_alive() and node not in self._respawn_at:
+                self._schedule_restart(node, process, now)
+        due = [node for node, moment in self._respawn_at.items()
+               if moment <= now]
+        for node in due:
+            self.spawn(node)
+        return len(due)
+
+    def _schedule_restart(self, node, process, now):
+        """Время перезапуска упавшего узла с учётом быстрых падений."""
+        failures = 0
+        if now - self._started[node] < MIN_UPTIME:
+            failures = self._failures.get(node, 0) + 1
+        self._failures[node] = failures
+        if failures >= MAX_FAILURES:
+            logger.critical('%s падает сразу после запуска %s раз подряд',
+                            node, failures)
+            self.failed = True
+            return
+        delay = 0
+        if failures:
+            delay = min(RESTART_MAX, RESTART_BASE * 2 ** (failures - 1))
+        logger.warning('%s завершился с кодом %s, перезапуск через %.0f с',
+                       node, process.exitcode, delay)
+        self._respawn_at[node] = now + delay
+
+    def resize(self, workers):
+        """Новое число узлов; перезапускаются только затронутые.
+
+        Сначала останавливаются все узлы, у которых изменился набор
+        токенов, и только потом запускаются новые, чтобы токен не
+        опрашивали два узла сразу. Остальные узлы получают SIGHUP и
+        перестраивают кольцо. Возвращает число токенов, сменивших узел.
+        """
+        before = self.ring.assign(self.keys)
+        current = len(self.ring.nodes)
+        for index in range(current, workers):
+            self.ring.add(shard_name(index))
+        for index in range(workers, current):
+            self.ring.remove(shard_name(index))
+        after = self.ring.assign(self.keys)
+        owners = {key: node for node, keys in before.items() for key in keys}
+        moved = sum(
+            owners[key] != node for node, keys in after.items()
+            for key in keys
+        )
+        self.size.value = workers
+        changed = [
+            node for node in sorted(set(before) | set(after))
+            if node not in before or node not in after
+            or set(before[node]) != set(after[node])
+        ]
+        for node in changed:
+            self.halt(node)
+        self.notify()
+        for node in changed:
+            if node in after:
+                self.spawn(node)
+        logger.info('Узлов %s, переехало токенов %s', workers, moved)
+        return moved
+
+    def reload(self, keys):
+        """Передача SIGHUP всем узлам после перечитывания реестра."""
+        self.keys = list(keys)
+        self.notify()
+
+    def notify(self):
+        """SIGHUP всем работающим узлам."""
+        for process in self.processes.values():
+            if process.is_alive():
+                os.kill(process.pid, signal.SIGHUP)
+
+    def stop(self):
+        """Остановка всех узлов: SIGTERM сразу всем, затем ожидание."""
+        processes = list(self.processes.values())
+        self.processes.clear()
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.join(DRAIN_TIMEOUT)
+            kill_stuck(process, DRAIN_TIMEOUT)
+
+    def run_forever(self, lifecycle=None, reload=None):
+        """Наблюдение за процессами до сигнала остановки.
+
+        reload — функция, возвращающая токены подписчиков по SIGHUP.
+        SIGTTIN и SIGTTOU меняют число узлов на один (см. resize).
+        """
+        lifecycle = lifecycle or Lifecycle()
+        try:
+            while True:
+                lifecycle.wait(CHECK_INTERVAL)
+                if lifecycle.stopping:
+                    break
+                if lifecycle.take_reload() and reload is not None:
+                    self.reload(reload())
+                step = lifecycle.take_resize()
+                if step:
+                    self.resize(max(1, len(self.ring.nodes) + step))
+                self.restart_dead()
+                if self.failed:
+                    break
+        finally:
+            self.stop()
+
+
+def main():
+    """Запуск узлов для подписчиков из TENANTS_FILE."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--workers', type=int, default=WORKERS)
+    args = parser.parse_args()
+    registry = load_tenants()
+    if not TELEGRAM_TOKEN or not len(registry):
+        logger.critical('Нет токена бота или ни одного подписчика')
+        sys.exit(1)
+    if CHECKPOINT_PATH and not CHECKPOINT_PATH.endswith(SQLITE_SUFFIXES):
+        logger.critical('Для нескольких процессов CHECKPOINT_PATH '
+                        'должен указывать на базу SQLite')
+        sys.exit(1)
+    if not check_bot(telegram.Bot(token=TELEGRAM_TOKEN)):
+        logger.critical('Telegram отверг токен бота')
+        sys.exit(1)
+    supervisor = Supervisor(args.workers, registry.tokens())
+    lifecycle = Lifecycle().install(resize=True)
+    supervisor.start().run_forever(lifecycle, tenant_tokens)
+    if supervisor.failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    setup_logging()
+    main()
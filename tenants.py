@@ -0,0 +1,153 @@
+import json
+import threading
+from dataclasses import dataclass, field
+
+from checkpoints import checkpoint_key
+from circuit import CircuitBreaker, ErrorReporter, endpoint_breaker
+from config import get_config
+from homework import HOMEWORK_VERDICTS
+from messages import DEFAULT_LOCALE, MessageRenderer, get_renderer
+from ratelimit import LIMITER, limit_key
+from transitions import StatusTracker
+
+
+@dataclass
+class Tenant:
+    """Подписчик: токен Практикума, чат Telegram и свой курсор from_date."""
+
+    token: str
+    chat_id: str
+    from_date: int = 0
+    status: str = None
+    quarantined: bool = False
+    locale: str = DEFAULT_LOCALE
+    verdicts: dict = field(default=None, repr=False)
+    tracker: StatusTracker = field(default_factory=StatusTracker,
+                                   repr=False)
+    breaker: CircuitBreaker = field(default_factory=endpoint_breaker,
+                                    repr=False)
+    reporter: ErrorReporter = field(default_factory=ErrorReporter,
+                                    repr=False)
+    lock: threading.Lock = field(default_factory=threading.Lock,
+                                 repr=False, compare=False)
+    headers: dict = field(init=False, repr=False)
+    key: str = field(init=False, repr=False)
+    renderer: MessageRenderer = field(init=False, repr=False)
+
+    def __post_init__(self):
+        """Заголовки, ключ хранилища и шаблоны собираются один раз."""
+        self.headers = {'Authorization': f'OAuth {self.token}'}
+        self.key = checkpoint_key(self.token, self.chat_id)
+        self.renderer = get_renderer(
+            HOMEWORK_VERDICTS, self.locale, self.verdicts
+        )
+
+
+class TenantRegistry:
+    """Реестр подписчиков: токен → чаты с курсорами.
+
+    Один токен могут читать несколько чатов, например студент и
+    наставник. Подписчик определяется парой токен + чат (Tenant.key).
+    """
+
+    def __init__(self, tenants=()):
+        """Заполнение реестра."""
+        self._tokens = {}
+        self._keys = {}
+        for tenant in tenants:
+            self.add(tenant)
+
+    def add(self, tenant):
+        """Добавление подписчика; та же пара токен + чат заменяет старую."""
+        self.discard(tenant.key)
+        self._tokens.setdefault(tenant.token, {})[tenant.key] = tenant
+        self._keys[tenant.key] = tenant
+
+    def discard(self, key):
+        """Удаление одного подписчика по ключу хранилища."""
+        tenant = self._keys.pop(key, None)
+        if tenant is not None:
+            subscribers = self._tokens[tenant.token]
+            del subscribers[key]
+            if not subscribers:
+                del self._tokens[tenant.token]
+        return tenant
+
+    def remove(self, token):
+        """Удаление всех подписчиков токена."""
+        subscribers = self._tokens.pop(token, {})
+        for key in subscribers:
+            del self._keys[key]
+        return list(subscribers.values())
+
+    def get(self, token):
+        """Первый подписчик токена."""
+        subscribers = self._tokens.get(token)
+        return next(iter(subscribers.values())) if subscribers else None
+
+    def subscribers(self, token):
+        """Все подписчики токена."""
+        return list(self._tokens.get(token, {}).values())
+
+    def tokens(self):
+        """Токены без повторов."""
+        return list(self._tokens)
+
+    def get_by_key(self, key):
+        """Подписчик по ключу хранилища, см. checkpoint_key."""
+        return self._keys.get(key)
+
+    def __iter__(self):
+        """Обход подписчиков."""
+        return iter(list(self._keys.values()))
+
+    def __len__(self):
+        """Количество подписчиков."""
+        return len(self._keys)
+
+    def __contains__(self, token):
+        """Есть ли подписчики с токеном."""
+        return token in self._tokens
+
+
+def load_tenants(path=None):
+    """Загрузка реестра из JSON-файла, настроек или переменных окружения.
+
+    Файл содержит список объектов с ключами token, chat_id
+    и необязательными from_date, locale, verdicts (свои тексты
+    вердиктов по статусам), rate и burst (свой лимит запросов токена,
+    см. ratelimit). Тот же список можно задать ключом tenants
+    в CONFIG_FILE. Источники читаются через config.get_config, так что
+    после reload_config реестр строится по новым настройкам, а лимиты
+    токенов заменяются целиком: лимит удалённой записи не остаётся.
+    """
+    config = get_config()
+    path = path or config.get('TENANTS_FILE')
+    if path:
+        with open(path, encoding='UTF-8') as file:
+            records = json.load(file)
+    else:
+        records = config.get('tenants')
+    if records is None:
+        token = config.get('PRACTICUM_TOKEN')
+        chat_id = config.get('TELEGRAM_CHAT_ID')
+        records = []
+        if all([token, chat_id]):
+            records.append({'token': token, 'chat_id': chat_id})
+    tenants = [
+        Tenant(
+            token=record['token'],
+            chat_id=str(record['chat_id']),
+            from_date=int(record.get('from_date', 0)),
+            locale=record.get('locale', DEFAULT_LOCALE),
+            verdicts=record.get('verdicts'),
+        )
+        for record in records
+    ]
+    LIMITER.set_limits({
+        limit_key(tenant.headers): (float(record['rate']),
+                                    record.get('burst'))
+        for tenant, record in zip(tenants, records)
+        if record.get('rate') is not None
+    })
+    return TenantRegistry(tenants)
@@ -1,6 +1,8 @@
 import sys
 import os
 
+import pytest
+
 
 root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.append(root_dir)
@@ -26,3 +28,24 @@ os.environ['PRACTICUM_TOKEN'] = 'sometoken'
 os.environ['TELEGRAM_TOKEN'] = '1234:abcdefg'
 os.environ['TELEGRAM_CHAT_ID'] = '12345'
 
+
+@pytest.fixture
+def fake_endpoint(monkeypatch):
+    """Фейковый API Практикума вместо homework.ENDPOINT."""
+    import homework
+    from benchmarks.fake_practicum import start_server
+    server, url = start_server()
+    monkeypatch.setattr(homework, 'ENDPOINT', url)
+    yield server
+    server.shutdown()
+
+
+@pytest.fixture(autouse=True)
+def reset_shared_limits():
+    """Пауза после 429 и разомкнутая общая цепь не переходят в
+    следующие тесты."""
+    from circuit import ENDPOINT_BREAKER
+    from ratelimit import LIMITER
+    yield
+    LIMITER.reset()
+    ENDPOINT_BREAKER.record_success()
@@ -0,0 +1,45 @@
+import pytest
+
+from backfill import backfill
+from checkpoints import FileCheckpointStore, restore
+from tenants import Tenant, TenantRegistry
+
+HISTORY = [
+    {'id': 2, 'homework_name': 'hw2', 'status': 'approved',
+     'date_updated': '2023-02-01T10:00:00Z'},
+    {'id': 1, 'homework_name': 'hw1', 'status': 'approved',
+     'date_updated': '2023-01-02T10:00:00Z'},
+    {'id': 1, 'homework_name': 'hw1', 'status': 'reviewing',
+     'date_updated': '2023-01-01T10:00:00Z'},
+    {'id': 3, 'homework_name': 'hw3', 'status': 'unknown'},
+]
+
+
+@pytest.fixture
+def fake_endpoint(fake_endpoint):
+    fake_endpoint.homeworks = list(HISTORY)
+    return fake_endpoint
+
+
+class TestBackfill:
+    def test_history_becomes_starting_state(self, fake_endpoint, tmp_path):
+        store = FileCheckpointStore(str(tmp_path / 'state.log'))
+        registry = TenantRegistry(
+            Tenant(token=f'token-{index}', chat_id=str(index))
+            for index in range(4)
+        )
+        assert backfill(registry, store, workers=4) == 4
+        for tenant in registry:
+            from_date, tracker = restore(store.load(tenant.key))
+            assert from_date > 0
+            assert tracker.state == {
+                2: ('approved', '2023-02-01T10:00:00Z'),
+                1: ('approved', '2023-01-02T10:00:00Z'),
+            }
+
+    def test_stored_tenants_are_skipped(self, fake_endpoint, tmp_path):
+        store = FileCheckpointStore(str(tmp_path / 'state.log'))
+        tenant = Tenant(token='token', chat_id='1')
+        store.save(tenant.key, {'from_date': 1, 'homeworks': []})
+        assert backfill(TenantRegistry([tenant]), store) == 0
+        assert fake_endpoint.requests == 0
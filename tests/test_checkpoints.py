@@ -0,0 +1,84 @@
+import pytest
+
+from checkpoints import (FileCheckpointStore, SQLiteCheckpointStore, restore,
+                         snapshot)
+from transitions import StatusTracker
+
+
+@pytest.fixture(params=['checkpoints.db', 'checkpoints.log'])
+def store_path(request, tmp_path):
+    return str(tmp_path / request.param)
+
+
+def open_at(path, **kwargs):
+    if path.endswith('.db'):
+        return SQLiteCheckpointStore(path, **kwargs)
+    return FileCheckpointStore(path, **kwargs)
+
+
+class TestCheckpointStore:
+    def test_state_survives_reopen(self, store_path):
+        tracker = StatusTracker()
+        tracker.transitions([
+            {'id': 1, 'homework_name': 'hw1', 'status': 'reviewing',
+             'date_updated': '2023-03-01T10:00:00Z'},
+            {'homework_name': 'hw2', 'status': 'approved'},
+        ])
+        store = open_at(store_path)
+        store.save('tenant', snapshot(123, tracker))
+        store.close()
+
+        from_date, restored = restore(open_at(store_path).load('tenant'))
+        assert from_date == 123
+        assert restored.state == tracker.state
+        assert restored.in_review()
+
+    def test_nothing_is_written_before_flush(self, store_path):
+        store = open_at(store_path, batch_size=3, interval=3600)
+        store.save('a', {'from_date': 1, 'homeworks': []})
+        store.save('b', {'from_date': 1, 'homeworks': []})
+        store.maybe_flush()
+        assert open_at(store_path).load_all() == {}
+        store.save('c', {'from_date': 1, 'homeworks': []})
+        store.maybe_flush()
+        assert set(open_at(store_path).load_all()) == {'a', 'b', 'c'}
+
+    def test_latest_state_wins(self, store_path):
+        store = open_at(store_path)
+        for from_date in range(5):
+            store.save('a', {'from_date': from_date, 'homeworks': []})
+            store.flush()
+        store.close()
+        assert open_at(store_path).load('a')['from_date'] == 4
+
+    def test_missing_state_starts_from_now(self):
+        from_date, tracker = restore(None)
+        assert from_date > 0
+        assert tracker.state == {}
+
+
+def test_file_store_compacts_journal(tmp_path):
+    path = str(tmp_path / 'checkpoints.log')
+    store = FileCheckpointStore(path)
+    for from_date in range(10):
+        store.save('a', {'from_date': from_date, 'homeworks': []})
+        store.flush()
+    store.close()
+    FileCheckpointStore(path).close()
+    with open(path, encoding='UTF-8') as file:
+        assert len(file.readlines()) == 1
+
+
+def test_file_store_drops_torn_tail(tmp_path):
+    path = str(tmp_path / 'checkpoints.log')
+    store = FileCheckpointStore(path)
+    store.save('a', {'from_date': 1, 'homeworks': []})
+    store.close()
+    with open(path, 'a', encoding='UTF-8') as file:
+        file.write('["b", {"from_da')
+    store = FileCheckpointStore(path)
+    for key in ('c', 'd'):
+        store.save(key, {'from_date': 2, 'homeworks': []})
+        store.flush()
+    store.close()
+    assert sorted(FileCheckpointStore(path).load_all()) == ['a', 'c', 'd']
@@ -0,0 +1,139 @@
+import asyncio
+from http import HTTPStatus
+
+import aiohttp
+import pytest
+
+import homework
+import homework_async
+from circuit import (CLOSED, ENDPOINT_BREAKER, HALF_OPEN, OPEN,
+                     CircuitBreaker, ErrorReporter)
+from deadlines import Deadline, deadline_scope
+from exceptions import CircuitOpenError, DeadlineExceededError
+from ratelimit import LIMITER
+from scheduler import poll_tenant
+from tenants import Tenant
+from utils import FakeClock, RecordingBot
+
+
+def fail():
+    raise ConnectionError('down')
+
+
+class TestCircuitBreaker:
+    def test_opens_after_threshold(self):
+        breaker = CircuitBreaker(threshold=2, clock=FakeClock())
+        for _ in range(2):
+            with pytest.raises(ConnectionError):
+                breaker.call(fail)
+        assert breaker.state == OPEN
+        with pytest.raises(CircuitOpenError):
+            breaker.call(fail)
+
+    def test_half_open_trial(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(threshold=1, reset_timeout=10, clock=clock)
+        with pytest.raises(ConnectionError):
+            breaker.call(fail)
+        clock.now = 10
+        assert breaker.allow()
+        assert breaker.state == HALF_OPEN
+        assert not breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == OPEN
+        clock.now = 20
+        assert breaker.call(lambda: 'ok') == 'ok'
+        assert breaker.state == CLOSED
+
+    def test_reporter_deduplicates_by_class(self):
+        clock = FakeClock()
+        reporter = ErrorReporter(window=60, clock=clock)
+        assert reporter.should_report(ConnectionError('a'))
+        assert not reporter.should_report(ConnectionError('b'))
+        assert reporter.should_report(TimeoutError('c'))
+        clock.now = 60
+        assert reporter.should_report(ConnectionError('d'))
+
+
+class TestOutage:
+    def test_outage_is_reported_once_and_polling_suppressed(
+            self, fake_endpoint):
+        clock = FakeClock()
+        tenant = Tenant(token='token', chat_id='1', from_date=1)
+        tenant.breaker = CircuitBreaker(threshold=3, reset_timeout=300,
+                                        clock=clock)
+        tenant.reporter = ErrorReporter(window=3600, clock=clock)
+        bot = RecordingBot()
+
+        fake_endpoint.status = HTTPStatus.SERVICE_UNAVAILABLE
+        for _ in range(10):
+            poll_tenant(bot, tenant, session=None)
+            clock.now += 60
+        assert fake_endpoint.requests == 4
+        assert len(bot.texts) == 1
+
+        fake_endpoint.status = HTTPStatus.OK
+        clock.now += 300
+        poll_tenant(bot, tenant, session=None)
+        assert tenant.breaker.state == CLOSED
+        assert len(bot.texts) == 1
+
+    def test_outage_opens_one_breaker_for_all_tokens(self, fake_endpoint):
+        breaker = CircuitBreaker(threshold=3, reset_timeout=300,
+                                 clock=FakeClock())
+        tenants = [Tenant(token=f'token-{index}', chat_id=str(index),
+                          from_date=1, breaker=breaker)
+                   for index in range(10)]
+        fake_endpoint.status = HTTPStatus.SERVICE_UNAVAILABLE
+        for tenant in tenants:
+            poll_tenant(RecordingBot(), tenant, session=None)
+        assert fake_endpoint.requests == 3
+        assert breaker.state == OPEN
+
+    def test_tenants_share_endpoint_breaker_by_default(self):
+        first = Tenant(token='a', chat_id='1')
+        second = Tenant(token='b', chat_id='2')
+        assert first.breaker is second.breaker
+
+    def test_async_poll_goes_through_breaker(self, fake_endpoint,
+                                             monkeypatch):
+        sent = []
+
+        async def send_message(session, chat_id, message, token=None):
+            sent.append(message)
+
+        monkeypatch.setattr(homework_async, 'send_message', send_message)
+        breaker = CircuitBreaker(threshold=2, clock=FakeClock())
+        tenant = Tenant(token='token', chat_id='1', from_date=1,
+                        breaker=breaker)
+        fake_endpoint.status = HTTPStatus.SERVICE_UNAVAILABLE
+
+        async def poll():
+            async with aiohttp.ClientSession() as session:
+                for _ in range(5):
+                    await homework_async.poll_tenant(session, tenant)
+
+        asyncio.run(poll())
+        assert fake_endpoint.requests == 2
+        assert breaker.state == OPEN
+        assert len(sent) == 1
+
+    def test_long_retry_after_does_not_open_breaker(self, fake_endpoint,
+                                                    monkeypatch):
+        monkeypatch.setattr(homework_async, 'send_message',
+                            lambda *args, **kwargs: asyncio.sleep(0))
+        LIMITER.throttled('120')
+        with deadline_scope(Deadline.after(60)):
+            for _ in range(3):
+                with pytest.raises(DeadlineExceededError):
+                    ENDPOINT_BREAKER.call(homework.get_api_answer, 1)
+        tenant = Tenant(token='token', chat_id='1', from_date=1)
+
+        async def poll():
+            async with aiohttp.ClientSession() as session:
+                for _ in range(3):
+                    await homework_async.poll_tenant(session, tenant)
+
+        asyncio.run(poll())
+        assert ENDPOINT_BREAKER.state == CLOSED
+        assert fake_endpoint.requests == 0
@@ -0,0 +1,182 @@
+import functools
+import json
+import os
+import threading
+
+import pytest
+import requests
+
+import config
+import environment
+import utils
+from config import TokenCache, load_config, validate_tenants
+from scheduler import Scheduler
+from tenants import Tenant, TenantRegistry, load_tenants
+from utils import FakeClock, RecordingBot
+
+
+def make_registry(count):
+    return TenantRegistry(
+        Tenant(token=f'token-{index}', chat_id=str(index))
+        for index in range(count)
+    )
+
+
+def test_config_precedence(tmp_path, monkeypatch):
+    path = tmp_path / 'config.json'
+    path.write_text(json.dumps({'RETRY_PERIOD': '60', 'ONLY_FILE': 'file'}))
+    dotenv = tmp_path / '.env'
+    dotenv.write_text('RETRY_PERIOD=120\nONLY_DOTENV=dotenv\n')
+    monkeypatch.setenv('RETRY_PERIOD', '300')
+    values = load_config(str(path), str(dotenv))
+    assert values['RETRY_PERIOD'] == '300'
+    assert values['ONLY_FILE'] == 'file'
+    assert values['ONLY_DOTENV'] == 'dotenv'
+
+
+def test_config_is_read_once(monkeypatch):
+    calls = []
+    monkeypatch.setattr(config, 'load_config',
+                        lambda: calls.append(1) or {'KEY': '1'})
+    config.get_config.cache_clear()
+    try:
+        assert config.setting('KEY', kind=int) == 1
+        assert config.setting('MISSING', 5) == 5
+        assert len(calls) == 1
+        config.reload_config()
+        assert len(calls) == 2
+    finally:
+        config.get_config.cache_clear()
+
+
+class TestDotenvReload:
+    @pytest.fixture
+    def dotenv(self, tmp_path, monkeypatch):
+        path = tmp_path / '.env'
+        monkeypatch.setattr(environment, 'SEEDED', {})
+        monkeypatch.setattr(environment, 'seed',
+                            functools.partial(environment.seed, str(path)))
+        monkeypatch.setattr(config, 'load_config',
+                            functools.partial(load_config, None, str(path)))
+        for key in ('PRACTICUM_TOKEN', 'TELEGRAM_CHAT_ID', 'TENANTS_FILE',
+                    'ONLY_DOTENV'):
+            monkeypatch.delenv(key, raising=False)
+        config.get_config.cache_clear()
+        yield path
+        config.get_config.cache_clear()
+
+    def test_reload_picks_up_edited_dotenv(self, dotenv):
+        dotenv.write_text('PRACTICUM_TOKEN=old\nTELEGRAM_CHAT_ID=1\n')
+        environment.seed()
+        assert load_tenants().tokens() == ['old']
+        dotenv.write_text('PRACTICUM_TOKEN=new\nTELEGRAM_CHAT_ID=1\n')
+        config.reload_config()
+        assert load_tenants().tokens() == ['new']
+        assert os.environ['PRACTICUM_TOKEN'] == 'new'
+
+    def test_real_environment_still_wins(self, dotenv, monkeypatch):
+        monkeypatch.setenv('PRACTICUM_TOKEN', 'real')
+        dotenv.write_text('PRACTICUM_TOKEN=old\nONLY_DOTENV=1\n')
+        environment.seed()
+        dotenv.write_text('PRACTICUM_TOKEN=new\n')
+        values = config.reload_config()
+        assert values['PRACTICUM_TOKEN'] == 'real'
+        assert os.environ['PRACTICUM_TOKEN'] == 'real'
+        assert 'ONLY_DOTENV' not in values
+        assert 'ONLY_DOTENV' not in os.environ
+
+
+class TestTokenCache:
+    def test_result_expires(self):
+        clock = FakeClock(1000.0)
+        cache = TokenCache(path=None, ttl=60, clock=clock)
+        assert cache.get('token') is None
+        cache.put('token', False)
+        assert cache.get('token') is False
+        clock.now += 61
+        assert cache.get('token') is None
+
+    def test_survives_restart(self, tmp_path):
+        path = str(tmp_path / 'tokens.json')
+        cache = TokenCache(path=path)
+        cache.put('token', True)
+        cache.save()
+        assert TokenCache(path=path).get('token') is True
+        assert 'token' not in (tmp_path / 'tokens.json').read_text()
+
+
+class TestValidateTenants:
+    def test_rejected_tokens_are_quarantined(self):
+        registry = make_registry(4)
+        quarantined = validate_tenants(
+            registry, cache=TokenCache(path=None),
+            probe=lambda tenant, session: tenant.token != 'token-2',
+        )
+        assert [tenant.token for tenant in quarantined] == ['token-2']
+        assert registry.get('token-2').quarantined
+
+    def test_probes_run_in_parallel(self):
+        barrier = threading.Barrier(4, timeout=5)
+
+        def probe(tenant, session):
+            barrier.wait()
+            return True
+
+        validate_tenants(make_registry(4), cache=TokenCache(path=None),
+                         workers=4, probe=probe)
+
+    def test_cached_tokens_are_not_probed(self):
+        cache = TokenCache(path=None)
+        probed = []
+
+        def probe(tenant, session):
+            probed.append(tenant.token)
+            return True
+
+        validate_tenants(make_registry(3), cache=cache, probe=probe)
+        validate_tenants(make_registry(3), cache=cache, probe=probe)
+        assert len(probed) == 3
+
+    def test_unknown_result_is_not_cached(self):
+        cache = TokenCache(path=None)
+        registry = make_registry(1)
+        validate_tenants(registry, cache=cache,
+                         probe=lambda tenant, session: None)
+        assert not registry.get('token-0').quarantined
+        assert cache.get('token-0') is None
+
+
+@pytest.mark.parametrize('status_code', [401, 403])
+def test_auth_failure_quarantines_tenant(monkeypatch, status_code):
+    def mocked_get(*args, **kwargs):
+        response = utils.MockResponseGET(*args, **kwargs)
+        response.status_code = status_code
+        return response
+
+    monkeypatch.setattr(requests, 'get', mocked_get)
+    clock = FakeClock(1000.0)
+    tokens = TokenCache(path=None, clock=clock)
+    registry = make_registry(1)
+    scheduler = Scheduler(registry, RecordingBot(), period=60, clock=clock,
+                          session=requests, tokens=tokens)
+    scheduler.run_pending()
+    tenant = registry.get('token-0')
+    assert tenant.quarantined
+    assert tokens.get('token-0') is False
+    assert scheduler.next_due() == clock.now + config.QUARANTINE_INTERVAL
+
+
+def test_accepted_token_lifts_quarantine(monkeypatch, random_timestamp):
+    monkeypatch.setattr(
+        requests, 'get',
+        lambda *args, **kwargs: utils.MockResponseGET(
+            *args, random_timestamp=random_timestamp, **kwargs
+        ),
+    )
+    tokens = TokenCache(path=None)
+    registry = make_registry(1)
+    registry.get('token-0').quarantined = True
+    Scheduler(registry, RecordingBot(), period=0, session=requests,
+              tokens=tokens).run_pending()
+    assert not registry.get('token-0').quarantined
+    assert tokens.get('token-0') is True
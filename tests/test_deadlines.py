@@ -0,0 +1,100 @@
+import pytest
+
+import homework
+import deadlines
+from deadlines import (MIN_TIMEOUT, READ_TIMEOUT, SEND_TIMEOUT, Deadline,
+                       current_deadline, deadline_scope, request_timeout,
+                       send_timeout)
+from exceptions import DeadlineExceededError, RequestTimeoutError
+from metrics import Counter
+from scheduler import Scheduler
+from tenants import Tenant, TenantRegistry
+from utils import FakeClock
+from workers import WorkerPool
+
+
+class TimeoutBot:
+    def __init__(self):
+        self.texts = []
+        self.timeouts = []
+
+    def send_message(self, chat_id=None, text=None, timeout=None, **kwargs):
+        self.texts.append(text)
+        self.timeouts.append(timeout)
+
+
+@pytest.fixture
+def overruns(monkeypatch):
+    counter = Counter('overruns', '', labelname='stage')
+    monkeypatch.setattr(deadlines, 'OVERRUNS', counter)
+    monkeypatch.setattr(homework, 'OVERRUNS', counter)
+    return counter
+
+
+class TestBudget:
+    def test_defaults_outside_scope(self):
+        assert current_deadline() is None
+        assert request_timeout()[1] == READ_TIMEOUT
+        assert send_timeout() == SEND_TIMEOUT
+
+    def test_timeouts_capped_by_remaining_budget(self):
+        clock = FakeClock(100.0)
+        with deadline_scope(Deadline.after(5, clock)):
+            assert request_timeout() == (min(3.05, 5), 5)
+            clock.now += 4.5
+            assert request_timeout() == (0.5, 0.5)
+            assert send_timeout() == MIN_TIMEOUT
+        assert current_deadline() is None
+
+    def test_exhausted_budget_raises_typed_error(self, overruns):
+        clock = FakeClock(100.0)
+        with deadline_scope(Deadline.after(1, clock)):
+            clock.now += 3
+            with pytest.raises(DeadlineExceededError) as error:
+                request_timeout()
+        assert error.value.overrun == 2
+        assert 'api' in str(error.value)
+        assert overruns.value('api') == 1
+
+    def test_send_after_deadline_still_gets_timeout(self):
+        clock = FakeClock(100.0)
+        bot = TimeoutBot()
+        with deadline_scope(Deadline.after(1, clock)):
+            clock.now += 2
+            homework.send_chat_message(bot, '1', 'text')
+        assert bot.timeouts == [MIN_TIMEOUT]
+
+
+class TestPropagation:
+    def test_slow_endpoint_times_out(self, fake_endpoint, overruns):
+        fake_endpoint.latency = 1
+        with deadline_scope(Deadline.after(0.2)):
+            with pytest.raises(RequestTimeoutError):
+                homework.get_api_answer(1)
+        assert overruns.value('api') == 1
+
+    def test_scheduler_bounds_hung_poll(self, fake_endpoint):
+        fake_endpoint.latency = 1
+        fake_endpoint.publish('hw-1')
+        registry = TenantRegistry([Tenant(token='t', chat_id='1',
+                                          from_date=1)])
+        bot = TimeoutBot()
+        scheduler = Scheduler(registry, bot, period=0, deadline=0.2)
+        scheduler.run_pending()
+        assert fake_endpoint.requests == 1
+        assert len(bot.texts) == 1 and 'не ответил' in bot.texts[0]
+        assert bot.timeouts[0] == MIN_TIMEOUT
+
+    def test_pool_task_runs_in_its_deadline(self):
+        pool = WorkerPool(workers=1, queue_size=0)
+        seen = []
+        try:
+            deadline = pool.clock() + 30
+            pool.submit(
+                lambda: seen.append(current_deadline().expires),
+                deadline=deadline,
+            ).result(5)
+            pool.submit(lambda: seen.append(current_deadline())).result(5)
+        finally:
+            pool.shutdown()
+        assert seen == [deadline, None]
@@ -0,0 +1,122 @@
+import pytest
+import telegram
+
+import delivery
+from delivery import DeliveryQueue
+from metrics import Gauge, Histogram
+from utils import FakeClock, RecordingBot
+
+
+@pytest.fixture
+def queue_metrics(monkeypatch):
+    depth = Gauge('depth', '')
+    latency = Histogram('latency', '')
+    monkeypatch.setattr(delivery, 'QUEUE_DEPTH', depth)
+    monkeypatch.setattr(delivery, 'QUEUE_LATENCY', latency)
+    return depth, latency
+
+
+class TestDeliveryQueue:
+    def test_messages_for_one_chat_are_merged(self):
+        bot = RecordingBot()
+        queue = DeliveryQueue(bot, clock=FakeClock())
+        queue.send_message(chat_id=1, text='first')
+        queue.send_message(chat_id=1, text='second')
+        queue.dispatch_ready()
+        assert bot.sent == [(1, 'first\n\nsecond')]
+        assert queue.stats()['merged'] == 1
+        assert queue.depth() == 0
+
+    def test_per_chat_interval_is_respected(self):
+        bot = RecordingBot()
+        clock = FakeClock()
+        queue = DeliveryQueue(bot, per_chat_interval=1, clock=clock)
+        queue.send_message(chat_id=1, text='first')
+        queue.dispatch_ready()
+        queue.send_message(chat_id=1, text='second')
+        assert queue.dispatch_ready() == 1
+        assert len(bot.sent) == 1
+        clock.now = 1
+        queue.dispatch_ready()
+        assert bot.sent[-1] == (1, 'second')
+
+    def test_global_rate_spaces_chats(self):
+        bot = RecordingBot()
+        clock = FakeClock()
+        queue = DeliveryQueue(bot, global_rate=2, clock=clock)
+        for chat_id in range(3):
+            queue.send_message(chat_id=chat_id, text='message')
+        queue.dispatch_ready()
+        assert len(bot.sent) == 1
+        clock.now = 0.5
+        queue.dispatch_ready()
+        assert len(bot.sent) == 2
+
+    def test_retry_after_requeues_batch(self):
+        bot = RecordingBot(failures=[telegram.error.RetryAfter(5)])
+        clock = FakeClock()
+        queue = DeliveryQueue(bot, clock=clock)
+        queue.send_message(chat_id=1, text='first')
+        assert queue.dispatch_ready() == 5
+        assert queue.depth() == 1
+        clock.now = 5
+        queue.dispatch_ready()
+        assert bot.sent == [(1, 'first')]
+        assert queue.stats()['retries'] == 1
+
+    def test_network_errors_are_retried_with_backoff(self):
+        bot = RecordingBot(failures=[telegram.error.TimedOut(),
+                                     telegram.error.NetworkError('reset')])
+        clock = FakeClock()
+        queue = DeliveryQueue(bot, clock=clock)
+        queue.send_message(chat_id=1, text='first')
+        queue.send_message(chat_id=1, text='second')
+        assert queue.dispatch_ready() == delivery.RETRY_BASE
+        clock.now += delivery.RETRY_BASE
+        assert queue.dispatch_ready() == 2 * delivery.RETRY_BASE
+        assert queue.depth() == 2
+        clock.now += 2 * delivery.RETRY_BASE
+        queue.dispatch_ready()
+        assert bot.sent == [(1, 'first\n\nsecond')]
+        assert queue.stats()['retries'] == 2
+        assert queue.stats()['failures'] == 0
+
+    def test_bad_request_is_not_retried(self):
+        bot = RecordingBot(failures=[telegram.error.BadRequest('no chat')])
+        queue = DeliveryQueue(bot, clock=FakeClock())
+        queue.send_message(chat_id=1, text='first')
+        assert queue.dispatch_ready() is None
+        assert queue.stats()['failures'] == 1
+
+    def test_depth_and_queue_latency_are_exported(self, queue_metrics):
+        depth, latency = queue_metrics
+        bot = RecordingBot(failures=[telegram.TelegramError('bad')])
+        clock = FakeClock()
+        queue = DeliveryQueue(bot, per_chat_interval=0, clock=clock)
+        queue.send_message(chat_id=1, text='dropped')
+        queue.send_message(chat_id=2, text='first')
+        queue.send_message(chat_id=2, text='second')
+        assert depth.value() == 3
+        clock.now = 2
+        queue.dispatch_ready()
+        clock.now = 3
+        queue.dispatch_ready()
+        assert depth.value() == 0
+        assert latency.count == 2
+        assert 'latency_sum 6.0' in latency.collect()
+
+    def test_other_errors_are_dropped(self):
+        bot = RecordingBot(failures=[telegram.TelegramError('bad')])
+        queue = DeliveryQueue(bot, clock=FakeClock())
+        queue.send_message(chat_id=1, text='first')
+        queue.dispatch_ready()
+        assert queue.depth() == 0
+        assert queue.stats()['failures'] == 1
+
+    def test_stop_drains_queue(self):
+        bot = RecordingBot()
+        queue = DeliveryQueue(bot, per_chat_interval=0.01).start()
+        for index in range(3):
+            queue.send_message(chat_id=index, text='message')
+        queue.stop(timeout=5)
+        assert len(bot.sent) == 3
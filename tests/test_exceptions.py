@@ -0,0 +1,62 @@
+import pickle
+from http import HTTPStatus
+
+import pytest
+import requests
+
+import homework
+import utils
+from exceptions import (BotError, DeadlineExceededError, HTTPStatusError,
+                        MissingKeyError, TransportError, UnknownStatusError,
+                        WrongTypeError, is_retryable)
+
+
+class TestExceptions:
+    def test_message_is_built_from_fields(self):
+        error = HTTPStatusError(status_code=HTTPStatus.BAD_GATEWAY)
+        assert error.status_code == HTTPStatus.BAD_GATEWAY
+        assert str(error) == 'Недоступность эндпойнта 502'
+
+    @pytest.mark.parametrize('error, retryable', [
+        (TransportError(cause=None), True),
+        (HTTPStatusError(status_code=HTTPStatus.SERVICE_UNAVAILABLE), True),
+        (HTTPStatusError(status_code=HTTPStatus.TOO_MANY_REQUESTS), True),
+        (HTTPStatusError(status_code=HTTPStatus.UNAUTHORIZED), False),
+        (MissingKeyError(key='homeworks'), False),
+        (RuntimeError('unknown'), True),
+        (DeadlineExceededError(stage='api', overrun=1), True),
+        (DeadlineExceededError(stage='ratelimit', overrun=1), False),
+        (DeadlineExceededError(stage='queue', overrun=1), False),
+    ])
+    def test_retryable(self, error, retryable):
+        assert is_retryable(error) is retryable
+
+    def test_schema_errors_keep_builtin_bases(self):
+        assert isinstance(WrongTypeError(key='homeworks', expected='list',
+                                         actual='dict'), TypeError)
+        assert isinstance(UnknownStatusError(status='unknown'), KeyError)
+
+    def test_error_survives_pickling(self):
+        error = pickle.loads(pickle.dumps(MissingKeyError(key='status')))
+        assert isinstance(error, BotError)
+        assert str(error) == 'В ответе API нет ключа status'
+
+    def test_transport_failure_is_typed(self, monkeypatch):
+        def broken_get(*args, **kwargs):
+            raise requests.ConnectionError('down')
+
+        monkeypatch.setattr(requests, 'get', broken_get)
+        with pytest.raises(TransportError) as error:
+            homework.get_api_answer(1)
+        assert isinstance(error.value.cause, requests.ConnectionError)
+
+    def test_http_status_is_typed(self, monkeypatch):
+        monkeypatch.setattr(
+            requests, 'get',
+            lambda *args, **kwargs: utils.MockResponseGET(
+                http_status=HTTPStatus.INTERNAL_SERVER_ERROR
+            )
+        )
+        with pytest.raises(HTTPStatusError) as error:
+            homework.get_api_answer(1)
+        assert error.value.status_code == HTTPStatus.INTERNAL_SERVER_ERROR
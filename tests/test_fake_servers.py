@@ -0,0 +1,71 @@
+from functools import partial
+
+import pytest
+import telegram
+
+import homework
+from benchmarks import end_to_end, fake_practicum, fake_telegram
+from exceptions import HTTPStatusError
+
+
+@pytest.fixture
+def telegram_server():
+    server, base_url = fake_telegram.start_server()
+    yield server, partial(telegram.Bot, base_url=base_url)
+    server.shutdown()
+
+
+class TestFakeTelegram:
+    def test_messages_are_recorded(self, telegram_server):
+        server, make_bot = telegram_server
+        bot = make_bot(token=end_to_end.TELEGRAM_TOKEN)
+        assert bot.get_me().username == 'homework_bot'
+        message = bot.send_message(chat_id=12345, text='Ура!')
+        assert message.text == 'Ура!'
+        assert [(chat_id, text) for _, chat_id, text in server.messages] == [
+            ('12345', 'Ура!')
+        ]
+
+    def test_throttling(self, telegram_server):
+        server, make_bot = telegram_server
+        server.throttle_rate = 1
+        server.retry_after = 3
+        with pytest.raises(telegram.error.RetryAfter) as error:
+            make_bot(token=end_to_end.TELEGRAM_TOKEN).send_message(
+                chat_id=1, text='text'
+            )
+        assert error.value.retry_after == 3
+        assert not server.messages
+
+
+class TestFakePracticum:
+    @pytest.fixture
+    def server(self, monkeypatch):
+        server, url = fake_practicum.start_server(padding=3, seed=1)
+        monkeypatch.setattr(homework, 'ENDPOINT', url)
+        yield server
+        server.shutdown()
+
+    def test_published_after_from_date(self, server):
+        homework_record = server.publish('hw-1')
+        answer = homework.fetch_homeworks(0, homework.HEADERS)
+        assert answer['homeworks'][0] == homework_record
+        assert len(answer['homeworks']) == 4
+        later = homework.fetch_homeworks(answer['current_date'] + 1,
+                                         homework.HEADERS)
+        assert len(later['homeworks']) == 3
+
+    def test_throttling_sends_retry_after(self, server):
+        server.throttle_rate = 1
+        server.retry_after = 7
+        with pytest.raises(HTTPStatusError) as error:
+            homework.fetch_homeworks(0, homework.HEADERS)
+        assert error.value.status_code == 429
+        assert error.value.retry_after == '7'
+
+
+def test_end_to_end_run_notifies():
+    result = end_to_end.run(1, change_interval=0.1)
+    assert result['polls'] > 1
+    assert result['published'] > 0
+    assert len(result['latencies']) >= result['published'] - 1
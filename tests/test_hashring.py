@@ -0,0 +1,41 @@
+import pytest
+
+from hashring import HashRing
+
+KEYS = [f'tenant-{index}' for index in range(5000)]
+
+
+class TestHashRing:
+    def test_keys_are_spread_evenly(self):
+        ring = HashRing(f'shard-{index}' for index in range(4))
+        sizes = [len(keys) for keys in ring.assign(KEYS).values()]
+        assert sum(sizes) == len(KEYS)
+        assert min(sizes) > len(KEYS) / 4 * 0.7
+
+    def test_adding_node_moves_only_its_share(self):
+        ring = HashRing(f'shard-{index}' for index in range(4))
+        before = {key: ring.node_for(key) for key in KEYS}
+        ring.add('shard-4')
+        moved = [key for key in KEYS if ring.node_for(key) != before[key]]
+        assert all(ring.node_for(key) == 'shard-4' for key in moved)
+        assert len(moved) < len(KEYS) / 5 * 1.5
+
+    def test_removing_node_moves_only_its_keys(self):
+        ring = HashRing(f'shard-{index}' for index in range(4))
+        before = {key: ring.node_for(key) for key in KEYS}
+        ring.remove('shard-1')
+        for key in KEYS:
+            if before[key] != 'shard-1':
+                assert ring.node_for(key) == before[key]
+            else:
+                assert ring.node_for(key) != 'shard-1'
+
+    def test_assignment_does_not_depend_on_order(self):
+        first = HashRing(['a', 'b', 'c'])
+        second = HashRing(['c', 'a', 'b'])
+        assert all(first.node_for(key) == second.node_for(key)
+                   for key in KEYS[:500])
+
+    def test_empty_ring(self):
+        with pytest.raises(LookupError):
+            HashRing().node_for('tenant')
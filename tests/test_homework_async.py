@@ -0,0 +1,42 @@
+import asyncio
+import time
+
+import aiohttp
+import pytest
+
+import homework
+import homework_async
+from tenants import Tenant
+
+
+class TestHomeworkAsync:
+    def test_polls_overlap_on_one_loop(self, fake_endpoint):
+        fake_endpoint.latency = 0.2
+        tenants = [Tenant(token=f'token-{index}', chat_id=str(index),
+                          from_date=1) for index in range(20)]
+
+        async def poll():
+            async with aiohttp.ClientSession() as session:
+                await asyncio.gather(*(
+                    homework_async.poll_tenant(session, tenant)
+                    for tenant in tenants
+                ))
+
+        started = time.perf_counter()
+        asyncio.run(poll())
+        elapsed = time.perf_counter() - started
+        assert all(tenant.from_date > 1 for tenant in tenants)
+        assert fake_endpoint.requests == len(tenants)
+        assert elapsed < len(tenants) * fake_endpoint.latency / 4
+
+    def test_check_response_coroutine_keeps_validation(self):
+        with pytest.raises(TypeError):
+            asyncio.run(homework_async.check_response([]))
+
+    def test_parse_status_coroutine(self):
+        message = asyncio.run(homework_async.parse_status(
+            {'homework_name': 'hw123', 'status': 'approved'}
+        ))
+        assert message == homework.parse_status(
+            {'homework_name': 'hw123', 'status': 'approved'}
+        )
@@ -0,0 +1,51 @@
+from types import SimpleNamespace
+
+from homework import RETRY_PERIOD
+from intervals import MAX_INTERVAL, AdaptiveInterval
+
+
+def make_policy(**kwargs):
+    params = dict(base=600, minimum=60, maximum=3600, reviewing=120,
+                  factor=2, jitter=0, budget=0, rng=lambda: 0.5)
+    params.update(kwargs)
+    return AdaptiveInterval(**params)
+
+
+class TestAdaptiveInterval:
+    def test_idle_tenant_backs_off_to_maximum(self):
+        policy = make_policy()
+        tenant = SimpleNamespace(token='a', status='approved')
+        intervals = [policy.next_interval(tenant, False) for _ in range(5)]
+        assert intervals == [1200, 2400, 3600, 3600, 3600]
+
+    def test_change_and_reviewing_tighten_interval(self):
+        policy = make_policy()
+        tenant = SimpleNamespace(token='a', status='reviewing')
+        assert policy.next_interval(tenant, True) == 60
+        assert policy.next_interval(tenant, False) == 120
+        tenant.status = 'approved'
+        assert policy.next_interval(tenant, False) == 240
+
+    def test_jitter_stays_within_bounds(self):
+        tenant = SimpleNamespace(token='a', status='reviewing')
+        low = make_policy(jitter=0.1, rng=lambda: 0.0)
+        high = make_policy(jitter=0.1, rng=lambda: 1.0)
+        assert low.next_interval(tenant, False) == 108
+        assert high.next_interval(tenant, False) == 132
+
+    def test_idle_interval_never_exceeds_retry_period_by_default(self):
+        assert MAX_INTERVAL == RETRY_PERIOD
+        policy = make_policy(maximum=MAX_INTERVAL, jitter=0.1,
+                             rng=lambda: 1.0)
+        tenant = SimpleNamespace(token='a', status='approved')
+        intervals = [policy.next_interval(tenant, False) for _ in range(3)]
+        assert intervals == [RETRY_PERIOD] * 3
+
+    def test_budget_stretches_intervals(self):
+        policy = make_policy(budget=1 / 60)
+        first = SimpleNamespace(token='a', status='reviewing')
+        second = SimpleNamespace(token='b', status='reviewing')
+        assert policy.next_interval(first, False) == 120
+        assert policy.next_interval(second, False) == 120
+        policy.forget('a')
+        assert policy.next_interval(second, True) == 60
@@ -0,0 +1,162 @@
+import os
+import signal
+import threading
+import time
+
+import pytest
+import requests
+import telegram
+
+import homework
+import utils
+from checkpoints import FileCheckpointStore, snapshot
+from lifecycle import Interrupted, Lifecycle
+from scheduler import Scheduler
+from tenants import Tenant, TenantRegistry
+from transitions import StatusTracker
+from utils import RecordingBot
+
+
+def send_later(signum, delay=0.2):
+    timer = threading.Timer(delay, os.kill, (os.getpid(), signum))
+    timer.start()
+    return timer
+
+
+@pytest.fixture
+def lifecycle():
+    lifecycle = Lifecycle().install()
+    yield lifecycle
+    lifecycle.restore()
+
+
+class TestLifecycle:
+    def test_stop_signal_wakes_wait(self, lifecycle):
+        send_later(signal.SIGTERM)
+        started = time.monotonic()
+        lifecycle.wait(5)
+        assert time.monotonic() - started < 2
+        assert lifecycle.stopping
+
+    def test_stop_signal_interrupts_sleep(self, lifecycle):
+        send_later(signal.SIGTERM)
+        with pytest.raises(Interrupted):
+            with lifecycle.interruptible():
+                time.sleep(5)
+        assert lifecycle.stopping
+
+    def test_signal_outside_interruptible_is_remembered(self, lifecycle):
+        os.kill(os.getpid(), signal.SIGHUP)
+        assert lifecycle.take_reload()
+        assert not lifecycle.take_reload()
+        assert not lifecycle.stopping
+
+    def test_resize_signals_are_counted(self):
+        lifecycle = Lifecycle().install(resize=True)
+        try:
+            os.kill(os.getpid(), signal.SIGTTIN)
+            os.kill(os.getpid(), signal.SIGTTIN)
+            os.kill(os.getpid(), signal.SIGTTOU)
+            assert lifecycle.take_resize() == 1
+            assert lifecycle.take_resize() == 0
+        finally:
+            lifecycle.restore()
+
+    def test_pending_stop_interrupts_immediately(self, lifecycle):
+        lifecycle.stop()
+        with pytest.raises(Interrupted):
+            with lifecycle.interruptible():
+                time.sleep(5)
+
+    def test_handlers_are_restored(self):
+        previous = signal.getsignal(signal.SIGTERM)
+        lifecycle = Lifecycle().install()
+        assert signal.getsignal(signal.SIGTERM) != previous
+        lifecycle.restore()
+        assert signal.getsignal(signal.SIGTERM) == previous
+
+
+def test_main_stops_on_sigterm_and_saves_cursor(monkeypatch, tmp_path,
+                                                random_timestamp):
+    store = FileCheckpointStore(str(tmp_path / 'state.log'))
+    monkeypatch.setattr(homework, 'open_store', lambda: store)
+    monkeypatch.setattr(telegram, 'Bot', utils.MockTelegramBot)
+    monkeypatch.setattr(
+        requests, 'get',
+        lambda *args, **kwargs: utils.MockResponseGET(
+            random_timestamp=random_timestamp
+        ),
+    )
+    send_later(signal.SIGTERM, 0.5)
+    started = time.monotonic()
+    homework.main()
+    assert time.monotonic() - started < 5
+    state = FileCheckpointStore(str(tmp_path / 'state.log')).load(
+        homework.checkpoint_key(homework.PRACTICUM_TOKEN,
+                                homework.TELEGRAM_CHAT_ID)
+    )
+    assert state['from_date'] == random_timestamp
+    assert state['due'] > time.time()
+
+
+def test_main_reload_waits_out_the_period(monkeypatch, tmp_path,
+                                          random_timestamp):
+    calls = []
+
+    def get(*args, **kwargs):
+        calls.append(1)
+        return utils.MockResponseGET(random_timestamp=random_timestamp)
+
+    store = FileCheckpointStore(str(tmp_path / 'state.log'))
+    monkeypatch.setattr(homework, 'open_store', lambda: store)
+    monkeypatch.setattr(homework, 'reload_settings', lambda: True)
+    monkeypatch.setattr(telegram, 'Bot', utils.MockTelegramBot)
+    monkeypatch.setattr(requests, 'get', get)
+    send_later(signal.SIGHUP, 0.3)
+    send_later(signal.SIGHUP, 0.6)
+    send_later(signal.SIGTERM, 1.0)
+    homework.main()
+    assert calls == [1]
+
+
+class TestSchedulerRestart:
+    def test_saved_due_prevents_repeated_polls(self, monkeypatch, tmp_path):
+        calls = []
+        monkeypatch.setattr(requests, 'get',
+                            lambda *args, **kwargs: calls.append(1))
+        registry = TenantRegistry(
+            Tenant(token=f'token-{index}', chat_id=str(index))
+            for index in range(10)
+        )
+        store = FileCheckpointStore(str(tmp_path / 'state.log'))
+        for tenant in registry:
+            store.save(tenant.key, snapshot(5, StatusTracker(), 1000 + 300))
+        scheduler = Scheduler(registry, RecordingBot(), period=600,
+                              clock=lambda: 1000, session=requests,
+                              store=store)
+        assert scheduler.run_pending() == 0
+        assert calls == []
+        assert scheduler.next_due() == 1300
+        assert all(tenant.from_date == 5 for tenant in registry)
+
+    def test_reload_keeps_state_and_drops_removed(self, monkeypatch):
+        registry = TenantRegistry([Tenant(token='a', chat_id='1'),
+                                   Tenant(token='b', chat_id='2')])
+        scheduler = Scheduler(registry, RecordingBot(), period=600,
+                              clock=lambda: 1000, session=requests)
+        kept = registry.get('a')
+        kept.from_date = 42
+        moved = registry.get('b')
+        moved.from_date = 43
+        scheduler.reload(TenantRegistry([
+            Tenant(token='a', chat_id='1'),
+            Tenant(token='b', chat_id='3'),
+            Tenant(token='c', chat_id='4'),
+        ]))
+        assert scheduler.registry is registry
+        assert registry.get('a') is kept
+        assert registry.get('b').chat_id == '3'
+        assert registry.get('b').from_date == 43
+        assert 'c' in registry
+        scheduler.reload(TenantRegistry([Tenant(token='a', chat_id='1')]))
+        assert len(registry) == 1
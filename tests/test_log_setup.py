@@ -0,0 +1,79 @@
+import json
+import logging
+import sys
+
+import pytest
+
+from log_setup import JSONFormatter, file_handler, setup_logging
+
+
+@pytest.fixture
+def restore_logging():
+    root = logging.getLogger()
+    handlers, level = root.handlers[:], root.level
+    srcfile = logging._srcfile
+    yield
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    for handler in handlers:
+        root.addHandler(handler)
+    root.setLevel(level)
+    logging._srcfile = srcfile
+    logging.logThreads = logging.logProcesses = True
+    logging.logMultiprocessing = True
+
+
+class TestSetupLogging:
+    def test_records_go_through_queue_to_file(self, tmp_path,
+                                              restore_logging):
+        path = tmp_path / 'log.txt'
+        listener = setup_logging(str(path), stream=None)
+        logging.getLogger('bot').info('Чат %s: %s', 1, 'ok')
+        listener.stop()
+        assert path.read_text(encoding='UTF-8').endswith(
+            'INFO, bot, Чат 1: ok\n'
+        )
+
+    def test_json_lines(self, tmp_path, restore_logging):
+        path = tmp_path / 'log.jsonl'
+        listener = setup_logging(str(path), json_lines=True, stream=None)
+        logging.getLogger('bot').warning('Лимит %s', 5)
+        listener.stop()
+        record = json.loads(path.read_text(encoding='UTF-8'))
+        assert record['level'] == 'WARNING'
+        assert record['logger'] == 'bot'
+        assert record['message'] == 'Лимит 5'
+
+    def test_level_is_respected(self, tmp_path, restore_logging):
+        path = tmp_path / 'log.txt'
+        listener = setup_logging(str(path), level='WARNING', stream=None)
+        logging.getLogger('bot').info('не попадёт')
+        listener.stop()
+        assert path.read_text(encoding='UTF-8') == ''
+
+
+class TestJSONFormatter:
+    def test_exception_is_included(self):
+        try:
+            raise ValueError('плохой ответ')
+        except ValueError:
+            record = logging.LogRecord(
+                'bot', logging.ERROR, __file__, 1, 'Сбой', None,
+                exc_info=sys.exc_info(),
+            )
+        payload = json.loads(JSONFormatter().format(record))
+        assert 'ValueError: плохой ответ' in payload['exc']
+
+
+def test_size_rotation(tmp_path):
+    path = tmp_path / 'log.txt'
+    handler = file_handler(str(path), max_bytes=100, backup_count=2)
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    for index in range(20):
+        handler.emit(logging.LogRecord(
+            'bot', logging.INFO, __file__, 1, 'x' * 40, None, None
+        ))
+    handler.close()
+    assert sorted(item.name for item in tmp_path.iterdir()) == [
+        'log.txt', 'log.txt.1', 'log.txt.2'
+    ]
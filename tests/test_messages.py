@@ -0,0 +1,71 @@
+import pytest
+
+from exceptions import UnknownStatusError, WrongTypeError
+from homework import HOMEWORK_VERDICTS, parse_status
+from messages import MessageRenderer, get_renderer
+from tenants import Tenant
+
+
+def homework(status='approved', name='hw123'):
+    return {'id': 1, 'homework_name': name, 'status': status}
+
+
+class TestMessageRenderer:
+    def test_matches_parse_status(self):
+        renderer = MessageRenderer(HOMEWORK_VERDICTS)
+        for status in HOMEWORK_VERDICTS:
+            assert renderer.render(homework(status)) == parse_status(
+                homework(status)
+            )
+
+    def test_rendered_messages_are_cached(self):
+        renderer = MessageRenderer(HOMEWORK_VERDICTS, cache_size=2)
+        renderer.render(homework())
+        renderer.render(homework())
+        info = renderer.render_status.cache_info()
+        assert (info.hits, info.misses) == (1, 1)
+
+    def test_cache_is_bounded(self):
+        renderer = MessageRenderer(HOMEWORK_VERDICTS, cache_size=2)
+        for index in range(5):
+            renderer.render(homework(name=f'hw{index}'))
+        assert renderer.render_status.cache_info().currsize == 2
+
+    def test_unknown_status(self):
+        renderer = MessageRenderer(HOMEWORK_VERDICTS)
+        with pytest.raises(UnknownStatusError):
+            renderer.render(homework('unknown'))
+
+    def test_name_is_validated(self):
+        renderer = MessageRenderer(HOMEWORK_VERDICTS)
+        with pytest.raises(WrongTypeError):
+            renderer.render(homework(name=123))
+
+    def test_name_with_braces_is_not_formatted(self):
+        renderer = MessageRenderer(HOMEWORK_VERDICTS)
+        assert '"{name}"' in renderer.render(homework(name='{name}'))
+
+
+class TestGetRenderer:
+    def test_same_settings_share_renderer(self):
+        assert get_renderer(HOMEWORK_VERDICTS) is get_renderer(
+            dict(HOMEWORK_VERDICTS)
+        )
+
+    def test_locale_and_overrides(self):
+        renderer = get_renderer(HOMEWORK_VERDICTS, 'en',
+                                {'approved': 'Accepted!'})
+        message = renderer.render(homework())
+        assert message == 'Homework "hw123" status changed. Accepted!'
+        assert 'reviewed' in renderer.render(homework('reviewing'))
+
+    def test_unknown_locale(self):
+        with pytest.raises(ValueError):
+            get_renderer(HOMEWORK_VERDICTS, 'xx')
+
+    def test_tenant_custom_verdicts(self):
+        tenant = Tenant('token', '1', verdicts={'approved': 'Зачтено.'})
+        assert tenant.renderer.render(homework()).endswith('Зачтено.')
+        assert tenant.renderer.render(homework('rejected')).endswith(
+            HOMEWORK_VERDICTS['rejected']
+        )
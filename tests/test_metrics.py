@@ -0,0 +1,87 @@
+import threading
+import urllib.request
+
+import metrics
+from metrics import Counter, Gauge, Histogram, NullMetric, Registry
+
+
+class TestHistogram:
+    def test_buckets_are_cumulative(self):
+        histogram = Histogram('latency_seconds', 'Задержка.',
+                              buckets=(0.1, 1))
+        for value in (0.05, 0.1, 0.5, 2):
+            histogram.observe(value)
+        lines = histogram.collect()
+        assert 'latency_seconds_bucket{le="0.1"} 2' in lines
+        assert 'latency_seconds_bucket{le="1"} 3' in lines
+        assert 'latency_seconds_bucket{le="+Inf"} 4' in lines
+        assert 'latency_seconds_sum 2.65' in lines
+        assert 'latency_seconds_count 4' in lines
+
+    def test_timer_records_on_exception(self):
+        histogram = Histogram('latency_seconds', 'Задержка.')
+        try:
+            with histogram.time():
+                raise ValueError
+        except ValueError:
+            pass
+        assert histogram.count == 1
+
+    def test_concurrent_observations_are_not_lost(self, monkeypatch):
+        monkeypatch.setattr(metrics, 'FOLD_SIZE', 7)
+        histogram = Histogram('latency_seconds', 'Задержка.')
+
+        def work():
+            for _ in range(1000):
+                histogram.observe(0.01)
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert histogram.count == 8000
+
+
+class TestCounter:
+    def test_labels(self):
+        counter = Counter('errors', 'Ошибки.', labelname='type')
+        counter.inc('TransportError')
+        counter.inc('TransportError')
+        counter.inc('DecodeError', amount=3)
+        assert counter.value('TransportError') == 2
+        assert 'errors_total{type="DecodeError"} 3' in counter.collect()
+
+
+class TestGauge:
+    def test_goes_up_and_down(self):
+        gauge = Gauge('queue_depth', 'Глубина.')
+        gauge.inc(amount=3)
+        gauge.inc(amount=-2)
+        assert gauge.value() == 1
+        assert 'queue_depth 1' in gauge.collect()
+        gauge.set(0)
+        assert gauge.value() == 0
+
+
+class TestRegistry:
+    def test_disabled_registry_returns_null_metrics(self):
+        registry = Registry(enabled=False)
+        histogram = registry.histogram('latency_seconds', 'Задержка.')
+        assert isinstance(histogram, NullMetric)
+        with histogram.time():
+            pass
+        assert registry.render() == '\n'
+
+    def test_endpoint_serves_metrics(self):
+        registry = Registry()
+        registry.counter('messages_sent', 'Сообщения.').inc()
+        server = metrics.serve(registry, port=0)
+        try:
+            url = f'http://127.0.0.1:{server.server_address[1]}/metrics'
+            with urllib.request.urlopen(url) as response:
+                body = response.read().decode()
+        finally:
+            server.shutdown()
+            server.server_close()
+        assert 'messages_sent_total 1' in body.splitlines()
@@ -0,0 +1,118 @@
+import json
+
+import pytest
+
+import homework
+from exceptions import DeadlineExceededError, HTTPStatusError
+from ratelimit import (DEFAULT_RETRY_AFTER, LIMITER, RateLimiter,
+                       TokenBucket, parse_retry_after)
+from scheduler import Scheduler
+from tenants import Tenant, TenantRegistry, load_tenants
+from utils import FakeClock, RecordingBot
+
+
+@pytest.fixture
+def clock():
+    return FakeClock(100.0)
+
+
+class TestRateLimiter:
+    def test_burst_then_sustained_rate(self, clock):
+        limiter = RateLimiter(rate=2, burst=3, clock=clock,
+                              sleep=clock.sleep)
+        waits = [limiter.acquire() for _ in range(5)]
+        assert waits == [0, 0, 0, 0.5, 0.5]
+        assert clock.now == 101
+
+    def test_delay_spreads_queued_requests(self, clock):
+        limiter = RateLimiter(rate=4, burst=2, clock=clock)
+        assert [limiter.delay(ahead=index) for index in range(4)] == [
+            0, 0, 0.25, 0.5
+        ]
+        assert limiter.delay() == 0
+
+    def test_token_limit_overrides_default(self, clock):
+        limiter = RateLimiter(rate=0, token_rate=0, clock=clock,
+                              sleep=clock.sleep)
+        limiter.set_limit('slow', rate=0.1, burst=1)
+        limiter.acquire('slow')
+        assert limiter.delay('slow') == 10
+        assert limiter.delay('other') == 0
+        assert limiter.acquire('other') == 0
+
+    def test_wait_beyond_timeout_raises_without_taking(self, clock):
+        limiter = RateLimiter(rate=1, burst=1, clock=clock)
+        limiter.reserve()
+        with pytest.raises(DeadlineExceededError):
+            limiter.reserve(timeout=0.5)
+        assert limiter.delay() == 1
+
+    def test_throttled_pauses_every_request(self, clock):
+        limiter = RateLimiter(rate=0, clock=clock)
+        assert limiter.throttled('7') == 7
+        assert limiter.delay() == 7
+        assert limiter.delay('any-token') == 7
+        clock.now += 7
+        assert limiter.delay() == 0
+
+    @pytest.mark.parametrize('value, expected', [
+        ('3', 3),
+        ('-1', 0),
+        ('Thu, 01 Jan 1970 00:00:30 GMT', 10),
+        ('soon', DEFAULT_RETRY_AFTER),
+        ('inf', DEFAULT_RETRY_AFTER),
+        (None, DEFAULT_RETRY_AFTER),
+    ])
+    def test_parse_retry_after(self, value, expected):
+        assert parse_retry_after(value, now=20) == expected
+
+
+class TestIntegration:
+    def test_429_pauses_shared_limiter(self, fake_endpoint):
+        fake_endpoint.throttle_rate = 1
+        fake_endpoint.retry_after = 30
+        with pytest.raises(HTTPStatusError):
+            homework.fetch_homeworks(0, homework.HEADERS)
+        assert LIMITER.delay() > 29
+
+    def test_scheduler_defers_polls_over_limit(self, fake_endpoint,
+                                               monkeypatch):
+        monkeypatch.setattr(LIMITER, 'bucket',
+                            TokenBucket(1, 2, LIMITER.clock()))
+        registry = TenantRegistry(
+            Tenant(token=f'token-{index}', chat_id=str(index), from_date=1)
+            for index in range(4)
+        )
+        scheduler = Scheduler(registry, RecordingBot(), period=0)
+        scheduler.period = 60
+        now = scheduler.clock()
+        assert scheduler.run_pending() == 2
+        assert fake_endpoint.requests == 2
+        deferred = sorted(scheduler._due.values())[:2]
+        assert [round(moment - now) for moment in deferred] == [1, 2]
+        assert scheduler.run_pending() == 0
+
+    def test_tenant_record_sets_token_limit(self, tmp_path):
+        path = tmp_path / 'tenants.json'
+        path.write_text(json.dumps([
+            {'token': 'limited', 'chat_id': 1, 'rate': 0.5, 'burst': 1},
+        ]))
+        tenant = load_tenants(str(path)).get('limited')
+        LIMITER.reserve(tenant.headers['Authorization'])
+        assert LIMITER.delay(tenant.headers['Authorization']) > 1
+
+    def test_reload_drops_stale_token_limits(self, tmp_path):
+        path = tmp_path / 'tenants.json'
+        path.write_text(json.dumps([
+            {'token': 'limited', 'chat_id': 1, 'rate': 0.5, 'burst': 1},
+            {'token': 'other', 'chat_id': 2, 'rate': 0.5, 'burst': 1},
+        ]))
+        key = load_tenants(str(path)).get('limited').headers['Authorization']
+        LIMITER.reserve(key)
+        path.write_text(json.dumps([
+            {'token': 'limited', 'chat_id': 1},
+            {'token': 'other', 'chat_id': 2, 'rate': 0.5, 'burst': 1},
+        ]))
+        load_tenants(str(path))
+        assert LIMITER.delay(key) == 0
+        assert LIMITER._limits == {'OAuth other': (0.5, 1)}
@@ -0,0 +1,94 @@
+import json
+from http import HTTPStatus
+
+import pytest
+
+from response_cache import ResponseCache, body_digest
+
+
+class FakeResponse:
+    def __init__(self, status_code=HTTPStatus.OK, data=None, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.content = json.dumps(data).encode() if data is not None else b''
+        self.json_calls = 0
+
+    def json(self):
+        self.json_calls += 1
+        return json.loads(self.content)
+
+
+class FakeSession:
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.sent_headers = []
+
+    def get(self, url, headers=None, params=None, **kwargs):
+        self.sent_headers.append(headers)
+        return self.responses.pop(0)
+
+
+def validate(response):
+    validate.calls += 1
+    return response['homeworks']
+
+
+HOMEWORKS = [{'homework_name': 'hw123', 'status': 'approved'}]
+
+
+class TestResponseCache:
+    def setup_method(self):
+        validate.calls = 0
+
+    def test_digest_ignores_current_date(self):
+        first = json.dumps({'homeworks': [], 'current_date': 1}).encode()
+        second = json.dumps({'homeworks': [], 'current_date': 2}).encode()
+        assert body_digest(first)[0] == body_digest(second)[0]
+        assert body_digest(second)[1] == 2
+
+    def test_same_body_skips_decoding_and_validation(self):
+        repeated = FakeResponse(data={'homeworks': HOMEWORKS,
+                                      'current_date': 20})
+        session = FakeSession(
+            FakeResponse(data={'homeworks': HOMEWORKS, 'current_date': 10}),
+            repeated,
+        )
+        cache = ResponseCache()
+        assert cache.fetch('token', 1, {}, validate, session)[2]
+        homeworks, current_date, changed = cache.fetch(
+            'token', 10, {}, validate, session
+        )
+        assert not changed
+        assert homeworks == HOMEWORKS
+        assert current_date == 20
+        assert repeated.json_calls == 0
+        assert validate.calls == 1
+
+    def test_not_modified_sends_validators(self):
+        session = FakeSession(
+            FakeResponse(data={'homeworks': [], 'current_date': 10},
+                         headers={'ETag': '"v1"',
+                                  'Last-Modified': 'yesterday'}),
+            FakeResponse(status_code=HTTPStatus.NOT_MODIFIED),
+        )
+        cache = ResponseCache()
+        cache.fetch('token', 1, {'Authorization': 'OAuth token'},
+                    validate, session)
+        _, current_date, changed = cache.fetch(
+            'token', 10, {'Authorization': 'OAuth token'}, validate, session
+        )
+        assert not changed
+        assert current_date == 10
+        assert session.sent_headers[1]['If-None-Match'] == '"v1"'
+        assert session.sent_headers[1]['If-Modified-Since'] == 'yesterday'
+
+    def test_invalid_body_is_not_cached(self):
+        def failing_validate(response):
+            raise TypeError('bad')
+
+        body = {'homeworks': {}, 'current_date': 10}
+        session = FakeSession(FakeResponse(data=body), FakeResponse(data=body))
+        cache = ResponseCache()
+        for _ in range(2):
+            with pytest.raises(TypeError):
+                cache.fetch('token', 1, {}, failing_validate, session)
@@ -0,0 +1,84 @@
+import requests
+
+import utils
+from scheduler import Scheduler
+from tenants import Tenant, TenantRegistry
+from utils import RecordingBot
+
+
+def mock_get_with_data(data):
+    def mocked_get(*args, **kwargs):
+        response = utils.MockResponseGET(*args, **kwargs)
+        response.json = lambda: data
+        return response
+    return mocked_get
+
+
+class TestScheduler:
+    def test_all_tenants_polled_in_one_pass(self, monkeypatch,
+                                            random_timestamp):
+        calls = []
+
+        def mocked_get(url, headers=None, params=None, **kwargs):
+            calls.append(headers['Authorization'])
+            return utils.MockResponseGET(random_timestamp=random_timestamp)
+
+        monkeypatch.setattr(requests, 'get', mocked_get)
+        registry = TenantRegistry(
+            Tenant(token=f'token-{index}', chat_id=str(index))
+            for index in range(5)
+        )
+        scheduler = Scheduler(registry, RecordingBot(), period=0,
+                              session=requests)
+        assert scheduler.run_pending() == 5
+        assert sorted(calls) == sorted(
+            f'OAuth token-{index}' for index in range(5)
+        )
+        for tenant in registry:
+            assert tenant.from_date == random_timestamp
+
+    def test_status_sent_once_per_tenant(self, monkeypatch, random_timestamp):
+        data = {
+            'homeworks': [{'homework_name': 'hw123', 'status': 'approved'}],
+            'current_date': random_timestamp,
+        }
+        monkeypatch.setattr(requests, 'get', mock_get_with_data(data))
+        registry = TenantRegistry([Tenant(token='a', chat_id='1'),
+                                   Tenant(token='b', chat_id='2')])
+        bot = RecordingBot()
+        scheduler = Scheduler(registry, bot, period=0, session=requests)
+        scheduler.run_pending()
+        scheduler.run_pending()
+        assert sorted(chat_id for chat_id, _ in bot.sent) == ['1', '2']
+
+    def test_every_changed_homework_is_sent(self, monkeypatch,
+                                            random_timestamp):
+        data = {
+            'homeworks': [
+                {'id': 1, 'homework_name': 'hw1', 'status': 'approved'},
+                {'id': 2, 'homework_name': 'hw2', 'status': 'rejected'},
+            ],
+            'current_date': random_timestamp,
+        }
+        monkeypatch.setattr(requests, 'get', mock_get_with_data(data))
+        registry = TenantRegistry([Tenant(token='a', chat_id='1')])
+        bot = RecordingBot()
+        scheduler = Scheduler(registry, bot, period=0, session=requests)
+        scheduler.run_pending()
+        scheduler.run_pending()
+        assert len(bot.sent) == 2
+
+    def test_removed_tenant_is_not_polled(self, monkeypatch,
+                                          random_timestamp):
+        monkeypatch.setattr(
+            requests, 'get',
+            lambda *args, **kwargs: utils.MockResponseGET(
+                random_timestamp=random_timestamp
+            )
+        )
+        registry = TenantRegistry([Tenant(token='a', chat_id='1'),
+                                   Tenant(token='b', chat_id='2')])
+        scheduler = Scheduler(registry, RecordingBot(), period=0,
+                              session=requests)
+        registry.remove('a')
+        assert scheduler.run_pending() == 1
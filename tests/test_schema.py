@@ -0,0 +1,36 @@
+import pytest
+
+from exceptions import (MissingKeyError, NoCurrentDateKeyInResponseError,
+                        UnknownStatusError, WrongTypeError)
+from homework import (check_response, validate_homework, validate_homeworks,
+                      validate_response)
+
+
+class TestSchema:
+    def test_valid_data_has_no_violations(self):
+        assert validate_response({'homeworks': [], 'current_date': 1}) == []
+        assert validate_homework(
+            {'homework_name': 'hw123', 'status': 'approved'}
+        ) == []
+
+    def test_every_violation_reported_in_one_pass(self):
+        errors = validate_response({'homeworks': {}})
+        assert [type(error) for error in errors] == [
+            WrongTypeError, NoCurrentDateKeyInResponseError
+        ]
+
+    def test_list_validator_marks_items(self):
+        errors = validate_homeworks([
+            {'homework_name': 'hw1', 'status': 'approved'},
+            {'status': 'unknown'},
+            'hw3',
+        ])
+        assert [(type(error), error.index) for error in errors] == [
+            (MissingKeyError, 1), (UnknownStatusError, 1),
+            (WrongTypeError, 2),
+        ]
+
+    def test_check_response_raises_first_with_all_violations(self):
+        with pytest.raises(MissingKeyError) as error:
+            check_response({})
+        assert len(error.value.violations) == 2
@@ -0,0 +1,50 @@
+import json
+
+import pytest
+
+from exceptions import (DecodeError, NoCurrentDateKeyInResponseError,
+                        WrongTypeError)
+from streaming import HomeworkStream
+
+RESPONSE = {
+    'homeworks': [
+        {'id': 123456, 'homework_name': 'Ура, "кавычки"', 'status': 'approved',
+         'reviewer_comment': 'Всё нравится', 'score': 1.5e3},
+        {'id': 7, 'homework_name': 'hw7', 'status': 'rejected',
+         'tags': [True, False, None]},
+    ],
+    'current_date': 1677600000,
+}
+
+
+def chunked(data, size):
+    body = json.dumps(data, ensure_ascii=False, indent=1).encode()
+    return [body[start:start + size] for start in range(0, len(body), size)]
+
+
+class TestHomeworkStream:
+    @pytest.mark.parametrize('size', [1, 2, 3, 7, 64, 100000])
+    def test_items_match_full_decoding(self, size):
+        stream = HomeworkStream(chunked(RESPONSE, size))
+        assert list(stream) == RESPONSE['homeworks']
+        assert stream.current_date == RESPONSE['current_date']
+
+    def test_keys_after_homeworks_are_read(self):
+        data = {'current_date': 5, 'homeworks': [], 'extra': {'a': [1]}}
+        stream = HomeworkStream(chunked(data, 3))
+        assert list(stream) == []
+        assert stream.meta == {'current_date': 5, 'extra': {'a': [1]}}
+
+    def test_missing_current_date(self):
+        with pytest.raises(NoCurrentDateKeyInResponseError):
+            list(HomeworkStream(chunked({'homeworks': []}, 4)))
+
+    def test_homeworks_not_a_list(self):
+        data = {'homeworks': {'status': 'approved'}, 'current_date': 1}
+        with pytest.raises(WrongTypeError):
+            list(HomeworkStream(chunked(data, 4)))
+
+    def test_truncated_body(self):
+        body = b''.join(chunked(RESPONSE, 10))[:-20]
+        with pytest.raises(DecodeError):
+            list(HomeworkStream([body]))
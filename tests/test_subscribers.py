@@ -0,0 +1,123 @@
+import asyncio
+
+import aiohttp
+
+import homework_async
+from backfill import backfill
+from checkpoints import CheckpointStore, FileCheckpointStore
+from scheduler import Scheduler
+from tenants import Tenant, TenantRegistry
+from utils import RecordingBot
+from webhook import EventReceiver
+
+
+def shared_account(chats=2, tokens=1):
+    return TenantRegistry(
+        Tenant(token=f'token-{index % tokens}', chat_id=str(index),
+               from_date=1)
+        for index in range(chats)
+    )
+
+
+class TestRegistry:
+    def test_several_chats_per_token(self):
+        registry = shared_account(chats=4, tokens=2)
+        assert len(registry) == 4
+        assert registry.tokens() == ['token-0', 'token-1']
+        assert [tenant.chat_id
+                for tenant in registry.subscribers('token-0')] == ['0', '2']
+        registry.discard(registry.get('token-0').key)
+        assert registry.get('token-0').chat_id == '2'
+        assert len(registry.remove('token-1')) == 2
+        assert 'token-1' not in registry
+        assert len(registry) == 1
+
+
+class TestFanOut:
+    def test_scheduler_sends_one_request_per_token(self, fake_endpoint):
+        fake_endpoint.publish('hw-1')
+        registry = shared_account(chats=6, tokens=2)
+        bot = RecordingBot()
+        scheduler = Scheduler(registry, bot, period=0)
+        assert scheduler.run_pending() == 2
+        assert fake_endpoint.requests == 2
+        assert sorted(chat_id for chat_id, _ in bot.sent) == [
+            str(index) for index in range(6)
+        ]
+        assert len({tenant.from_date for tenant in registry}) == 1
+
+    def test_new_chat_of_token_shares_schedule_and_history(self,
+                                                           fake_endpoint):
+        fake_endpoint.publish('hw-1')
+        registry = shared_account(chats=1)
+        bot = RecordingBot()
+        scheduler = Scheduler(registry, bot, period=0)
+        scheduler.run_pending()
+        scheduler.reload(shared_account(chats=2))
+        scheduler.run_pending()
+        assert fake_endpoint.requests == 2
+        assert bot.sent and {chat_id for chat_id, _ in bot.sent} == {'0'}
+
+    def test_async_loop_sends_one_request_per_token(self, fake_endpoint,
+                                                    monkeypatch):
+        fake_endpoint.publish('hw-1')
+        registry = shared_account(chats=6, tokens=2)
+        sent = []
+
+        async def send_message(session, chat_id, message, token=None):
+            sent.append(chat_id)
+
+        monkeypatch.setattr(homework_async, 'send_message', send_message)
+
+        async def poll():
+            async with aiohttp.ClientSession() as session:
+                await asyncio.gather(*(
+                    homework_async.poll_subscribers(
+                        session, registry.subscribers(token)
+                    )
+                    for token in registry.tokens()
+                ))
+
+        asyncio.run(poll())
+        assert fake_endpoint.requests == 2
+        assert sorted(sent) == [str(index) for index in range(6)]
+        assert len({tenant.from_date for tenant in registry}) == 1
+
+    def test_async_poll_all_runs_one_loop_per_token(self, fake_endpoint):
+        registry = shared_account(chats=6, tokens=2)
+
+        async def run():
+            stop = asyncio.Event()
+            task = asyncio.create_task(
+                homework_async.poll_all(registry, period=0.2, stop=stop)
+            )
+            while fake_endpoint.requests < 2:
+                await asyncio.sleep(0.01)
+            stop.set()
+            await task
+
+        asyncio.run(run())
+        assert fake_endpoint.requests == 2
+
+    def test_webhook_event_reaches_every_chat(self):
+        registry = shared_account(chats=3)
+        receiver = EventReceiver(registry, RecordingBot(), CheckpointStore(),
+                                 secret='secret')
+        status, payload = receiver.handle(
+            registry.get('token-0').key,
+            b'{"homeworks": [{"id": 1, "homework_name": "hw-1", '
+            b'"status": "approved"}], "current_date": 1}',
+        )
+        assert payload == {'sent': 3}
+
+    def test_backfill_loads_history_once_per_token(self, fake_endpoint,
+                                                   tmp_path):
+        fake_endpoint.publish('hw-1')
+        registry = shared_account(chats=4, tokens=2)
+        store = FileCheckpointStore(str(tmp_path / 'state.log'))
+        assert backfill(registry, store, workers=4) == 4
+        assert fake_endpoint.requests == 2
+        states = store.load_all()
+        assert all(
+            states[tenant.key]['homeworks'] for tenant in registry
+        )
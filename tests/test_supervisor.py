@@ -0,0 +1,154 @@
+import multiprocessing
+import signal
+
+import pytest
+
+import supervisor as supervisor_module
+from hashring import HashRing
+from supervisor import Supervisor, shard_registry
+from tenants import Tenant, TenantRegistry
+from utils import FakeClock
+
+
+class FakeProcess:
+    started = []
+    events = []
+
+    def __init__(self, target=None, args=(), name=None):
+        self.name = name
+        self.pid = name
+        self.args = args
+        self.alive = False
+        self.exitcode = None
+        self.stubborn = False
+
+    def start(self):
+        self.alive = True
+        FakeProcess.started.append(self.name)
+        FakeProcess.events.append(('start', self.name))
+
+    def is_alive(self):
+        return self.alive
+
+    def terminate(self):
+        self.alive = self.stubborn
+        FakeProcess.events.append(('stop', self.name))
+
+    def kill(self):
+        self.alive = False
+        FakeProcess.events.append(('kill', self.name))
+
+    def join(self, timeout=None):
+        pass
+
+
+class FakeContext:
+    Process = FakeProcess
+    Value = staticmethod(multiprocessing.Value)
+
+
+@pytest.fixture(autouse=True)
+def hangups(monkeypatch):
+    sent = []
+    monkeypatch.setattr(supervisor_module.os, 'kill',
+                        lambda pid, signum: sent.append((pid, signum)))
+    return sent
+
+
+def make_supervisor(workers, keys=(), clock=None):
+    FakeProcess.started = []
+    FakeProcess.events = []
+    return Supervisor(workers, keys, context=FakeContext(),
+                      clock=clock or FakeClock()).start()
+
+
+class TestSupervisor:
+    def test_every_shard_is_started(self):
+        supervisor = make_supervisor(3)
+        assert sorted(FakeProcess.started) == [
+            'shard-0', 'shard-1', 'shard-2'
+        ]
+        node, size = supervisor.processes['shard-1'].args
+        assert (node, size.value) == ('shard-1', 3)
+
+    def test_dead_shard_is_restarted(self):
+        clock = FakeClock()
+        supervisor = make_supervisor(2, clock=clock)
+        clock.now += supervisor_module.MIN_UPTIME
+        supervisor.processes['shard-0'].alive = False
+        assert supervisor.restart_dead() == 1
+        assert supervisor.processes['shard-0'].is_alive()
+
+    def test_crash_loop_backs_off_then_gives_up(self):
+        clock = FakeClock()
+        supervisor = make_supervisor(1, clock=clock)
+        delays = []
+        while not supervisor.failed:
+            supervisor.processes['shard-0'].alive = False
+            supervisor.restart_dead()
+            started = len(FakeProcess.started)
+            waited = 0
+            while (len(FakeProcess.started) == started
+                   and not supervisor.failed):
+                clock.now += 1
+                waited += 1
+                supervisor.restart_dead()
+            if not supervisor.failed:
+                delays.append(waited)
+        assert delays == [1, 2, 4, 8]
+        assert len(FakeProcess.started) == supervisor_module.MAX_FAILURES
+
+    def test_stuck_shard_is_killed_before_new_owner_starts(self):
+        supervisor = make_supervisor(2)
+        supervisor.processes['shard-1'].stubborn = True
+        stuck = supervisor.processes['shard-1']
+        supervisor.halt('shard-1', timeout=0)
+        assert not stuck.is_alive()
+        assert ('kill', 'shard-1') in FakeProcess.events
+
+    def test_resize_moves_few_tenants(self):
+        keys = [f'key-{index}' for index in range(2000)]
+        supervisor = make_supervisor(4, keys)
+        FakeProcess.started = []
+        moved = supervisor.resize(5)
+        assert 0 < moved < len(keys) / 5 * 1.5
+        assert 'shard-4' in FakeProcess.started
+        assert len(supervisor.processes) == 5
+
+    def test_shrinking_stops_removed_shard(self):
+        supervisor = make_supervisor(3, [f'key-{index}' for index in range(50)])
+        removed = supervisor.processes['shard-2']
+        supervisor.resize(2)
+        assert not removed.is_alive()
+        assert sorted(supervisor.processes) == ['shard-0', 'shard-1']
+
+    def test_moved_shards_stop_before_new_ones_start(self):
+        supervisor = make_supervisor(
+            4, [f'key-{index}' for index in range(2000)]
+        )
+        FakeProcess.events = []
+        supervisor.resize(5)
+        kinds = [event for event, _ in FakeProcess.events]
+        assert 'stop' in kinds and ('start', 'shard-4') in FakeProcess.events
+        assert kinds == sorted(kinds, reverse=True)
+        assert supervisor.size.value == 5
+
+    def test_untouched_shards_are_notified_of_new_ring(self, hangups):
+        supervisor = make_supervisor(3)
+        FakeProcess.started = []
+        assert supervisor.resize(4) == 0
+        assert FakeProcess.started == ['shard-3']
+        assert sorted(pid for pid, signum in hangups
+                      if signum == signal.SIGHUP) == [
+            'shard-0', 'shard-1', 'shard-2'
+        ]
+
+def test_shards_cover_registry_once():
+    registry = TenantRegistry(
+        Tenant(token=f'token-{index}', chat_id=str(index))
+        for index in range(100)
+    )
+    ring = HashRing(['shard-0', 'shard-1', 'shard-2'])
+    tokens = [tenant.token for node in ring.nodes
+              for tenant in shard_registry(registry, ring, node)]
+    assert sorted(tokens) == sorted(tenant.token for tenant in registry)
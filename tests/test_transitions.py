@@ -0,0 +1,96 @@
+import homework as homework_module
+from circuit import CircuitBreaker, ErrorReporter
+from scheduler import poll_tenant
+from tenants import Tenant
+from transitions import StatusTracker
+from utils import RecordingBot
+
+
+def homework(id, status, date_updated='2023-03-01T10:00:00Z', name=None):
+    return {'id': id, 'homework_name': name or f'hw{id}', 'status': status,
+            'date_updated': date_updated}
+
+
+class TestStatusTracker:
+    def test_every_changed_homework_is_reported(self):
+        tracker = StatusTracker()
+        homeworks = [homework(1, 'reviewing'), homework(2, 'approved'),
+                     homework(3, 'rejected')]
+        assert tracker.transitions(homeworks) == homeworks
+
+    def test_unchanged_status_is_not_repeated(self):
+        tracker = StatusTracker()
+        tracker.transitions([homework(1, 'reviewing'), homework(2, 'approved')])
+        changed = tracker.transitions([
+            homework(1, 'approved', '2023-03-02T10:00:00Z'),
+            homework(2, 'approved'),
+        ])
+        assert [item['id'] for item in changed] == [1]
+
+    def test_stale_update_is_ignored(self):
+        tracker = StatusTracker()
+        tracker.transitions([homework(1, 'approved', '2023-03-02T10:00:00Z')])
+        assert tracker.transitions([homework(1, 'reviewing')]) == []
+
+    def test_homework_without_id_is_keyed_by_name(self):
+        tracker = StatusTracker()
+        item = {'homework_name': 'hw123', 'status': 'approved'}
+        assert tracker.transitions([item]) == [item]
+        assert tracker.transitions([dict(item)]) == []
+
+    def test_state_restores_review_counter(self):
+        tracker = StatusTracker({1: ('reviewing', '2023-03-01T10:00:00Z')})
+        assert tracker.in_review()
+        tracker.transitions([homework(1, 'approved', '2023-03-02T10:00:00Z')])
+        assert not tracker.in_review()
+
+
+def mixed_response(current_date=1677600000):
+    return {
+        'homeworks': [homework(1, 'weird'), homework(2, 'approved')],
+        'current_date': current_date,
+    }
+
+
+class TestInvalidHomework:
+    def test_render_error_skips_only_that_homework(self):
+        tracker = StatusTracker()
+
+        def render(item):
+            if item['status'] == 'weird':
+                raise KeyError(item['status'])
+            return item['homework_name']
+
+        updates, errors = tracker.render_transitions(
+            [homework(1, 'weird'), homework(2, 'approved')], render
+        )
+        assert [message for _, message in updates] == ['hw2']
+        assert len(errors) == 1
+        assert tracker.is_changed(homework(1, 'weird'))
+        assert not tracker.is_changed(homework(2, 'approved'))
+
+    def test_poll_once_notifies_valid_homeworks(self, monkeypatch):
+        monkeypatch.setattr(homework_module, 'get_api_answer',
+                            lambda timestamp: mixed_response())
+        bot = RecordingBot()
+        cursor = homework_module.poll_once(
+            bot, CircuitBreaker(), ErrorReporter(), StatusTracker(), 1
+        )
+        assert cursor == 1677600000
+        assert len(bot.texts) == 2
+        assert 'hw2' in bot.texts[0]
+        assert bot.texts[1].startswith('Сбой в работе программы')
+
+    def test_scheduler_notifies_valid_homeworks(self, monkeypatch):
+        monkeypatch.setattr(
+            'scheduler.fetch_homeworks',
+            lambda from_date, headers, session=None: mixed_response(),
+        )
+        tenant = Tenant(token='token', chat_id='1', from_date=1)
+        bot = RecordingBot()
+        assert poll_tenant(bot, tenant)
+        assert poll_tenant(bot, tenant) is False
+        assert tenant.from_date == 1677600000
+        notices = [text for text in bot.texts if 'hw2' in text]
+        assert len(notices) == 1
+        assert any(text.startswith('Сбой') for text in bot.texts)
@@ -0,0 +1,133 @@
+import http.client
+import json
+import urllib.error
+import urllib.request
+from http import HTTPStatus
+
+import pytest
+
+from checkpoints import CheckpointStore, FileCheckpointStore
+from tenants import Tenant, TenantRegistry
+from utils import RecordingBot
+import webhook
+from webhook import EventReceiver, serve
+
+
+def event(status='approved', current_date=1677600000):
+    return json.dumps({
+        'homeworks': [{'id': 1, 'homework_name': 'hw123', 'status': status,
+                       'date_updated': '2023-03-01T10:00:00Z'}],
+        'current_date': current_date,
+    }).encode()
+
+
+@pytest.fixture
+def tenant():
+    return Tenant(token='token', chat_id='1', from_date=100)
+
+
+@pytest.fixture
+def receiver(tenant):
+    return EventReceiver(TenantRegistry([tenant]), RecordingBot(),
+                         CheckpointStore(), secret='secret')
+
+
+class TestEventReceiver:
+    def test_event_is_notified_once(self, receiver, tenant):
+        assert receiver.handle(tenant.key, event()) == (
+            HTTPStatus.ACCEPTED, {'sent': 1}
+        )
+        assert receiver.handle(tenant.key, event())[1] == {'sent': 0}
+        assert len(receiver.bot.sent) == 1
+        assert 'hw123' in receiver.bot.sent[0][1]
+
+    def test_cursor_is_left_to_polling(self, receiver, tenant, tmp_path):
+        receiver.store = FileCheckpointStore(str(tmp_path / 'state.log'))
+        receiver.handle(tenant.key, event())
+        assert tenant.from_date == 100
+        assert receiver.store.load(tenant.key)['from_date'] == 100
+        receiver.store.close()
+
+    def test_unknown_tenant(self, receiver):
+        assert receiver.handle('nobody', event())[0] == HTTPStatus.NOT_FOUND
+
+    @pytest.mark.parametrize('body', [
+        b'not json',
+        json.dumps({'homeworks': []}).encode(),
+        event(status='unknown'),
+    ])
+    def test_invalid_event_is_rejected(self, receiver, tenant, body):
+        assert receiver.handle(tenant.key, body)[0] == HTTPStatus.BAD_REQUEST
+        assert receiver.bot.sent == []
+
+    def test_mixed_event_leaves_state_untouched(self, receiver, tenant):
+        body = json.dumps({
+            'homeworks': [
+                {'id': 2, 'homework_name': 'hw2', 'status': 'approved'},
+                {'id': 1, 'homework_name': 'hw1', 'status': 'weird'},
+            ],
+            'current_date': 1,
+        }).encode()
+        assert receiver.handle(tenant.key, body)[0] == HTTPStatus.BAD_REQUEST
+        assert receiver.bot.sent == []
+        assert tenant.tracker.state == {}
+        assert receiver.handle(tenant.key, event())[1] == {'sent': 1}
+
+    def test_secret(self, receiver):
+        assert receiver.authorized('secret')
+        assert not receiver.authorized('wrong')
+        assert not receiver.authorized(None)
+
+    def test_no_secret_rejects_everything(self, receiver):
+        receiver.secret = None
+        assert not receiver.authorized(None)
+        assert not receiver.authorized('')
+
+
+def test_main_refuses_to_start_without_secret(tenant, monkeypatch):
+    monkeypatch.setattr(webhook, 'load_tenants',
+                        lambda: TenantRegistry([tenant]))
+    monkeypatch.setattr(webhook, 'TELEGRAM_TOKEN', 'bot-token')
+    monkeypatch.setattr(webhook, 'WEBHOOK_PORT', '0')
+    monkeypatch.setattr(webhook, 'WEBHOOK_SECRET', None)
+    monkeypatch.setattr(webhook, 'start_bot', pytest.fail)
+    with pytest.raises(SystemExit):
+        webhook.main()
+
+
+def test_http_roundtrip(receiver, tenant):
+    server = serve(receiver, host='127.0.0.1')
+    url = f'http://127.0.0.1:{server.server_address[1]}/webhook/{tenant.key}'
+    try:
+        request = urllib.request.Request(
+            url, data=event(), headers={'X-Webhook-Secret': 'secret'}
+        )
+        with urllib.request.urlopen(request) as response:
+            assert response.status == HTTPStatus.ACCEPTED
+            assert json.load(response) == {'sent': 1}
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(urllib.request.Request(url, data=event()))
+        assert error.value.code == HTTPStatus.UNAUTHORIZED
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.mark.parametrize('length', ['abc', '-1', '1.5'])
+def test_bad_content_length_is_rejected(receiver, tenant, length):
+    server = serve(receiver, host='127.0.0.1')
+    connection = http.client.HTTPConnection(
+        '127.0.0.1', server.server_address[1], timeout=5
+    )
+    try:
+        connection.putrequest('POST', f'/webhook/{tenant.key}')
+        connection.putheader('X-Webhook-Secret', 'secret')
+        connection.putheader('Content-Length', length)
+        connection.endheaders()
+        response = connection.getresponse()
+        assert response.status == HTTPStatus.BAD_REQUEST
+        assert json.load(response) == {'error': 'bad content length'}
+    finally:
+        connection.close()
+        server.shutdown()
+        server.server_close()
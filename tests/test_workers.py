@@ -0,0 +1,90 @@
+import threading
+import time
+
+import pytest
+
+from checkpoints import FileCheckpointStore
+from circuit import CircuitBreaker
+from exceptions import DeadlineExceededError
+from scheduler import Scheduler
+from tenants import Tenant, TenantRegistry
+from utils import RecordingBot
+from workers import WorkerPool
+
+
+@pytest.fixture
+def pool():
+    pool = WorkerPool(workers=4, queue_size=0)
+    yield pool
+    pool.shutdown()
+
+
+def make_registry(count):
+    return TenantRegistry(
+        Tenant(token=f'token-{index}', chat_id=str(index), from_date=1)
+        for index in range(count)
+    )
+
+
+class TestWorkerPool:
+    def test_saturated_pool_rejects(self, pool):
+        release = threading.Event()
+        futures = [pool.submit(release.wait, 5) for _ in range(4)]
+        assert all(futures)
+        assert pool.submit(release.wait, 5) is None
+        release.set()
+        assert all(future.result(5) for future in futures)
+        assert pool.submit(lambda: 'free').result(5) == 'free'
+
+    def test_task_past_deadline_is_skipped(self):
+        pool = WorkerPool(workers=1, queue_size=1)
+        release = threading.Event()
+        calls = []
+        try:
+            pool.submit(release.wait, 5)
+            late = pool.submit(calls.append, 1,
+                               deadline=pool.clock() + 0.01)
+            time.sleep(0.05)
+            release.set()
+            with pytest.raises(DeadlineExceededError):
+                late.result(5)
+            assert calls == []
+        finally:
+            pool.shutdown()
+
+
+class TestParallelScheduler:
+    def test_tokens_polled_in_parallel(self, fake_endpoint, pool, tmp_path):
+        fake_endpoint.latency = 0.2
+        fake_endpoint.publish('hw-1')
+        registry = make_registry(4)
+        bot = RecordingBot()
+        store = FileCheckpointStore(str(tmp_path / 'state.log'))
+        scheduler = Scheduler(registry, bot, period=0, store=store,
+                              pool=pool)
+        scheduler.period = 60
+        started = time.perf_counter()
+        assert scheduler.run_pending() == 4
+        assert time.perf_counter() - started < 0.6
+        assert len(bot.sent) == 4
+        store.flush()
+        states = store.load_all()
+        assert all(states[tenant.key]['homeworks'] for tenant in registry)
+        assert scheduler.next_due() > time.time() + 50
+
+    def test_saturation_defers_remaining_tokens(self, fake_endpoint, pool):
+        fake_endpoint.latency = 0.3
+        registry = make_registry(6)
+        for tenant in registry:
+            tenant.breaker = CircuitBreaker(threshold=10)
+        scheduler = Scheduler(registry, RecordingBot(), period=0,
+                              pool=pool, deadline=0.1)
+        scheduler.period = 60
+        assert scheduler.run_pending() == 0
+        assert scheduler.next_due() <= time.time()
+        scheduler.drain()
+        assert fake_endpoint.requests == 4
+        scheduler.run_pending()
+        scheduler.drain()
+        assert fake_endpoint.requests == 6
+        assert scheduler.next_due() > time.time() + 50
@@ -1,4 +1,5 @@
 import logging
+import threading
 from collections import namedtuple
 from contextlib import contextmanager
 from http import HTTPStatus
@@ -103,3 +104,38 @@ class MockTelegramBot:
 
 class BreakInfiniteLoop(Exception):
     pass
+
+
+class RecordingBot:
+    """Bot that records (chat_id, text) of every sent message.
+
+    failures are raised by the first send_message calls, one per call.
+    """
+
+    def __init__(self, failures=()):
+        self.sent = []
+        self.failures = list(failures)
+        self.lock = threading.Lock()
+
+    def send_message(self, chat_id=None, text=None, **kwargs):
+        with self.lock:
+            if self.failures:
+                raise self.failures.pop(0)
+            self.sent.append((chat_id, text))
+
+    @property
+    def texts(self):
+        return [text for _, text in self.sent]
+
+
+class FakeClock:
+    """Clock that only moves when a test moves it."""
+
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
@@ -0,0 +1,74 @@
+from collections import Counter
+
+
+def homework_key(homework):
+    """Компактный ключ работы: id, а без него название."""
+    return homework.get('id', homework.get('homework_name'))
+
+
+class StatusTracker:
+    """Состояние работ одного подписчика: ключ → (статус, date_updated).
+
+    transitions за один проход по списку из check_response возвращает
+    ровно те работы, статус которых изменился с прошлого вызова.
+    render_transitions к тому же собирает уведомления и запоминает
+    работу, только когда сообщение о ней собрано.
+    """
+
+    def __init__(self, state=None):
+        """Восстановление из сохранённого состояния."""
+        self.state = dict(state or {})
+        self.counts = Counter(status for status, _ in self.state.values())
+
+    def is_changed(self, homework):
+        """Сменился ли статус работы с прошлого record."""
+        previous = self.state.get(homework_key(homework))
+        if previous is None:
+            return True
+        updated = homework.get('date_updated') or ''
+        return not (previous[0] == homework.get('status')
+                    or updated and updated < previous[1])
+
+    def record(self, homework):
+        """Запоминание статуса работы."""
+        key = homework_key(homework)
+        status = homework.get('status')
+        previous = self.state.get(key)
+        if previous is not None:
+            self.counts[previous[0]] -= 1
+        self.state[key] = (status, homework.get('date_updated') or '')
+        self.counts[status] += 1
+
+    def transitions(self, homeworks):
+        """Работы со сменившимся статусом, состояние обновляется."""
+        changed = []
+        for homework in homeworks:
+            if self.is_changed(homework):
+                self.record(homework)
+                changed.append(homework)
+        return changed
+
+    def render_transitions(self, homeworks, render):
+        """Пары (работа, сообщение) по сменившимся статусам и ошибки.
+
+        Работа, на которой проверка или render упали, пропускается и не
+        запоминается, остальные уведомляются как обычно. Ошибки
+        возвращаются вызывающему, чтобы он сообщил о них.
+        """
+        updates = []
+        errors = []
+        for homework in homeworks:
+            try:
+                if not self.is_changed(homework):
+                    continue
+                message = render(homework)
+            except Exception as error:
+                errors.append(error)
+                continue
+            self.record(homework)
+            updates.append((homework, message))
+        return updates, errors
+
+    def in_review(self):
+        """Есть ли работы со статусом reviewing."""
+        return self.counts['reviewing'] > 0
@@ -0,0 +1,192 @@
+"""Приём статусов работ, которые присылают на webhook.
+
+POST /webhook/<ключ подписчика> принимает тело в том же виде, что и
+ответ API: {"homeworks": [...], "current_date": ...}. Ключ —
+checkpoint_key(token, chat_id), сам токен в адресе не передаётся.
+Событие относится к аккаунту, поэтому уведомления получают все
+подписчики его токена.
+Без WEBHOOK_SECRET приём не запускается, секрет ожидается в заголовке
+X-Webhook-Secret. По умолчанию сервер слушает только 127.0.0.1, наружу
+его выставляет обратный прокси или WEBHOOK_HOST. События проходят тот
+же путь, что и ответы на опрос: check_response, StatusTracker,
+уведомление. Курсор from_date не меняется: опрос с редким интервалом
+остаётся сверкой на случай потерянных событий.
+"""
+import hmac
+import json
+import logging
+import os
+import sys
+import threading
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from checkpoints import open_store, snapshot
+from config import TokenCache
+from homework import TELEGRAM_TOKEN, check_response
+from lifecycle import DRAIN_TIMEOUT, Lifecycle
+from log_setup import setup_logging
+from metrics import REGISTRY, start_metrics_server
+from response_cache import ResponseCache
+from scheduler import Scheduler, apply_updates, refresh_tenants, start_bot
+from schema import raise_first
+from tenants import load_tenants
+
+WEBHOOK_PORT = os.getenv('WEBHOOK_PORT')
+WEBHOOK_HOST = os.getenv('WEBHOOK_HOST', '127.0.0.1')
+WEBHOOK_SECRET = os.getenv('WEBHOOK_SECRET')
+RECONCILE_INTERVAL = float(os.getenv('RECONCILE_INTERVAL', 3600))
+MAX_BODY = 1024 * 1024
+PREFIX = '/webhook/'
+
+EVENTS = REGISTRY.counter(
+    'homework_webhook_events', 'События webhook по результату.',
+    labelname='result',
+)
+
+logger = logging.getLogger(__name__)
+
+
+class EventReceiver:
+    """Обработка событий: поиск подписчика, проверка, уведомления."""
+
+    def __init__(self, registry, bot, store, secret=WEBHOOK_SECRET):
+        """Приёмник поверх реестра, бота и хранилища планировщика."""
+        self.registry = registry
+        self.bot = bot
+        self.store = store
+        self.secret = secret
+
+    def authorized(self, header):
+        """Совпадает ли секрет из заголовка с WEBHOOK_SECRET.
+
+        Без секрета приёмник не принимает ни одного события.
+        """
+        if not self.secret:
+            return False
+        return hmac.compare_digest((header or '').encode(),
+                                   self.secret.encode())
+
+    def handle(self, key, body):
+        """Код ответа и тело ответа для одного события.
+
+        Событие с неверной работой отклоняется целиком до того, как
+        меняется состояние подписчиков.
+        """
+        tenant = self.registry.get_by_key(key)
+        if tenant is None:
+            return HTTPStatus.NOT_FOUND, {'error': 'unknown tenant'}
+        try:
+            homeworks = check_response(json.loads(body))
+            subscribers = self.registry.subscribers(tenant.token)
+            for subscriber in subscribers:
+                for homework in homeworks:
+                    raise_first(subscriber.renderer.validate(homework))
+            updated = []
+            for subscriber in subscribers:
+                with subscriber.lock:
+                    updated += apply_updates(self.bot, subscriber, homeworks)
+                    self.store.save(subscriber.key, snapshot(
+                        subscriber.from_date, subscriber.tracker
+                    ))
+        except Exception as error:
+            logger.warning('Событие для чата %s отклонено: %s',
+                           tenant.chat_id, error)
+            return HTTPStatus.BAD_REQUEST, {'error': str(error)}
+        self.store.maybe_flush()
+        return HTTPStatus.ACCEPTED, {'sent': len(updated)}
+
+
+class Handler(BaseHTTPRequestHandler):
+    """HTTP-обвязка EventReceiver; сам приёмник — server.receiver."""
+
+    def do_POST(self):
+        """Приём одного события."""
+        receiver = self.server.receiver
+        if not self.path.startswith(PREFIX):
+            self.reply(HTTPStatus.NOT_FOUND, {'error': 'not found'})
+            return
+        if not receiver.authorized(self.headers.get('X-Webhook-Secret')):
+            self.reply(HTTPStatus.UNAUTHORIZED, {'error': 'bad secret'})
+            return
+        length = self.content_length()
+        if length is None:
+            self.reply(HTTPStatus.BAD_REQUEST,
+                       {'error': 'bad content length'})
+            return
+        if length > MAX_BODY:
+            self.reply(HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                       {'error': 'body too large'})
+            return
+        self.reply(*receiver.handle(self.path[len(PREFIX):],
+                                    self.rfile.read(length)))
+
+    def content_length(self):
+        """Длина тела из Content-Length; None, если она не число или < 0."""
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+        except ValueError:
+            return None
+        return length if length >= 0 else None
+
+    def reply(self, status, payload):
+        """JSON-ответ с учётом результата в метриках."""
+        EVENTS.inc(status.phrase)
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        """Запросы пишутся в лог бота на уровне DEBUG."""
+        logger.debug(format, *args)
+
+
+def serve(receiver, port=0, host=WEBHOOK_HOST):
+    """HTTP-сервер приёма событий в фоновом потоке."""
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    server.receiver = receiver
+    threading.Thread(
+        target=server.serve_forever, name='webhook', daemon=True
+    ).start()
+    return server
+
+
+def main():
+    """Приём событий и редкая сверка опросом для подписчиков реестра."""
+    registry = load_tenants()
+    if not TELEGRAM_TOKEN or not len(registry) or not WEBHOOK_PORT:
+        logger.critical('Нет токена бота, подписчиков или WEBHOOK_PORT')
+        sys.exit(1)
+    if not WEBHOOK_SECRET:
+        logger.critical('Нет WEBHOOK_SECRET: приём событий без секрета '
+                        'не запускается')
+        sys.exit(1)
+    tokens = TokenCache()
+    bot = start_bot(registry, tokens)
+    start_metrics_server()
+    store = open_store()
+    scheduler = Scheduler(registry, bot, period=RECONCILE_INTERVAL,
+                          cache=ResponseCache(), store=store, tokens=tokens)
+    server = serve(EventReceiver(registry, bot, store), int(WEBHOOK_PORT))
+    logger.info('Приём событий на %s:%s для %d подписчиков',
+                *server.server_address[:2], len(registry))
+    for tenant in registry:
+        logger.debug('Чат %s: события на %s%s',
+                     tenant.chat_id, PREFIX, tenant.key)
+    lifecycle = Lifecycle().install()
+    try:
+        scheduler.run_forever(lifecycle, lambda: refresh_tenants(tokens))
+    finally:
+        server.shutdown()
+        bot.stop(DRAIN_TIMEOUT)
+        store.close()
+    logger.info('Приём событий остановлен')
+
+
+if __name__ == '__main__':
+    setup_logging()
+    main()
@@ -0,0 +1,72 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from deadlines import OVERRUNS, Deadline, deadline_scope
+from exceptions import DeadlineExceededError
+from metrics import REGISTRY
+
+POLL_WORKERS = int(os.getenv('POLL_WORKERS', 0))
+POLL_QUEUE = os.getenv('POLL_QUEUE')
+
+POOL_WAIT = REGISTRY.histogram(
+    'homework_pool_wait_seconds', 'Ожидание опроса в очереди пула.'
+)
+POOL_REJECTED = REGISTRY.counter(
+    'homework_pool_rejected', 'Опросы, отложенные из-за занятого пула.'
+)
+
+
+class WorkerPool:
+    """Ограниченный пул потоков для опросов.
+
+    В работе и в очереди одновременно не больше workers + queue_size
+    задач. Когда пул занят, submit ждёт свободного места не дольше
+    timeout и возвращает None: вызывающий откладывает задачу, а не
+    копит её в памяти. Задача, не начавшаяся до своего срока,
+    не выполняется и завершается DeadlineExceededError, а начавшаяся
+    выполняется в deadline_scope со своим сроком.
+    """
+
+    def __init__(self, workers=POLL_WORKERS, queue_size=POLL_QUEUE,
+                 clock=time.monotonic):
+        """Пул из workers потоков; очередь по умолчанию того же размера."""
+        queue_size = workers if queue_size is None else int(queue_size)
+        self.workers = workers
+        self.capacity = workers + queue_size
+        self.clock = clock
+        self._slots = threading.BoundedSemaphore(self.capacity)
+        self._executor = ThreadPoolExecutor(workers, 'poll')
+
+    def submit(self, function, *args, deadline=None, timeout=0):
+        """Future задачи или None, если места не нашлось за timeout."""
+        if not self._slots.acquire(timeout=timeout):
+            POOL_REJECTED.inc()
+            return None
+        future = self._executor.submit(
+            self._run, self.clock(), deadline, function, args
+        )
+        future.add_done_callback(self._release)
+        return future
+
+    def _release(self, future):
+        """Освобождение места после завершения задачи."""
+        self._slots.release()
+
+    def _run(self, queued, deadline, function, args):
+        """Выполнение задачи, если её срок ещё не прошёл."""
+        started = self.clock()
+        POOL_WAIT.observe(started - queued)
+        if deadline is not None and started > deadline:
+            OVERRUNS.inc('queue')
+            raise DeadlineExceededError(stage='queue',
+                                        overrun=started - deadline)
+        if deadline is None:
+            return function(*args)
+        with deadline_scope(Deadline(deadline, self.clock)):
+            return function(*args)
+
+    def shutdown(self, wait=True):
+        """Остановка пула; без wait задачи из очереди отменяются."""
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)